@@ -0,0 +1,153 @@
+"""
+Benchmark of the performance and play list responses.
+
+Renders the rows of both lists with their DRF list serializers and with
+the ValuesListing fast path, queries included, and prints the rows per
+second of each. The sample data is created in a transaction that is
+rolled back at the end.
+
+Needs the same environment variables as ``manage.py``.
+
+Usage:
+    python benchmarks/list_serialization.py
+"""
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "theatre_service.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+
+from theatre.fast_lists import PerformanceListing, PlayListing  # noqa: E402
+from theatre.models import (  # noqa: E402
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    TheatreHall,
+)
+from theatre.serializers import (  # noqa: E402
+    PerformanceListSerializer,
+    PlayListSerializer,
+)
+from theatre.views import PerformanceViewSet, PlayViewSet  # noqa: E402
+
+PLAYS = 300
+PERFORMANCES = 500
+HALLS = 5
+REPEAT = 20
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_sample():
+    genres = Genre.objects.bulk_create(
+        [Genre(name=f"Benchmark genre {number}") for number in range(10)]
+    )
+    actors = Actor.objects.bulk_create(
+        [
+            Actor(first_name="Actor", last_name=str(number))
+            for number in range(50)
+        ]
+    )
+    plays = Play.objects.bulk_create(
+        [
+            Play(
+                title=f"Play {number}",
+                description="Benchmark play",
+                image=f"uploads/plays/play-{number}.jpg",
+            )
+            for number in range(PLAYS)
+        ]
+    )
+    for number, play in enumerate(plays):
+        play.genres.add(genres[number % 10], genres[(number + 3) % 10])
+        play.actors.add(*actors[number % 45:number % 45 + 5])
+
+    halls = TheatreHall.objects.bulk_create(
+        [
+            TheatreHall(name=f"Hall {number}", rows=20, seats_in_row=30)
+            for number in range(HALLS)
+        ]
+    )
+    start = timezone.now() + datetime.timedelta(days=3650)
+    Performance.objects.bulk_create(
+        [
+            Performance(
+                play=plays[number % PLAYS],
+                theatre_hall=halls[number % HALLS],
+                show_time=start + datetime.timedelta(days=number),
+            )
+            for number in range(PERFORMANCES)
+        ]
+    )
+
+
+def list_queryset(viewset_class):
+    """Returns the queryset the list action of the viewset renders"""
+    view = viewset_class(
+        action="list",
+        request=Request(RequestFactory().get("/")),
+        format_kwarg=None,
+    )
+    return view.get_queryset()
+
+
+def measure(name, queryset, serializer_class, listing_class):
+    request = RequestFactory().get("/", HTTP_HOST="localhost")
+    context = {"request": request}
+    count = len(listing_class(context).rows(queryset.all()))
+
+    serialized = timeit.timeit(
+        lambda: serializer_class(
+            queryset.all(), many=True, context=context
+        ).data,
+        number=REPEAT,
+    )
+    fast = timeit.timeit(
+        lambda: listing_class(context).rows(queryset.all()),
+        number=REPEAT,
+    )
+    print(
+        f"{name} ({count} rows): "
+        f"serializer {count * REPEAT / serialized:9.0f} rows/s, "
+        f"fast path {count * REPEAT / fast:9.0f} rows/s, "
+        f"speedup x{serialized / fast:.1f}"
+    )
+
+
+def main():
+    try:
+        with transaction.atomic():
+            create_sample()
+            measure(
+                "performances",
+                list_queryset(PerformanceViewSet),
+                PerformanceListSerializer,
+                PerformanceListing,
+            )
+            measure(
+                "plays",
+                list_queryset(PlayViewSet),
+                PlayListSerializer,
+                PlayListing,
+            )
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark of the start-up time of a worker.
+
+Runs ``python -X importtime`` on what a worker loads before serving its
+first request (the WSGI application and the URLconf) with the
+development and the production settings profiles, and prints the total
+import time and the most expensive top-level packages of each.
+
+Needs the same environment variables as ``manage.py``.
+
+Usage:
+    python benchmarks/startup.py
+"""
+import os
+import subprocess
+import sys
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ("development", "production")
+REPEAT = 5
+TOP = 8
+
+STARTUP = (
+    "from theatre_service.wsgi import application; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+
+def import_times(profile):
+    """
+    Returns the self time of every imported module in microseconds,
+    as reported by ``-X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP],
+        cwd=ROOT,
+        env={**os.environ, "DJANGO_ENV": profile},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, _, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(self_time)
+    return times
+
+
+def main():
+    for profile in PROFILES:
+        runs = [import_times(profile) for _ in range(REPEAT)]
+        total = min(sum(times.values()) for times in runs)
+        packages = Counter()
+        for module, self_time in runs[-1].items():
+            packages[module.split(".")[0]] += self_time
+
+        print(
+            f"{profile}: {len(runs[-1])} modules, "
+            f"best total import time {total / 1000:.1f} ms"
+        )
+        for package, self_time in packages.most_common(TOP):
+            print(f"    {package:<24} {self_time / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration of the production profile.
+
+Usage:
+    gunicorn -c gunicorn.conf.py theatre_service.wsgi:application
+
+Serve theatre_service.asgi:application with
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker instead.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+keepalive = 5
+
+# Restart workers now and then to bound memory growth
+max_requests = 1000
+max_requests_jitter = 100
+
+# Load Django once in the master and fork the workers from it,
+# so they start fast and share the imported code.
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Workers must not share database connections opened in the master"""
+    from django.db import connections
+
+    connections.close_all()
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 
 from theatre.models import (
     Actor,
@@ -11,23 +14,134 @@ from theatre.models import (
     Ticket,
 )
 
-admin.site.register(Actor)
-admin.site.register(Genre)
-admin.site.register(Play)
-admin.site.register(TheatreHall)
-admin.site.register(Reservation)
-admin.site.register(Ticket)
+# Tables with fewer estimated rows than this are counted exactly
+ESTIMATED_COUNT_THRESHOLD = 100_000
+
+
+def estimated_row_count(queryset) -> int:
+    """
+    Returns the planner's row estimate for the queryset's table from
+    pg_class, summed over its partitions, or -1 when it is unavailable.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return -1
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(GREATEST(pg_class.reltuples, 0))::bigint "
+            "FROM pg_partition_tree(to_regclass(%s)) AS tree "
+            "JOIN pg_class ON pg_class.oid = tree.relid "
+            "WHERE tree.isleaf",
+            [queryset.model._meta.db_table],
+        )
+        estimate = cursor.fetchone()[0]
+
+    return -1 if estimate is None else estimate
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the size of an unfiltered changelist of a huge
+    table from the planner statistics instead of running COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset)
+            if estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+
+        return super().count
+
+
+@admin.register(Actor)
+class ActorAdmin(admin.ModelAdmin):
+    list_display = ("first_name", "last_name", "id")
+    search_fields = ("first_name", "last_name")
+
+
+@admin.register(Genre)
+class GenreAdmin(admin.ModelAdmin):
+    list_display = ("name", "id")
+    search_fields = ("name",)
+
+
+@admin.register(Play)
+class PlayAdmin(admin.ModelAdmin):
+    list_display = ("title", "id")
+    search_fields = ("title",)
+    autocomplete_fields = ("genres", "actors")
+
+
+@admin.register(TheatreHall)
+class TheatreHallAdmin(admin.ModelAdmin):
+    list_display = ("name", "rows", "seats_in_row", "id")
+    search_fields = ("name",)
+
+
+class TicketInline(admin.TabularInline):
+    model = Ticket
+    extra = 0
+    raw_id_fields = ("performance",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            "performance__play",
+            "performance__theatre_hall",
+        )
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    inlines = [TicketInline]
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    list_filter = ("created_at",)
+    search_fields = ("=id", "=user__email")
+    raw_id_fields = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ("id", "performance", "row", "seat", "reservation")
+    list_select_related = (
+        "performance__play",
+        "performance__theatre_hall",
+        "reservation",
+    )
+    list_filter = ("performance__show_time",)
+    search_fields = ("=id", "=reservation__id", "=performance__id")
+    raw_id_fields = ("performance", "reservation")
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class PropInline(admin.TabularInline):
     model = Prop.performance.through
     extra = 0
+    raw_id_fields = ("prop",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("prop")
 
 
 @admin.register(Performance)
 class PerformanceAdmin(admin.ModelAdmin):
     inlines = [PropInline]
     list_display = ("play", "theatre_hall", "show_time", "prop_list", "id")
+    list_select_related = ("play", "theatre_hall")
+    list_filter = ("show_time",)
+    search_fields = ("play__title",)
+    autocomplete_fields = ("play", "theatre_hall")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("props")
 
     def prop_list(self, obj):
         return ", ".join([prop.name for prop in obj.props.all()])
@@ -38,3 +152,4 @@ class PerformanceAdmin(admin.ModelAdmin):
 @admin.register(Prop)
 class PropAdmin(admin.ModelAdmin):
     list_display = ("name", "id")
+    search_fields = ("name",)
@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+
+class SeatAllocator:
+    """
+    Finds the best available block of adjacent seats in a theatre hall.
+
+    The hall is a grid of ``rows`` x ``seats_in_row`` seats, both numbered
+    from 1. Free seats are kept in a per-row index of free runs, i.e. sorted
+    ``(first_seat, length)`` pairs of consecutive free seats, so a search
+    only looks at the runs that are long enough instead of enumerating
+    every seat of the hall.
+
+    A block is scored by its distance from the centre of the hall: the
+    horizontal distance of the block's centre from the centre seat plus
+    ``row_weight`` times the distance of its row from the middle row.
+    Lower scores are better, ties go to the lower row and then to the
+    lower seat number.
+    """
+
+    def __init__(self, rows, seats_in_row, taken_seats, row_weight=1.0):
+        """
+        Args:
+            rows (int): The number of rows in the theatre hall.
+            seats_in_row (int): The number of seats in each row.
+            taken_seats (iterable): ``(row, seat)`` pairs already sold.
+            row_weight (float): How much a row away from the middle costs
+                compared to a seat away from the centre.
+        """
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.row_weight = row_weight
+        self.centre_seat = (seats_in_row + 1) / 2
+        self.middle_row = (rows + 1) / 2
+        self.free_runs = self._build_free_runs(taken_seats)
+
+    def _build_free_runs(self, taken_seats):
+        """Builds the ``{row: [(first_seat, length), ...]}`` free-run index"""
+        taken_by_row = defaultdict(list)
+        for row, seat in taken_seats:
+            taken_by_row[row].append(seat)
+
+        free_runs = {}
+        for row in range(1, self.rows + 1):
+            runs = []
+            first_free = 1
+            for seat in sorted(taken_by_row.get(row, ())):
+                if seat > first_free:
+                    runs.append((first_free, seat - first_free))
+                first_free = max(first_free, seat + 1)
+            if first_free <= self.seats_in_row:
+                runs.append(
+                    (first_free, self.seats_in_row - first_free + 1)
+                )
+            free_runs[row] = runs
+
+        return free_runs
+
+    def score(self, row, first_seat, count) -> float:
+        """Returns the score of a block, the lower the better"""
+        block_centre = first_seat + (count - 1) / 2
+        return (
+            abs(block_centre - self.centre_seat)
+            + self.row_weight * abs(row - self.middle_row)
+        )
+
+    def _best_start_in_run(self, run_start, run_length, count) -> int:
+        """Returns the most central first seat of a block inside a run"""
+        ideal_start = self.centre_seat - (count - 1) / 2
+        last_start = run_start + run_length - count
+        candidates = {
+            min(max(int(ideal_start), run_start), last_start),
+            min(max(int(ideal_start + 0.5), run_start), last_start),
+        }
+        return min(
+            candidates,
+            key=lambda start: (abs(start - ideal_start), start)
+        )
+
+    def find_block(self, count) -> list | None:
+        """
+        Finds the best block of ``count`` adjacent free seats in one row.
+
+        Rows are visited from the middle outwards, so the search stops as
+        soon as the row penalty alone cannot beat the best block found.
+
+        Args:
+            count (int): The number of adjacent seats to allocate.
+
+        Returns:
+            list | None: The ``(row, seat)`` pairs of the block, or None if
+                no row has ``count`` adjacent free seats.
+        """
+        if count < 1 or count > self.seats_in_row:
+            return None
+
+        best = None
+        rows_by_distance = sorted(
+            range(1, self.rows + 1),
+            key=lambda row: (abs(row - self.middle_row), row)
+        )
+        for row in rows_by_distance:
+            row_penalty = self.row_weight * abs(row - self.middle_row)
+            if best is not None and row_penalty > best[0]:
+                break
+
+            for run_start, run_length in self.free_runs[row]:
+                if run_length < count:
+                    continue
+                start = self._best_start_in_run(run_start, run_length, count)
+                candidate = (self.score(row, start, count), row, start)
+                if best is None or candidate < best:
+                    best = candidate
+
+        if best is None:
+            return None
+
+        _, row, start = best
+        return [(row, seat) for seat in range(start, start + count)]
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncDate
+
+from theatre.models import (
+    AnalyticsWatermark,
+    Performance,
+    PerformanceOccupancy,
+    Ticket,
+)
+
+TICKETS_WATERMARK = "tickets"
+
+
+def refresh_occupancy(full=False) -> int:
+    """
+    Brings the PerformanceOccupancy summary up to date.
+
+    Ticket ids are handed out before their booking commits, so a ticket
+    can appear below the ``tickets`` watermark after a refresh has moved
+    past it. A refresh therefore recounts the performances of the
+    tickets above the watermark and of the bookings made since
+    OCCUPANCY_RESCAN_WINDOW before the previous refresh. It costs in
+    proportion to the sales since the last one, and picks up deleted
+    tickets of those performances too. Other deleted tickets and changed
+    halls are picked up by a ``full`` refresh, which rebuilds the
+    summary from scratch.
+
+    Returns:
+        int: The change in the number of counted tickets.
+    """
+    with transaction.atomic():
+        watermark, created = (
+            AnalyticsWatermark.objects.select_for_update()
+            .get_or_create(name=TICKETS_WATERMARK)
+        )
+        if full:
+            PerformanceOccupancy.objects.all().delete()
+            watermark.last_id = 0
+
+        PerformanceOccupancy.objects.bulk_create(
+            [
+                PerformanceOccupancy(
+                    performance_id=performance["id"],
+                    capacity=performance["capacity"],
+                )
+                for performance in Performance.objects.filter(
+                    occupancy__isnull=True
+                ).values("id").annotate(
+                    capacity=(
+                        F("theatre_hall__rows")
+                        * F("theatre_hall__seats_in_row")
+                    )
+                )
+            ]
+        )
+
+        last_id = Ticket.objects.aggregate(last_id=Max("id"))["last_id"]
+        columns = ("performance_id", "show_month")
+        sold = (
+            Ticket.objects.filter(id__gt=watermark.last_id)
+            .values_list(*columns)
+            .order_by()
+        )
+        if not created and not full:
+            # bookings still running at the previous refresh
+            sold = sold.union(
+                Ticket.objects.filter(
+                    reservation__created_at__gte=(
+                        watermark.updated_at
+                        - settings.OCCUPANCY_RESCAN_WINDOW
+                    )
+                )
+                .values_list(*columns)
+                .order_by()
+            )
+        changed = set(sold)
+
+        counted = 0
+        if changed:
+            performance_ids = {performance_id for performance_id, _ in changed}
+            sales = dict(
+                Ticket.objects.filter(
+                    performance_id__in=performance_ids,
+                    show_month__in={show_month for _, show_month in changed},
+                )
+                .values("performance_id")
+                .annotate(sold=Count("id"))
+                .values_list("performance_id", "sold")
+                .order_by()
+            )
+            occupancies = list(
+                PerformanceOccupancy.objects.filter(
+                    performance_id__in=performance_ids
+                )
+            )
+            for occupancy in occupancies:
+                sold_seats = sales.get(occupancy.performance_id, 0)
+                counted += sold_seats - occupancy.sold_seats
+                occupancy.sold_seats = sold_seats
+            PerformanceOccupancy.objects.bulk_update(
+                occupancies, ["sold_seats"]
+            )
+
+        watermark.last_id = max(last_id or 0, watermark.last_id)
+        watermark.save()
+
+    return counted
+
+
+def occupancy_by(*fields, **expressions):
+    """
+    Aggregates the summary table by the given fields, so the cost depends
+    on the number of performances and not on the number of tickets.
+    """
+    return (
+        PerformanceOccupancy.objects.annotate(**expressions)
+        .values(*fields, *expressions)
+        .annotate(
+            performances=Count("pk"),
+            seats=Sum("capacity"),
+            sold=Sum("sold_seats"),
+        )
+        .order_by(*fields, *expressions)
+    )
+
+
+def occupancy_by_play():
+    return occupancy_by("performance__play", "performance__play__title")
+
+
+def occupancy_by_theatre_hall():
+    return occupancy_by(
+        "performance__theatre_hall",
+        "performance__theatre_hall__name"
+    )
+
+
+def occupancy_by_day():
+    return occupancy_by(day=TruncDate("performance__show_time"))
@@ -0,0 +1,117 @@
+from django.db import transaction
+
+from theatre.models import (
+    ArchivedPerformance,
+    ArchivedReservation,
+    ArchivedTicket,
+    Performance,
+    Reservation,
+    Ticket,
+)
+
+
+def archive_performance_batch(performance_ids) -> tuple:
+    """
+    Moves a batch of performances with their tickets and prop links into
+    the archive tables in one transaction. Reservations left without
+    tickets in the hot tables are moved as well.
+
+    Deleting the performances records a ``CatalogTombstone`` for each of
+    them, so the changes endpoint reports archived performances as
+    deleted: they are no longer part of the bookable catalogue.
+
+    Args:
+        performance_ids (list): Ids of the performances to archive.
+
+    Returns:
+        tuple: The number of archived performances and tickets.
+    """
+    with transaction.atomic():
+        performances = list(
+            Performance.objects.select_for_update(of=("self",))
+            .filter(id__in=performance_ids)
+            .select_related("play", "theatre_hall")
+            .prefetch_related("props")
+        )
+        tickets = list(
+            Ticket.objects.for_performances(performances)
+            .select_related("reservation")
+            .order_by()
+        )
+        reservations = {
+            ticket.reservation_id: ticket.reservation for ticket in tickets
+        }
+
+        ArchivedPerformance.objects.bulk_create(
+            [
+                ArchivedPerformance(
+                    id=performance.id,
+                    show_time=performance.show_time,
+                    play=performance.play,
+                    play_title=performance.play.title,
+                    theatre_hall_name=performance.theatre_hall.name,
+                    props=[prop.name for prop in performance.props.all()],
+                )
+                for performance in performances
+            ],
+            ignore_conflicts=True,
+        )
+        ArchivedReservation.objects.bulk_create(
+            [
+                ArchivedReservation(
+                    id=reservation.id,
+                    created_at=reservation.created_at,
+                    user_id=reservation.user_id,
+                )
+                for reservation in reservations.values()
+            ],
+            ignore_conflicts=True,
+        )
+        ArchivedTicket.objects.bulk_create(
+            [
+                ArchivedTicket(
+                    id=ticket.id,
+                    row=ticket.row,
+                    seat=ticket.seat,
+                    performance_id=ticket.performance_id,
+                    reservation_id=ticket.reservation_id,
+                )
+                for ticket in tickets
+            ],
+            ignore_conflicts=True,
+        )
+
+        # the tickets go first, on their partitions only, so deleting
+        # the performances finds none left to load and delete by id
+        Ticket.objects.delete_for_performances(performances)
+        Performance.objects.filter(
+            id__in=[performance.id for performance in performances]
+        ).delete()
+        Reservation.objects.filter(
+            id__in=reservations, tickets__isnull=True
+        ).delete()
+
+    return len(performances), len(tickets)
+
+
+def archive_performances(cutoff, batch_size=100) -> tuple:
+    """
+    Archives all performances shown before ``cutoff`` in batches of
+    ``batch_size`` performances, each batch in its own transaction.
+
+    Returns:
+        tuple: The number of archived performances and tickets.
+    """
+    archived_performances = archived_tickets = 0
+    while True:
+        performance_ids = list(
+            Performance.objects.filter(show_time__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not performance_ids:
+            return archived_performances, archived_tickets
+
+        performances, tickets = archive_performance_batch(performance_ids)
+        archived_performances += performances
+        archived_tickets += tickets
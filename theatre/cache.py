@@ -0,0 +1,296 @@
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread-safe, process-local least recently used cache.
+
+    Entries expire after ``timeout`` seconds, so values cached by one
+    worker process converge with changes made by another one.
+    """
+
+    def __init__(self, maxsize=1024, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, MISSING)
+            if entry is MISSING:
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        expires_at = (
+            time.monotonic() + self.timeout
+            if self.timeout is not None else None
+        )
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheStats:
+    """Hit and miss counters of a cache in this process"""
+
+    FIELDS = ("local_hits", "shared_hits", "misses", "refreshes", "coalesced")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            for field in self.FIELDS:
+                setattr(self, field, 0)
+
+    def add(self, field) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.local_hits + self.shared_hits + self.coalesced
+        total = hits + self.misses + self.refreshes
+        return hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            **{field: getattr(self, field) for field in self.FIELDS},
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class Flight:
+    """A computation other threads wait for instead of repeating it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TwoLevelCache:
+    """
+    A namespace of values cached in process memory (L1) in front of the
+    shared Django cache (L2, Redis in production, local memory in tests).
+
+    - L1 entries live ``local_timeout`` seconds, so a hot key costs no
+      network hop, and changes made by other processes show up after at
+      most that long.
+    - On a miss, one thread per process computes the value
+      (single-flight) and one process at a time, holding a lock in L2;
+      the others wait for its result.
+    - Values are refreshed before they expire with a probability growing
+      as the expiry approaches and with the time the value takes to
+      compute (XFetch), so a hot key does not expire for everyone at once.
+    - ``invalidate()`` bumps the namespace version kept in L2, which
+      orphans every entry of the namespace in all processes.
+    """
+
+    registry = {}
+
+    def __init__(
+        self,
+        namespace,
+        timeout=None,
+        local_timeout=None,
+        local_maxsize=1024,
+        beta=1.0,
+        lock_timeout=10,
+        cache_alias="default",
+    ):
+        self.namespace = namespace
+        self.timeout = (
+            timeout if timeout is not None else settings.CACHE_TIMEOUT
+        )
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.cache_alias = cache_alias
+        self.local = LRUCache(
+            maxsize=local_maxsize,
+            timeout=(
+                local_timeout if local_timeout is not None
+                else settings.CACHE_LOCAL_TIMEOUT
+            ),
+        )
+        self.stats = CacheStats()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        TwoLevelCache.registry[namespace] = self
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    def _version(self) -> int:
+        version = self.local.get(self._version_key)
+        if version is None:
+            version = self.shared.get_or_set(self._version_key, 1, None)
+            self.local.set(self._version_key, version)
+        return version
+
+    def _shared_key(self, version, key) -> str:
+        return f"{self.namespace}:{version}:{key}"
+
+    def get_or_set(self, key, compute, timeout=None):
+        """
+        Returns the cached value of ``key``, computing and storing it
+        with ``compute()`` when it is missing or due for a refresh.
+        Exceptions raised by ``compute`` are not cached.
+        """
+        version = self._version()
+        value = self.local.get((version, key), MISSING)
+        if value is not MISSING:
+            self.stats.add("local_hits")
+            return value
+
+        return self._single_flight(
+            (version, key),
+            lambda: self._load(version, key, compute, timeout)
+        )
+
+    def delete(self, key) -> None:
+        """
+        Drops one key. Other processes may keep serving it from L1
+        for up to ``local_timeout`` seconds.
+        """
+        version = self._version()
+        self.local.delete((version, key))
+        self.shared.delete(self._shared_key(version, key))
+
+    def invalidate(self) -> None:
+        """Drops every key of the namespace in all processes"""
+        try:
+            self.shared.incr(self._version_key)
+        except ValueError:
+            self.shared.set(self._version_key, 2, None)
+        self.local.clear()
+
+    def _single_flight(self, flight_key, load):
+        with self._flights_lock:
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            self.stats.add("coalesced")
+            return flight.value
+
+        try:
+            flight.value = load()
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[flight_key]
+            flight.done.set()
+        return flight.value
+
+    def _should_refresh(self, delta, expires_at) -> bool:
+        """XFetch: refresh early, more likely as the expiry gets closer"""
+        return (
+            time.time() - delta * self.beta * math.log(1 - random.random())
+            >= expires_at
+        )
+
+    def _load(self, version, key, compute, timeout):
+        shared_key = self._shared_key(version, key)
+        lock_key = f"{shared_key}:lock"
+        entry = self.shared.get(shared_key)
+
+        if entry is not None:
+            value, delta, expires_at = entry
+            if not self._should_refresh(delta, expires_at) or not (
+                self.shared.add(lock_key, 1, self.lock_timeout)
+            ):
+                self.stats.add("shared_hits")
+                self.local.set((version, key), value)
+                return value
+            self.stats.add("refreshes")
+        elif self.shared.add(lock_key, 1, self.lock_timeout):
+            self.stats.add("misses")
+        else:
+            value = self._wait_for(shared_key)
+            if value is not MISSING:
+                self.stats.add("coalesced")
+                self.local.set((version, key), value)
+                return value
+            self.stats.add("misses")
+
+        try:
+            value = self._compute(shared_key, compute, timeout)
+        finally:
+            self.shared.delete(lock_key)
+        self.local.set((version, key), value)
+        return value
+
+    def _wait_for(self, shared_key):
+        """Polls L2 for a value another process is computing"""
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            entry = self.shared.get(shared_key)
+            if entry is not None:
+                return entry[0]
+            delay = min(delay * 2, 0.5)
+        return MISSING
+
+    def _compute(self, shared_key, compute, timeout):
+        timeout = timeout if timeout is not None else self.timeout
+        started = time.time()
+        value = compute()
+        delta = time.time() - started
+        self.shared.set(
+            shared_key, (value, delta, time.time() + timeout), timeout
+        )
+        return value
+
+
+def cache_stats() -> dict:
+    """Returns the statistics of every two-level cache of this process"""
+    return {
+        namespace: cache.stats.as_dict()
+        for namespace, cache in TwoLevelCache.registry.items()
+    }
@@ -0,0 +1,82 @@
+from collections import namedtuple
+from heapq import merge
+from itertools import islice
+
+from django.db import connection, transaction
+
+from theatre.models import (
+    Actor,
+    CatalogTombstone,
+    Genre,
+    Performance,
+    Play,
+    TheatreHall,
+)
+
+Change = namedtuple("Change", ["change_seq", "model", "object_id", "instance"])
+
+
+def tracked_querysets() -> dict:
+    """The querysets of the ChangeTracked models by model name"""
+    return {
+        "actor": Actor.objects.all(),
+        "genre": Genre.objects.all(),
+        "play": Play.objects.prefetch_related("genres", "actors"),
+        "theatrehall": TheatreHall.objects.all(),
+        "performance": Performance.objects.all(),
+    }
+
+
+def changes_since(since, limit) -> tuple:
+    """
+    Returns the first ``limit`` catalogue changes numbered above
+    ``since``, in order, and whether more follow.
+
+    Every model and the tombstones are read with one index range scan
+    on ``change_seq`` each, so the cost grows with the number of
+    changes rather than with the size of the catalogue. A changed row
+    appears once, with its current values; a deleted one as a change
+    without an instance.
+
+    All the reads share one REPEATABLE READ snapshot, so a writer
+    committing between two of them cannot move the cursor past a
+    change that one of the earlier reads missed. Called inside a
+    transaction, the reads take the isolation level of that one.
+
+    Returns:
+        tuple: The list of Change and a bool telling if more follow.
+    """
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(savepoint=False):
+        if outermost:
+            # must come before the first query of the transaction
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"
+                )
+        streams = [
+            [
+                Change(instance.change_seq, model, instance.pk, instance)
+                for instance in queryset.filter(
+                    change_seq__gt=since
+                ).order_by("change_seq")[:limit + 1]
+            ]
+            for model, queryset in tracked_querysets().items()
+        ]
+        streams.append(
+            [
+                Change(
+                    tombstone.change_seq,
+                    tombstone.model,
+                    tombstone.object_id,
+                    None,
+                )
+                for tombstone in CatalogTombstone.objects.filter(
+                    change_seq__gt=since
+                ).order_by("change_seq")[:limit + 1]
+            ]
+        )
+
+    # change numbers are unique, instances are never compared
+    changes = list(islice(merge(*streams), limit + 1))
+    return changes[:limit], len(changes) > limit
@@ -0,0 +1,160 @@
+from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name=FIELDS_PARAM,
+        type=OpenApiTypes.STR,
+        description="Comma-separated fields to render, e.g. "
+        "`id,show_time,play.title`; all of them when omitted",
+    ),
+    OpenApiParameter(
+        name=EXPAND_PARAM,
+        type=OpenApiTypes.STR,
+        description="Comma-separated nested relations picked in `fields` "
+        "to render as objects instead of primary keys",
+    ),
+]
+
+
+def parse_paths(value) -> dict:
+    """Parses comma-separated dotted paths into a tree of dicts"""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+class Fieldset:
+    """
+    The fields of a serializer picked with ``?fields=`` and ``?expand=``.
+
+    ``None`` stands for all the fields, nested relations included, as
+    when the parameters are omitted. A nested relation picked without
+    subfields and not expanded has an empty fieldset: it is rendered as
+    primary keys.
+    """
+
+    def __init__(self, fields, expand):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return None
+        fields = request.query_params.get(FIELDS_PARAM)
+        if not fields:
+            return None
+        return cls(
+            parse_paths(fields),
+            parse_paths(request.query_params.get(EXPAND_PARAM, "")),
+        )
+
+    def includes(self, name) -> bool:
+        return name in self.fields
+
+    def nested(self, name):
+        """Returns the fieldset of a nested relation"""
+        subfields = self.fields.get(name)
+        if subfields:
+            return Fieldset(subfields, self.expand.get(name, {}))
+        if name in self.expand:
+            return None
+        return Fieldset({}, {})
+
+
+def wants(fieldset, path) -> bool:
+    """Tells whether the field at a dotted path is rendered"""
+    for name in path.split("."):
+        if fieldset is None:
+            return True
+        if not fieldset.includes(name):
+            return False
+        fieldset = fieldset.nested(name)
+    return True
+
+
+def expands(fieldset, path) -> bool:
+    """
+    Tells whether the relation at a dotted path is rendered as objects,
+    rather than primary keys or not at all.
+    """
+    for name in path.split("."):
+        if fieldset is None:
+            return True
+        if not fieldset.includes(name):
+            return False
+        fieldset = fieldset.nested(name)
+    return fieldset is None or bool(fieldset.fields)
+
+
+def collapse(field):
+    """Returns a read-only primary key field in place of a nested one"""
+    kwargs = {"read_only": True}
+    if field.source != field.field_name:
+        kwargs["source"] = field.source
+    if isinstance(field, serializers.ListSerializer):
+        kwargs["many"] = True
+    return serializers.PrimaryKeyRelatedField(**kwargs)
+
+
+class SparseFieldsetMixin:
+    """
+    Renders only the fields picked with ``?fields=`` and ``?expand=``,
+    read from the request by the outermost serializer and handed down
+    to the nested ones. Unknown names are ignored; the fields used for
+    input are left untouched.
+    """
+
+    @property
+    def fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            parent = self.parent
+            if isinstance(parent, serializers.ListSerializer):
+                parent = parent.parent
+            self._fieldset = (
+                Fieldset.from_request(self.context.get("request"))
+                if parent is None
+                else None
+            )
+        return self._fieldset
+
+    @property
+    def _readable_fields(self):
+        fieldset = self.fieldset
+        if fieldset is None:
+            return super()._readable_fields
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = [
+                self.pick(field, fieldset)
+                for field in super()._readable_fields
+                if fieldset.includes(field.field_name)
+            ]
+        return self._sparse_fields
+
+    def pick(self, field, fieldset):
+        """Returns the field to render for a picked field"""
+        nested = field
+        if isinstance(nested, serializers.ListSerializer):
+            nested = nested.child
+        if not isinstance(nested, serializers.BaseSerializer):
+            return field
+
+        nested_fieldset = fieldset.nested(field.field_name)
+        if nested_fieldset is not None and not nested_fieldset.fields:
+            collapsed = collapse(field)
+            collapsed.bind(field.field_name, self)
+            return collapsed
+        nested._fieldset = nested_fieldset
+        return field
+
+
+class SparseModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """The base of the theatre model serializers"""
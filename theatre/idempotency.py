@@ -0,0 +1,134 @@
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from theatre.models import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+def request_fingerprint(request) -> str:
+    """Returns a hash of the method, path and payload of a request"""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path} {payload}".encode()
+    ).hexdigest()
+
+
+def _claim_key(user, key, fingerprint, retry=True):
+    """
+    Returns the live record for the key, or stores a new in-progress one
+    leased for IDEMPOTENCY_KEY_LEASE. An expired record, be it a stored
+    response past its TTL or the lease of a request that never finished,
+    is dropped and the key is claimed again.
+
+    Returns:
+        tuple: The IdempotencyKey, or None when a concurrent duplicate
+        holds the key, and whether it was created by this call.
+    """
+    now = timezone.now()
+    records = IdempotencyKey.objects.filter(user=user, key=key)
+
+    record = records.first()
+    if record is not None:
+        if record.expires_at > now:
+            return record, False
+        records.filter(expires_at__lte=now).delete()
+
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + settings.IDEMPOTENCY_KEY_LEASE,
+            )
+    except IntegrityError:
+        # A concurrent duplicate claimed the key first
+        record = records.first()
+        if record is None and retry:
+            # and has released it since
+            return _claim_key(user, key, fingerprint, retry=False)
+        return record, False
+
+    return record, True
+
+
+def idempotent(view_method):
+    """
+    Makes a viewset action replay its stored response for a repeated
+    ``Idempotency-Key`` header instead of running again.
+
+    The first request with a key claims it through the unique
+    (user, key) constraint, so of several concurrent duplicates only one
+    executes and the others get 409 until it finishes. Exceptions (such as
+    validation errors) and server errors release the key, so the client
+    can retry. A request that never finishes (a killed worker) holds the
+    key only for IDEMPOTENCY_KEY_LEASE, after which a retry takes it over.
+    Reusing a key with a different payload is rejected with 422.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} is too long."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        record, created = _claim_key(request.user, key, fingerprint)
+
+        if not created:
+            if record is not None and record.fingerprint != fingerprint:
+                return Response(
+                    {
+                        "detail": f"{IDEMPOTENCY_KEY_HEADER} was already "
+                        f"used with a different request."
+                    },
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if record is None or record.status_code is None:
+                return Response(
+                    {
+                        "detail": f"A request with this "
+                        f"{IDEMPOTENCY_KEY_HEADER} is still being processed."
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response(
+                record.body,
+                status=record.status_code,
+                headers={"Idempotent-Replayed": "true"}
+            )
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            # a retry may have taken the key over once the lease expired,
+            # its record is then left alone
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code,
+                body=response.data,
+                expires_at=timezone.now() + settings.IDEMPOTENCY_KEY_TTL,
+            )
+
+        return response
+
+    return wrapper
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from theatre.archive import archive_performances
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Move past performances with their tickets to the archive tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ARCHIVE_PERFORMANCES_AFTER_DAYS,
+            help="Archive performances shown more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.ARCHIVE_BATCH_SIZE,
+            help="Number of performances archived per transaction",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        performances, tickets = archive_performances(
+            cutoff, options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {performances} performances "
+                f"and {tickets} tickets shown before {cutoff:%Y-%m-%d}"
+            )
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from theatre_service.schema import build_schema
+
+
+class Command(BaseCommand):
+    help = "Prebuild the OpenAPI schema served at /api/doc/"  # noqa: VNE003
+
+    def handle(self, *args, **options):
+        for path in build_schema():
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
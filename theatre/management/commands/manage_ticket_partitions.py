@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from theatre.models import show_month_of
+from theatre.partitions import (
+    add_months,
+    archive_partition,
+    create_partition,
+    monthly_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Create upcoming monthly ticket partitions and archive old ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.TICKET_PARTITION_MONTHS_AHEAD,
+            help="Number of future months to pre-create partitions for",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=settings.TICKET_PARTITION_RETAIN_MONTHS,
+            help="Archive partitions older than this many months",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write("Ticket partitioning requires PostgreSQL")
+            return
+
+        current_month = show_month_of(timezone.now())
+
+        for months in range(options["months_ahead"] + 1):
+            month = add_months(current_month, months)
+            if create_partition(month):
+                self.stdout.write(f"Created ticket partition for {month}")
+
+        if options["retain_months"] is not None:
+            cutoff = add_months(current_month, -options["retain_months"])
+            for month in sorted(monthly_partitions()):
+                if month < cutoff:
+                    name = archive_partition(month)
+                    self.stdout.write(f"Archived {month} tickets to {name}")
+
+        self.stdout.write(
+            self.style.SUCCESS("Ticket partitions are up to date")
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from theatre.analytics import refresh_occupancy
+
+
+class Command(BaseCommand):
+    help = "Refresh the precomputed occupancy analytics"  # noqa: VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild the summary instead of counting new tickets only",
+        )
+
+    def handle(self, *args, **options):
+        counted = refresh_occupancy(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Counted {counted} new tickets")
+        )
@@ -1,28 +1,57 @@
 import time
 from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds to wait before giving up",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="The database alias to wait for",
+        )
+
     def handle(self, *args, **options):
         """
         Handle the command.
 
-        This command is used in the docker-entrypoint.sh file to
-        wait for the database to be available before running the
-        collectstatic and runserver commands. If the database is not
-        available the command will wait a second and try again.
+        This command is used in the docker-compose commands to wait for
+        the database to be available before running the migrate and
+        server commands. It opens a connection and, while the database
+        is unavailable, tries again after a delay doubling up to
+        5 seconds.
+
+        Raises:
+            CommandError: If the database is still unavailable after
+                the timeout.
         """
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        connection = connections[options["database"]]
+        deadline = time.monotonic() + options["timeout"]
+        delay = 0.1
+        while True:
             try:
-                db_conn = connections["default"]
+                connection.ensure_connection()
+                break
             except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+                if time.monotonic() + delay > deadline:
+                    raise CommandError(
+                        f"Database unavailable after "
+                        f"{options['timeout']:g} seconds"
+                    )
+                self.stdout.write(
+                    f"Database unavailable, waiting {delay:g} seconds..."
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, 5)
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.9 on 2026-10-19 04:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('theatre', '0001_initial_squashed_0007_alter_prop_performance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.JSONField()),
+                ('partition', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('errors', models.JSONField(blank=True, null=True)),
+                ('reservation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request', to='theatre.reservation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['partition', 'status', 'id'], name='reservation_request_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-19 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0009_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='performance',
+            name='show_time',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,186 @@
+from django.db import migrations
+import theatre.models
+
+
+PARTITION_TICKET_SQL = [
+    "ALTER TABLE theatre_ticket RENAME TO theatre_ticket_old",
+    """
+    CREATE TABLE theatre_ticket (
+        id bigint NOT NULL,
+        "row" integer NOT NULL,
+        seat integer NOT NULL,
+        performance_id bigint NOT NULL,
+        reservation_id bigint NOT NULL,
+        show_month date NOT NULL
+    ) PARTITION BY RANGE (show_month)
+    """,
+    """
+    CREATE TABLE theatre_ticket_default
+    PARTITION OF theatre_ticket DEFAULT
+    """,
+    """
+    INSERT INTO theatre_ticket
+        (id, "row", seat, performance_id, reservation_id, show_month)
+    SELECT id, "row", seat, performance_id, reservation_id, show_month
+    FROM theatre_ticket_old
+    """,
+    "DROP TABLE theatre_ticket_old",
+    "CREATE SEQUENCE theatre_ticket_id_seq OWNED BY theatre_ticket.id",
+    """
+    ALTER TABLE theatre_ticket
+    ALTER COLUMN id SET DEFAULT nextval('theatre_ticket_id_seq')
+    """,
+    """
+    SELECT setval(
+        'theatre_ticket_id_seq', COALESCE(MAX(id), 0) + 1, false
+    ) FROM theatre_ticket
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_pkey PRIMARY KEY (id, show_month)
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_row_seat_performance_id_dbd2d049_uniq
+    UNIQUE ("row", seat, performance_id, show_month)
+    """,
+    """
+    CREATE INDEX theatre_ticket_performance_id_c3f8f9ab
+    ON theatre_ticket (performance_id)
+    """,
+    """
+    CREATE INDEX theatre_ticket_reservation_id_cec57d53
+    ON theatre_ticket (reservation_id)
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_performance_id_c3f8f9ab_fk_theatre_p
+    FOREIGN KEY (performance_id) REFERENCES theatre_performance (id)
+    DEFERRABLE INITIALLY DEFERRED
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_reservation_id_cec57d53_fk_theatre_r
+    FOREIGN KEY (reservation_id) REFERENCES theatre_reservation (id)
+    DEFERRABLE INITIALLY DEFERRED
+    """,
+]
+
+UNPARTITION_TICKET_SQL = [
+    "ALTER TABLE theatre_ticket RENAME TO theatre_ticket_old",
+    "ALTER SEQUENCE theatre_ticket_id_seq RENAME TO theatre_ticket_old_id_seq",
+    "ALTER INDEX theatre_ticket_pkey RENAME TO theatre_ticket_old_pkey",
+    """
+    ALTER INDEX theatre_ticket_row_seat_performance_id_dbd2d049_uniq
+    RENAME TO theatre_ticket_old_uniq
+    """,
+    """
+    ALTER INDEX theatre_ticket_performance_id_c3f8f9ab
+    RENAME TO theatre_ticket_old_performance_id
+    """,
+    """
+    ALTER INDEX theatre_ticket_reservation_id_cec57d53
+    RENAME TO theatre_ticket_old_reservation_id
+    """,
+    """
+    CREATE TABLE theatre_ticket (
+        id bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+        "row" integer NOT NULL,
+        seat integer NOT NULL,
+        performance_id bigint NOT NULL,
+        reservation_id bigint NOT NULL,
+        show_month date NOT NULL
+    )
+    """,
+    """
+    INSERT INTO theatre_ticket
+        (id, "row", seat, performance_id, reservation_id, show_month)
+    SELECT id, "row", seat, performance_id, reservation_id, show_month
+    FROM theatre_ticket_old
+    """,
+    """
+    SELECT setval(
+        pg_get_serial_sequence('theatre_ticket', 'id'),
+        COALESCE(MAX(id), 0) + 1,
+        false
+    ) FROM theatre_ticket
+    """,
+    "DROP TABLE theatre_ticket_old CASCADE",
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_pkey PRIMARY KEY (id)
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_row_seat_performance_id_dbd2d049_uniq
+    UNIQUE ("row", seat, performance_id)
+    """,
+    """
+    CREATE INDEX theatre_ticket_performance_id_c3f8f9ab
+    ON theatre_ticket (performance_id)
+    """,
+    """
+    CREATE INDEX theatre_ticket_reservation_id_cec57d53
+    ON theatre_ticket (reservation_id)
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_performance_id_c3f8f9ab_fk_theatre_p
+    FOREIGN KEY (performance_id) REFERENCES theatre_performance (id)
+    DEFERRABLE INITIALLY DEFERRED
+    """,
+    """
+    ALTER TABLE theatre_ticket
+    ADD CONSTRAINT theatre_ticket_reservation_id_cec57d53_fk_theatre_r
+    FOREIGN KEY (reservation_id) REFERENCES theatre_reservation (id)
+    DEFERRABLE INITIALLY DEFERRED
+    """,
+]
+
+
+def populate_show_month(apps, schema_editor):
+    Ticket = apps.get_model("theatre", "Ticket")
+    Performance = apps.get_model("theatre", "Performance")
+    for performance in Performance.objects.filter(
+        tickets__isnull=False
+    ).distinct():
+        Ticket.objects.filter(performance=performance).update(
+            show_month=theatre.models.show_month_of(performance.show_time)
+        )
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0010_index_show_time_and_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="show_month",
+            field=theatre.models.ShowMonthField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(populate_show_month, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="ticket",
+            name="show_month",
+            field=theatre.models.ShowMonthField(blank=True, editable=False),
+        ),
+        migrations.RunPython(
+            run_sql(PARTITION_TICKET_SQL),
+            run_sql(UNPARTITION_TICKET_SQL),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.9 on 2026-10-19 04:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('theatre', '0011_partition_ticket_by_show_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPerformance',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('show_time', models.DateTimeField()),
+                ('play_title', models.CharField(max_length=255)),
+                ('theatre_hall_name', models.CharField(max_length=255)),
+                ('props', models.JSONField(default=list)),
+                ('play', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_performances', to='theatre.play')),
+            ],
+            options={
+                'ordering': ['-show_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedReservation',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reservations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('row', models.IntegerField()),
+                ('seat', models.IntegerField()),
+                ('performance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='theatre.archivedperformance')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='theatre.archivedreservation')),
+            ],
+            options={
+                'ordering': ['row', 'seat'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.9 on 2026-10-19 04:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0012_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PerformanceOccupancy',
+            fields=[
+                ('performance', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='occupancy', serialize=False, to='theatre.performance')),
+                ('capacity', models.PositiveIntegerField()),
+                ('sold_seats', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,84 @@
+import datetime
+
+import django.contrib.postgres.constraints
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+import theatre.models
+
+
+def populate_end_time(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Performance.objects.update(end_time=models.F("show_time") + models.F("duration"))
+
+
+def check_overlapping_performances(apps, schema_editor):
+    """
+    Stops the migration with the list of performances sharing a theatre
+    hall at the same time, which the exclusion constraint cannot be
+    added over. They have to be moved or deleted first.
+    """
+    Performance = apps.get_model("theatre", "Performance")
+    overlapping = list(
+        Performance.objects.filter(
+            Exists(
+                Performance.objects.filter(
+                    theatre_hall=OuterRef("theatre_hall"),
+                    show_time__lt=OuterRef("end_time"),
+                    end_time__gt=OuterRef("show_time"),
+                ).exclude(pk=OuterRef("pk"))
+            )
+        )
+        .order_by("theatre_hall", "show_time")
+        .values_list("theatre_hall", "id", "show_time")
+    )
+    if overlapping:
+        raise RuntimeError(
+            "Performances overlapping another one in the same theatre hall "
+            "(theatre hall, performance, show time), move or delete them "
+            "before migrating: "
+            + ", ".join(
+                f"({hall}, {performance}, {show_time.isoformat()})"
+                for hall, performance, show_time in overlapping
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0013_occupancy_analytics"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name="performance",
+            name="duration",
+            field=models.DurationField(default=datetime.timedelta(seconds=7200)),
+        ),
+        migrations.AddField(
+            model_name="performance",
+            name="end_time",
+            field=theatre.models.EndTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_end_time, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="performance",
+            name="end_time",
+            field=theatre.models.EndTimeField(blank=True, editable=False),
+        ),
+        migrations.RunPython(
+            check_overlapping_performances, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="performance",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                expressions=[
+                    ("theatre_hall", "="),
+                    (theatre.models.TsTzRange("show_time", "end_time"), "&&"),
+                ],
+                name="performance_theatre_hall_no_overlap",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-19 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0014_performance_end_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performance',
+            name='waiting_room_rate',
+            field=models.PositiveIntegerField(blank=True, help_text='Users admitted to booking per minute through the waiting room, empty when the performance has no waiting room', null=True),
+        ),
+    ]
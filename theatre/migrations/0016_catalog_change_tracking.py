@@ -0,0 +1,159 @@
+# Generated by Django 4.2.9 on 2026-10-19 05:34
+
+from django.db import migrations, models
+
+TRACKED_TABLES = {
+    "actor": "theatre_actor",
+    "genre": "theatre_genre",
+    "play": "theatre_play",
+    "theatrehall": "theatre_theatrehall",
+    "performance": "theatre_performance",
+}
+# links whose changes are part of the rendered play
+PLAY_LINK_TABLES = ("theatre_play_genres", "theatre_play_actors")
+
+CHANGE_TRACKING_SQL = [
+    "CREATE SEQUENCE theatre_catalog_change_seq",
+    """
+    CREATE FUNCTION theatre_catalog_change() RETURNS trigger AS $$
+    BEGIN
+        -- one catalogue writer at a time, so the change numbers are
+        -- committed in order and a reader never skips a lower one
+        PERFORM pg_advisory_xact_lock(hashtext('theatre_catalog_change'));
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO theatre_catalogtombstone
+                (model, object_id, change_seq, deleted_at)
+            VALUES (
+                TG_ARGV[0],
+                OLD.id,
+                nextval('theatre_catalog_change_seq'),
+                now()
+            );
+            RETURN OLD;
+        END IF;
+        NEW.change_seq := nextval('theatre_catalog_change_seq');
+        NEW.updated_at := now();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE FUNCTION theatre_play_link_change() RETURNS trigger AS $$
+    BEGIN
+        UPDATE theatre_play SET change_seq = NULL
+        WHERE id = CASE WHEN TG_OP = 'DELETE'
+            THEN OLD.play_id ELSE NEW.play_id END;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+for model, table in TRACKED_TABLES.items():
+    CHANGE_TRACKING_SQL += [
+        f"""
+        CREATE TRIGGER {table}_change
+        BEFORE INSERT OR UPDATE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION theatre_catalog_change('{model}')
+        """,
+        f"""
+        CREATE TRIGGER {table}_delete
+        AFTER DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION theatre_catalog_change('{model}')
+        """,
+        # numbers the existing rows
+        f"UPDATE {table} SET change_seq = NULL",
+    ]
+for table in PLAY_LINK_TABLES:
+    CHANGE_TRACKING_SQL.append(
+        f"""
+        CREATE TRIGGER {table}_change
+        AFTER INSERT OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION theatre_play_link_change()
+        """
+    )
+
+DROP_CHANGE_TRACKING_SQL = [
+    *[
+        f"DROP TRIGGER {table}_change ON {table}"
+        for table in PLAY_LINK_TABLES
+    ],
+    *[
+        f"DROP TRIGGER {table}_{event} ON {table}"
+        for table in TRACKED_TABLES.values()
+        for event in ("change", "delete")
+    ],
+    "DROP FUNCTION theatre_play_link_change()",
+    "DROP FUNCTION theatre_catalog_change()",
+    "DROP SEQUENCE theatre_catalog_change_seq",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0015_performance_waiting_room_rate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=32)),
+                ('object_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField(unique=True)),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='actor',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='actor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='performance',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='performance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='play',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='play',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='theatrehall',
+            name='change_seq',
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='theatrehall',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunSQL(CHANGE_TRACKING_SQL, DROP_CHANGE_TRACKING_SQL),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.9 on 2026-10-19 05:38
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+# the same copies as PlayQuerySet.refresh_links()
+FILL_PLAY_LINKS_SQL = """
+UPDATE theatre_play SET
+    genre_ids = ARRAY(
+        SELECT genre_id FROM theatre_play_genres
+        WHERE play_id = theatre_play.id ORDER BY genre_id
+    ),
+    genre_names = ARRAY(
+        SELECT theatre_genre.name FROM theatre_play_genres
+        JOIN theatre_genre ON theatre_genre.id = genre_id
+        WHERE play_id = theatre_play.id ORDER BY genre_id
+    ),
+    actor_ids = ARRAY(
+        SELECT actor_id FROM theatre_play_actors
+        WHERE play_id = theatre_play.id ORDER BY actor_id
+    ),
+    actor_names = ARRAY(
+        SELECT theatre_actor.first_name || ' ' || theatre_actor.last_name
+        FROM theatre_play_actors
+        JOIN theatre_actor ON theatre_actor.id = actor_id
+        WHERE play_id = theatre_play.id ORDER BY actor_id
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0016_catalog_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='play',
+            name='actor_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='play',
+            name='actor_names',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='play',
+            name='genre_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='play',
+            name='genre_names',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='play',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['genre_ids'], name='theatre_play_genre_ids_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='play',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['actor_ids'], name='theatre_play_actor_ids_gin'),
+        ),
+        migrations.RunSQL(FILL_PLAY_LINKS_SQL, migrations.RunSQL.noop),
+    ]
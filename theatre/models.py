@@ -1,13 +1,46 @@
+import datetime
 import os
 import uuid
-
-from django.db import models
+from collections import namedtuple
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import (
+    ArrayField,
+    DateTimeRangeField,
+    RangeOperators,
+)
+from django.contrib.postgres.indexes import GinIndex
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.db.models.functions import Concat
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 from django.conf import settings
 
+from theatre.cache import LRUCache
+
+
+class ChangeTracked(models.Model):
+    """
+    A catalogue model mirrored by partner apps through the changes
+    endpoint. Database triggers stamp every written row with the next
+    number of the shared ``theatre_catalog_change_seq`` sequence and
+    record deleted rows as CatalogTombstone.
+    """
+
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(
+        null=True, editable=False, db_index=True
+    )
+
+    class Meta:
+        abstract = True
 
-class Actor(models.Model):
+
+class Actor(ChangeTracked):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
 
@@ -19,7 +52,7 @@ class Actor(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
-class Genre(models.Model):
+class Genre(ChangeTracked):
     name = models.CharField(max_length=255, unique=True)
 
     def __str__(self) -> str:
@@ -41,21 +74,86 @@ def play_image_file_path(instance: "Play", filename: str) -> str:
     return os.path.join("uploads/plays/", filename)
 
 
-class Play(models.Model):
+class PlayQuerySet(models.QuerySet):
+    def refresh_links(self) -> int:
+        """
+        Rewrites the genre and actor arrays of the plays from their
+        links with one statement, ordered by genre and actor id.
+        """
+        genres = Play.genres.through.objects.filter(
+            play_id=models.OuterRef("pk")
+        ).order_by("genre_id")
+        actors = Play.actors.through.objects.filter(
+            play_id=models.OuterRef("pk")
+        ).order_by("actor_id")
+        return self.update(
+            genre_ids=ArraySubquery(genres.values("genre_id")),
+            genre_names=ArraySubquery(genres.values("genre__name")),
+            actor_ids=ArraySubquery(actors.values("actor_id")),
+            # Actor.full_name
+            actor_names=ArraySubquery(
+                actors.values(
+                    full_name=Concat(
+                        "actor__first_name",
+                        models.Value(" "),
+                        "actor__last_name",
+                        output_field=models.TextField(),
+                    )
+                )
+            ),
+        )
+
+
+class Play(ChangeTracked):
     title = models.CharField(max_length=255)
     description = models.TextField()
     genres = models.ManyToManyField(Genre, blank=True)
     actors = models.ManyToManyField(Actor, blank=True)
     image = models.ImageField(null=True, upload_to=play_image_file_path)
+    # copies of the links for single-table lists and filters, written
+    # by PlayQuerySet.refresh_links() only
+    genre_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
+    genre_names = ArrayField(
+        models.TextField(), default=list, blank=True, editable=False
+    )
+    actor_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True, editable=False
+    )
+    actor_names = ArrayField(
+        models.TextField(), default=list, blank=True, editable=False
+    )
+
+    objects = PlayQuerySet.as_manager()
+
+    LINK_FIELDS = ("genre_ids", "genre_names", "actor_ids", "actor_names")
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            GinIndex(fields=["genre_ids"], name="theatre_play_genre_ids_gin"),
+            GinIndex(fields=["actor_ids"], name="theatre_play_actor_ids_gin"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Leaves the link arrays out of updates, so an instance loaded
+        before its links changed does not write stale copies back.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.LINK_FIELDS
+            ]
+        return super().save(*args, **kwargs)
+
 
-class TheatreHall(models.Model):
+class TheatreHall(ChangeTracked):
     name = models.CharField(max_length=255)
     rows = models.IntegerField()
     seats_in_row = models.IntegerField()
@@ -68,18 +166,161 @@ class TheatreHall(models.Model):
         return self.name
 
 
-class Performance(models.Model):
+DEFAULT_PERFORMANCE_DURATION = datetime.timedelta(hours=2)
+
+
+def parse_show_time(show_time) -> datetime.datetime:
+    """Returns a show time that may still be an unparsed string as datetime"""
+    if isinstance(show_time, str):
+        return parse_datetime(show_time)
+    return show_time
+
+
+class EndTimeField(models.DateTimeField):
+    """
+    End of a performance, always derived from its show time and duration
+    right before the performance is written.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = (
+            parse_show_time(model_instance.show_time)
+            + model_instance.duration
+        )
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class PerformanceQuerySet(models.QuerySet):
+    def overlapping(self, theatre_hall, start, end):
+        """Filters the performances in a hall running between start and end"""
+        return self.filter(
+            theatre_hall=theatre_hall,
+            show_time__lt=end,
+            end_time__gt=start
+        )
+
+    def with_tickets_available(self):
+        """Annotates the number of seats nobody has booked yet"""
+        return self.annotate(
+            tickets_available=(
+                models.F("theatre_hall__rows")
+                * models.F("theatre_hall__seats_in_row")
+                - models.Count("tickets")
+            )
+        )
+
+    def for_listing(self, tickets_available=True):
+        """
+        Loads only the columns PerformanceListSerializer renders, with
+        the available tickets unless they are not wanted, e.g. without
+        the play description.
+        """
+        queryset = self.select_related("play", "theatre_hall").only(
+            "id",
+            "show_time",
+            "play__title",
+            "play__image",
+            "theatre_hall__name",
+            "theatre_hall__rows",
+            "theatre_hall__seats_in_row",
+        )
+        if tickets_available:
+            queryset = queryset.with_tickets_available()
+        return queryset
+
+
+class Performance(ChangeTracked):
     play = models.ForeignKey(Play, on_delete=models.CASCADE)
     theatre_hall = models.ForeignKey(TheatreHall, on_delete=models.CASCADE)
-    show_time = models.DateTimeField()
+    show_time = models.DateTimeField(db_index=True)
+    duration = models.DurationField(default=DEFAULT_PERFORMANCE_DURATION)
+    end_time = EndTimeField(editable=False, blank=True)
+    waiting_room_rate = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Users admitted to booking per minute through the "
+        "waiting room, empty when the performance has no waiting room",
+    )
+
+    objects = PerformanceQuerySet.as_manager()
 
     class Meta:
         ordering = ["-show_time"]
+        constraints = [
+            ExclusionConstraint(
+                name="performance_theatre_hall_no_overlap",
+                expressions=[
+                    ("theatre_hall", RangeOperators.EQUAL),
+                    (
+                        TsTzRange("show_time", "end_time"),
+                        RangeOperators.OVERLAPS
+                    ),
+                ],
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.play} at {self.theatre_hall} at {self.show_time}"
 
 
+HallDimensions = namedtuple("HallDimensions", ["rows", "seats_in_row"])
+
+hall_dimensions_cache = LRUCache(
+    maxsize=settings.HALL_DIMENSIONS_CACHE_SIZE,
+    timeout=settings.HALL_DIMENSIONS_CACHE_TIMEOUT,
+)
+
+
+def performance_dimensions(performance_id) -> HallDimensions:
+    """
+    Returns the rows and seats in row of the theatre hall of a
+    performance, cached per process.
+
+    Entries are dropped by signals when a hall or the hall of a
+    performance changes, and expire after
+    ``HALL_DIMENSIONS_CACHE_TIMEOUT`` seconds for changes made elsewhere.
+    """
+    dimensions = hall_dimensions_cache.get(performance_id)
+    if dimensions is None:
+        dimensions = HallDimensions._make(
+            Performance.objects.filter(pk=performance_id).values_list(
+                "theatre_hall__rows", "theatre_hall__seats_in_row"
+            ).get()
+        )
+        hall_dimensions_cache.set(performance_id, dimensions)
+    return dimensions
+
+
+def loaded_performance_dimensions(performance) -> HallDimensions:
+    """
+    Returns the hall dimensions of a performance instance, read from its
+    theatre hall when it was loaded along with it, which also refreshes
+    the cache entry for the checks made when its tickets are saved.
+    """
+    if not Performance.theatre_hall.is_cached(performance):
+        return performance_dimensions(performance.pk)
+    dimensions = HallDimensions(
+        performance.theatre_hall.rows, performance.theatre_hall.seats_in_row
+    )
+    hall_dimensions_cache.set(performance.pk, dimensions)
+    return dimensions
+
+
+class CatalogTombstone(models.Model):
+    """A deleted ChangeTracked row, written by the change trigger"""
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField(unique=True)
+    deleted_at = models.DateTimeField()
+
+
 class Prop(models.Model):
     name = models.CharField(max_length=255)
     performance = models.ManyToManyField(
@@ -93,7 +334,7 @@ class Prop(models.Model):
 
 
 class Reservation(models.Model):
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
@@ -106,6 +347,265 @@ class Reservation(models.Model):
         return str(self.created_at)
 
 
+class ArchivedReservation(models.Model):
+    """
+    A reservation moved out of the hot tables because its tickets
+    belong to archived performances. Keeps the original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)  # noqa: VNE003
+    created_at = models.DateTimeField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_reservations"
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return str(self.created_at)
+
+
+class ArchivedPerformance(models.Model):
+    """
+    A snapshot of a past performance, its play, hall and props.
+    Keeps the original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)  # noqa: VNE003
+    show_time = models.DateTimeField()
+    play = models.ForeignKey(
+        Play,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_performances"
+    )
+    play_title = models.CharField(max_length=255)
+    theatre_hall_name = models.CharField(max_length=255)
+    props = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ["-show_time"]
+
+    def __str__(self) -> str:
+        return f"{self.play_title} at {self.theatre_hall_name} " \
+               f"at {self.show_time}"
+
+
+class ArchivedTicket(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # noqa: VNE003
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    performance = models.ForeignKey(
+        ArchivedPerformance,
+        on_delete=models.CASCADE,
+        related_name="tickets"
+    )
+    reservation = models.ForeignKey(
+        ArchivedReservation,
+        on_delete=models.CASCADE,
+        related_name="tickets"
+    )
+
+    class Meta:
+        ordering = ["row", "seat"]
+
+    def __str__(self) -> str:
+        return f"{str(self.performance)} (row: {self.row}, seat: {self.seat})"
+
+
+class PerformanceOccupancy(models.Model):
+    """
+    Precomputed sales summary of a performance, recounted for the
+    performances sold since the ``tickets`` analytics watermark.
+    """
+
+    performance = models.OneToOneField(
+        Performance,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="occupancy"
+    )
+    capacity = models.PositiveIntegerField()
+    sold_seats = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.performance}: {self.sold_seats}/{self.capacity}"
+
+
+class AnalyticsWatermark(models.Model):
+    """The id of the last row included in an analytics summary"""
+
+    name = models.CharField(max_length=64, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.last_id}"
+
+
+class ReservationRequest(models.Model):
+    """
+    A reservation submitted in async booking mode, waiting to be applied
+    by a Celery worker of its performance partition.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        DONE = "done"
+        FAILED = "failed"
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    payload = models.JSONField()
+    partition = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    reservation = models.OneToOneField(
+        "Reservation",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="request"
+    )
+    errors = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["partition", "status", "id"],
+                name="reservation_request_queue_idx"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.status} request {self.id} ({self.created_at})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The stored outcome of a request made with an ``Idempotency-Key``
+    header. ``status_code`` stays empty while the first request with
+    the key is still being processed; ``expires_at`` is then the end of
+    its lease rather than of the replay window.
+    """
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ["user", "key"]
+
+    def __str__(self) -> str:
+        return self.key
+
+
+def show_month_of(show_time) -> datetime.date:
+    """
+    Returns the first day of the month of a show time in UTC,
+    the partition key of the tickets of a performance.
+    """
+    show_time = parse_show_time(show_time)
+    if timezone.is_aware(show_time):
+        show_time = show_time.astimezone(datetime.timezone.utc)
+    return show_time.date().replace(day=1)
+
+
+class ShowMonthField(models.DateField):
+    """
+    Ticket partition key, always derived from the show time of the
+    ticket's performance right before the ticket is written.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = show_month_of(model_instance.performance.show_time)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class TicketQuerySet(models.QuerySet):
+    def for_performance(self, performance):
+        """
+        Filters the tickets of a performance by the partition key too,
+        so PostgreSQL only scans the partition of its show month.
+        """
+        return self.filter(
+            performance=performance,
+            show_month=show_month_of(performance.show_time)
+        )
+
+    def for_performances(self, performances):
+        """
+        Filters the tickets of several performances by the partition key
+        too, so PostgreSQL only scans the partitions of their show months.
+        """
+        return self.filter(
+            performance__in=performances,
+            show_month__in={
+                show_month_of(performance.show_time)
+                for performance in performances
+            }
+        )
+
+    def delete_for_performance(self, performance) -> int:
+        """
+        Deletes the tickets of a performance with one statement on the
+        partition of its show month, without loading them or sending
+        the deletion signals.
+
+        Returns:
+            int: The number of deleted tickets.
+        """
+        return self.delete_for_performances([performance])
+
+    def delete_for_performances(self, performances) -> int:
+        """
+        Deletes the tickets of several performances with one statement
+        on the partitions of their show months, like
+        ``delete_for_performance``.
+
+        Returns:
+            int: The number of deleted tickets.
+        """
+        if not performances:
+            return 0
+
+        connection = connections[self.db]
+        opts = self.model._meta
+        with connection.cursor() as cursor:
+            # a ticket is always in the show month of its performance
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(opts.db_table)} "
+                f"WHERE {opts.get_field('performance').column} = ANY(%s) "
+                f"AND {opts.get_field('show_month').column} = ANY(%s)",
+                [
+                    [performance.pk for performance in performances],
+                    list({
+                        show_month_of(performance.show_time)
+                        for performance in performances
+                    }),
+                ],
+            )
+            return cursor.rowcount
+
+
 class Ticket(models.Model):
     row = models.IntegerField()
     seat = models.IntegerField()
@@ -119,6 +619,9 @@ class Ticket(models.Model):
         on_delete=models.CASCADE,
         related_name="tickets"
     )
+    show_month = ShowMonthField(editable=False, blank=True)
+
+    objects = TicketQuerySet.as_manager()
 
     class Meta:
         unique_together = ["row", "seat", "performance"]
@@ -133,7 +636,8 @@ class Ticket(models.Model):
         Args:
             row (int): The row number of the ticket.
             seat (int): The seat number of the ticket.
-            theatre_hall (TheatreHall): The theatre Hall associated with the ticket.
+            theatre_hall (TheatreHall | HallDimensions): The theatre Hall
+                associated with the ticket.
             error_to_raise (Exception): The exception to raise if the ticket's
                 row or seat number is out of range.
 
@@ -166,7 +670,7 @@ class Ticket(models.Model):
         Ticket.validate_ticket(
             self.row,
             self.seat,
-            self.performance.theatre_hall,
+            performance_dimensions(self.performance_id),
             ValidationError,
         )
 
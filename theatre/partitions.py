@@ -0,0 +1,94 @@
+import datetime
+
+from django.db import connection, transaction
+
+from theatre.models import Ticket
+
+TICKET_TABLE = Ticket._meta.db_table
+DEFAULT_PARTITION = f"{TICKET_TABLE}_default"
+
+
+def add_months(month, months) -> datetime.date:
+    """Returns the first day of the month ``months`` after ``month``"""
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month) -> str:
+    return f"{TICKET_TABLE}_p{month:%Y_%m}"
+
+
+def archive_name(month) -> str:
+    return f"{TICKET_TABLE}_archive_{month:%Y_%m}"
+
+
+def monthly_partitions() -> dict:
+    """Returns ``{month: table name}`` of the attached monthly partitions"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [TICKET_TABLE],
+        )
+        names = [name for name, in cursor.fetchall()]
+
+    prefix = f"{TICKET_TABLE}_p"
+    return {
+        datetime.datetime.strptime(name[len(prefix):], "%Y_%m").date(): name
+        for name in names
+        if name.startswith(prefix)
+    }
+
+
+def create_partition(month) -> bool:
+    """
+    Creates and attaches the partition of a month, moving the month's
+    tickets out of the default partition first.
+
+    Returns:
+        bool: False if the partition already existed.
+    """
+    if month in monthly_partitions():
+        return False
+
+    name = partition_name(month)
+    bounds = [month, add_months(month, 1)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {name} "
+            f"(LIKE {TICKET_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE show_month >= %s AND show_month < %s RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved",
+            bounds,
+        )
+        cursor.execute(
+            f"ALTER TABLE {TICKET_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+    return True
+
+
+def archive_partition(month) -> str:
+    """
+    Detaches the partition of a month and renames it to an archive table,
+    so its tickets no longer take part in queries on the ticket table.
+
+    Returns:
+        str: The name of the archive table.
+    """
+    name = archive_name(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {TICKET_TABLE} "
+            f"DETACH PARTITION {partition_name(month)}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {partition_name(month)} RENAME TO {name}"
+        )
+    return name
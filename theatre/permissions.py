@@ -1,5 +1,7 @@
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
+from theatre.waiting_room import TOKEN_HEADER, is_admitted
+
 
 class IsAdminOrIfAuthenticatedReadOnly(BasePermission):
     def has_permission(self, request, view):
@@ -11,3 +13,30 @@ class IsAdminOrIfAuthenticatedReadOnly(BasePermission):
             )
             or (request.user and request.user.is_staff)
         )
+
+
+class HasWaitingRoomAdmission(BasePermission):
+    """
+    Lets a booking through only with an admitted waiting room token for
+    every requested performance that has a waiting room. It runs before
+    the view, so rejected requests cost no database work.
+    """
+
+    message = (
+        f"Booking this performance requires an admitted waiting room "
+        f"token in the {TOKEN_HEADER} header."
+    )
+
+    def has_permission(self, request, view):
+        if request.method != "POST":
+            return True
+
+        tokens = [
+            token.strip()
+            for token in request.headers.get(TOKEN_HEADER, "").split(",")
+            if token.strip()
+        ]
+        return all(
+            is_admitted(tokens, performance_id, request.user.id)
+            for performance_id in view.requested_performance_ids()
+        )
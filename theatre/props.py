@@ -0,0 +1,57 @@
+from theatre.models import Prop
+
+PerformanceProp = Prop.performance.through
+
+
+def resolve_props(names) -> list:
+    """
+    Returns a prop for every name, creating the missing ones.
+
+    Existing props are looked up with one query and the missing ones
+    are inserted with one bulk insert. Props are not unique by name, so
+    the oldest prop with a name is reused. Two concurrent calls can both
+    insert a missing name; each links its own copy, and later calls
+    reuse the older one.
+    """
+    names = list(dict.fromkeys(names))
+    props = {}
+    for prop in Prop.objects.filter(name__in=names).order_by("id"):
+        props.setdefault(prop.name, prop)
+
+    missing = [Prop(name=name) for name in names if name not in props]
+    for prop in Prop.objects.bulk_create(missing):
+        props[prop.name] = prop
+
+    return [props[name] for name in names]
+
+
+def assign_props(performance_ids, props) -> None:
+    """
+    Makes ``props`` the prop set of every given performance.
+
+    Only the difference is written to the through table: links to other
+    props are deleted with one query and the missing links are inserted
+    with one bulk insert, so the number of queries does not depend on the
+    number of props or performances. Links inserted by a concurrent call
+    in the meantime are skipped.
+    """
+    prop_ids = {prop.id for prop in props}
+
+    PerformanceProp.objects.filter(
+        performance_id__in=performance_ids
+    ).exclude(prop_id__in=prop_ids).delete()
+
+    linked = set(
+        PerformanceProp.objects.filter(
+            performance_id__in=performance_ids
+        ).values_list("performance_id", "prop_id")
+    )
+    PerformanceProp.objects.bulk_create(
+        [
+            PerformanceProp(performance_id=performance_id, prop_id=prop_id)
+            for performance_id in performance_ids
+            for prop_id in prop_ids
+            if (performance_id, prop_id) not in linked
+        ],
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,70 @@
+from itertools import islice
+
+from dateutil.rrule import rrulestr
+
+from theatre.models import Performance
+
+MAX_SCHEDULED_PERFORMANCES = 1000
+
+
+def expand_recurrence(rule, start, limit=MAX_SCHEDULED_PERFORMANCES) -> list:
+    """
+    Returns the show times of an RFC 5545 recurrence rule such as
+    ``FREQ=WEEKLY;BYDAY=FR,SA;COUNT=20`` starting at ``start``.
+
+    At most ``limit + 1`` occurrences are expanded, so an unbounded rule
+    can be detected without iterating it forever.
+
+    Raises:
+        ValueError: If the rule cannot be parsed.
+    """
+    return list(islice(rrulestr(rule, dtstart=start), limit + 1))
+
+
+def find_conflicts(theatre_hall, show_times, duration) -> list:
+    """
+    Finds the new shows that overlap an existing performance in the hall
+    or another show of the same series.
+
+    Existing performances are loaded with one query over the window of
+    the series. Both interval lists are sorted and the existing ones never
+    overlap each other (the exclusion constraint guarantees it), so a
+    single sweep over them finds every conflict.
+
+    Args:
+        theatre_hall (TheatreHall): The hall of the series.
+        show_times (list): Sorted start times of the new shows.
+        duration (timedelta): The duration of every show.
+
+    Returns:
+        list: ``(show_time, performance id)`` pairs, the id is None when
+            the show overlaps the previous show of the series.
+    """
+    if not show_times:
+        return []
+
+    existing = list(
+        Performance.objects.overlapping(
+            theatre_hall,
+            show_times[0],
+            show_times[-1] + duration
+        )
+        .order_by("show_time")
+        .values_list("id", "show_time", "end_time")
+    )
+
+    conflicts = []
+    index = 0
+    previous_end = None
+    for show_time in show_times:
+        end_time = show_time + duration
+        if previous_end is not None and show_time < previous_end:
+            conflicts.append((show_time, None))
+        previous_end = end_time
+
+        while index < len(existing) and existing[index][2] <= show_time:
+            index += 1
+        if index < len(existing) and existing[index][1] < end_time:
+            conflicts.append((show_time, existing[index][0]))
+
+    return conflicts
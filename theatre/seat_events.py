@@ -0,0 +1,358 @@
+import asyncio
+import concurrent.futures
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from theatre.models import Performance, Ticket
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "theatre:seats:"
+SEATS_TAKEN = "seats-taken"
+SEATS_RELEASED = "seats-released"
+
+
+def channel_name(performance_id) -> str:
+    return f"{CHANNEL_PREFIX}{performance_id}"
+
+
+def format_event(event, data) -> bytes:
+    """Encodes one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class Subscription:
+    """
+    The queue of encoded events of one connected client, read on the
+    event loop of its connection.
+
+    A client that falls ``maxsize`` events behind is closed rather than
+    buffered without limit; it reconnects and starts from a new snapshot.
+    """
+
+    def __init__(self, performance_id, loop, maxsize):
+        self.performance_id = performance_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def put(self, frame) -> None:
+        """Queues a frame, must be called on the loop of the subscription"""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self) -> None:
+        """Ends the stream, must be called on the loop of the subscription"""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self):
+        """Returns the next frame, None once the subscription is closed"""
+        return await self.queue.get()
+
+
+class Feed:
+    """The taken seats and the subscribers of one performance"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.taken = None
+        self.loading = None
+        self.pending = []
+
+    def apply(self, event, seats) -> None:
+        if self.taken is None:
+            if self.loading is not None:
+                self.pending.append((event, seats))
+            return
+        if event == SEATS_TAKEN:
+            self.taken.update(seats)
+        else:
+            self.taken.difference_update(seats)
+
+
+def load_taken_seats(performance_id) -> set:
+    """
+    Raises:
+        Performance.DoesNotExist: If there is no such performance.
+    """
+    performance = Performance.objects.only("show_time").get(
+        pk=performance_id
+    )
+    return set(
+        Ticket.objects.for_performance(performance).values_list(
+            "row", "seat"
+        )
+    )
+
+
+class SeatHub:
+    """
+    Fans the seat events received by this process out to its connected
+    clients.
+
+    The taken seats of a performance are loaded once per process, when
+    its first client connects, and then kept up to date from the events,
+    so neither connecting clients nor events query the database per
+    client. Each event is encoded once and the same bytes are queued
+    for every subscriber, with one wake-up per event loop.
+    """
+
+    def __init__(self):
+        self._feeds = defaultdict(Feed)
+        self._lock = threading.Lock()
+
+    async def subscribe(self, performance_id):
+        """
+        Registers a client of the performance.
+
+        Returns:
+            tuple: The subscription and the sorted taken seats the events
+            of the subscription apply to.
+
+        Raises:
+            Performance.DoesNotExist: If there is no such performance.
+        """
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(
+            performance_id, loop, settings.SEAT_STREAM_QUEUE_SIZE
+        )
+        with self._lock:
+            feed = self._feeds[performance_id]
+            feed.subscribers.add(subscription)
+            if feed.taken is not None:
+                return subscription, sorted(feed.taken)
+            leader = feed.loading is None
+            if leader:
+                feed.loading = concurrent.futures.Future()
+            loading = feed.loading
+
+        try:
+            if leader:
+                await self._load(feed, performance_id)
+            else:
+                await asyncio.wrap_future(loading)
+        except BaseException:
+            self.unsubscribe(subscription)
+            raise
+
+        with self._lock:
+            return subscription, sorted(feed.taken)
+
+    async def _load(self, feed, performance_id) -> None:
+        loading = feed.loading
+        try:
+            taken = await sync_to_async(load_taken_seats)(performance_id)
+        except BaseException as error:
+            with self._lock:
+                feed.loading = None
+                feed.pending = []
+            loading.set_exception(error)
+            raise
+
+        with self._lock:
+            feed.taken = taken
+            for event, seats in feed.pending:
+                feed.apply(event, seats)
+            feed.loading = None
+            feed.pending = []
+        loading.set_result(None)
+
+    def unsubscribe(self, subscription) -> None:
+        """Forgets a client, and the performance with its last client"""
+        with self._lock:
+            feed = self._feeds.get(subscription.performance_id)
+            if feed is None:
+                return
+            feed.subscribers.discard(subscription)
+            if not feed.subscribers and feed.loading is None:
+                del self._feeds[subscription.performance_id]
+
+    def dispatch(self, message) -> None:
+        """
+        Applies a published message to the taken seats and queues it for
+        the subscribers of its performance. Safe to call from any thread.
+        """
+        performance_id = message["performance"]
+        seats = [tuple(seat) for seat in message["seats"]]
+        with self._lock:
+            feed = self._feeds.get(performance_id)
+            if feed is None:
+                return
+            feed.apply(message["event"], seats)
+            by_loop = defaultdict(list)
+            for subscription in feed.subscribers:
+                by_loop[subscription.loop].append(subscription)
+
+        frame = format_event(
+            message["event"],
+            {"performance": performance_id, "seats": message["seats"]}
+        )
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(fan_out, subscriptions, frame)
+            except RuntimeError:
+                # the loop of these connections has been closed
+                pass
+
+    def reset(self) -> None:
+        """
+        Ends every stream of the process, e.g. after messages may have
+        been lost; the clients reconnect and get a fresh snapshot.
+        """
+        with self._lock:
+            feeds, self._feeds = self._feeds, defaultdict(Feed)
+        for feed in feeds.values():
+            for subscription in feed.subscribers:
+                try:
+                    subscription.loop.call_soon_threadsafe(
+                        subscription.close
+                    )
+                except RuntimeError:
+                    pass
+
+
+def fan_out(subscriptions, frame) -> None:
+    for subscription in subscriptions:
+        subscription.put(frame)
+
+
+class InProcessBroker:
+    """
+    Delivers messages to the clients of the publishing process only.
+    Used when no Redis is configured, e.g. in development and tests.
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, message) -> None:
+        self.hub.dispatch(message)
+
+    def start(self, timeout=None) -> bool:
+        return True
+
+
+class RedisBroker:
+    """
+    Publishes messages on Redis channels. Each process serving streams
+    keeps one pattern subscription to all the seat channels, read by
+    a background thread that hands the messages to the hub.
+
+    Snapshots must only be loaded while the subscription is confirmed by
+    Redis, otherwise a booking committed before it would be missing from
+    both the snapshot and the events; ``start()`` waits for it.
+    """
+
+    def __init__(self, hub, url):
+        import redis
+
+        self.hub = hub
+        self.client = redis.Redis.from_url(url)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._subscribed = threading.Event()
+
+    def publish(self, message) -> None:
+        self.client.publish(
+            channel_name(message["performance"]), json.dumps(message)
+        )
+
+    def start(self, timeout=None) -> bool:
+        """
+        Starts the listener thread if needed and waits up to ``timeout``
+        seconds for its subscription to be active.
+
+        Returns:
+            bool: Whether the subscription is active.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen, name="seat-events", daemon=True
+                )
+                self._thread.start()
+        return self._subscribed.wait(timeout)
+
+    def _listen(self) -> None:
+        delay = 0.1
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                for item in pubsub.listen():
+                    if item["type"] == "pmessage":
+                        self.hub.dispatch(json.loads(item["data"]))
+                    elif item["type"] == "psubscribe":
+                        delay = 0.1
+                        self._subscribed.set()
+            except Exception:
+                logger.exception("Lost the seat events subscription")
+            finally:
+                pubsub.close()
+            # messages published in the meantime are lost
+            self._subscribed.clear()
+            self.hub.reset()
+            time.sleep(delay)
+            delay = min(delay * 2, 5)
+
+
+hub = SeatHub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if settings.SEAT_EVENTS_REDIS_URL:
+                _broker = RedisBroker(hub, settings.SEAT_EVENTS_REDIS_URL)
+            else:
+                _broker = InProcessBroker(hub)
+        return _broker
+
+
+def publish_seats(performance_id, event, seats) -> None:
+    """
+    Publishes taken or released seats of a performance. Failures are
+    logged only: the change is already committed and clients recover
+    with the snapshot sent on reconnect.
+    """
+    message = {
+        "performance": performance_id,
+        "event": event,
+        "seats": [list(seat) for seat in seats],
+    }
+    try:
+        get_broker().publish(message)
+    except Exception:
+        logger.exception("Could not publish seat events")
+
+
+def publish_on_commit(tickets, event) -> None:
+    """
+    Publishes the seats of the tickets once the current transaction
+    commits, one message per performance.
+    """
+    seats = defaultdict(list)
+    for ticket in tickets:
+        seats[ticket.performance_id].append((ticket.row, ticket.seat))
+    for performance_id, performance_seats in seats.items():
+        transaction.on_commit(
+            partial(publish_seats, performance_id, event, performance_seats)
+        )
@@ -1,46 +1,71 @@
-from django.db import transaction
-from rest_framework import serializers
+import datetime
+import operator
+from collections import defaultdict
+from functools import reduce
 
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+from drf_spectacular.utils import extend_schema_field
+
+from theatre.allocation import SeatAllocator
+from theatre.fieldsets import SparseModelSerializer
+from theatre.props import assign_props, resolve_props
+from theatre.scheduling import (
+    MAX_SCHEDULED_PERFORMANCES,
+    expand_recurrence,
+    find_conflicts,
+)
+from theatre.seat_events import SEATS_TAKEN, publish_on_commit
 from theatre.models import (
     Actor,
+    ArchivedPerformance,
+    ArchivedReservation,
+    ArchivedTicket,
     Genre,
     Play,
     Performance,
+    PerformanceOccupancy,
     Prop,
     Reservation,
+    ReservationRequest,
     TheatreHall,
-    Ticket
+    Ticket,
+    loaded_performance_dimensions,
+    show_month_of,
 )
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(SparseModelSerializer):
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseModelSerializer):
     class Meta:
         model = Genre
         fields = ("id", "name")
 
 
-class PlaySerializer(serializers.ModelSerializer):
+class PlaySerializer(SparseModelSerializer):
     class Meta:
         model = Play
         fields = ("id", "title", "description", "genres", "actors")
 
 
-class PlayListSerializer(serializers.ModelSerializer):
-    genres = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="name"
+class PlayListSerializer(SparseModelSerializer):
+    genres = serializers.ListField(
+        source="genre_names",
+        child=serializers.CharField(),
+        read_only=True
     )
-    actors = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="full_name",
+    actors = serializers.ListField(
+        source="actor_names",
+        child=serializers.CharField(),
+        read_only=True
     )
 
     class Meta:
@@ -55,7 +80,7 @@ class PlayListSerializer(serializers.ModelSerializer):
         )
 
 
-class PlayDetailSerializer(serializers.ModelSerializer):
+class PlayDetailSerializer(SparseModelSerializer):
     genres = GenreSerializer(many=True, read_only=True)
     actors = ActorSerializer(many=True, read_only=True)
 
@@ -71,25 +96,189 @@ class PlayDetailSerializer(serializers.ModelSerializer):
         )
 
 
-class PlayImageSerializer(serializers.ModelSerializer):
+class PlayImageSerializer(SparseModelSerializer):
     class Meta:
         model = Play
         fields = ("id", "image")
 
 
-class TheatreHallSerializer(serializers.ModelSerializer):
+class TheatreHallSerializer(SparseModelSerializer):
     class Meta:
         model = TheatreHall
         fields = ("id", "name", "rows", "seats_in_row", "capacity")
 
 
-class PerformanceSerializer(serializers.ModelSerializer):
+def validate_theatre_hall_is_free(attrs, instance=None) -> None:
+    """
+    Checks that no other performance takes place in the theatre hall
+    while the created or updated performance runs.
+
+    Raises:
+        ValidationError: If the performance overlaps another one.
+    """
+    theatre_hall = attrs.get(
+        "theatre_hall", getattr(instance, "theatre_hall", None)
+    )
+    show_time = attrs.get("show_time", getattr(instance, "show_time", None))
+    duration = attrs.get(
+        "duration",
+        getattr(instance, "duration", Performance.duration.field.default)
+    )
+    if theatre_hall is None or show_time is None:
+        return
+
+    overlapping = Performance.objects.overlapping(
+        theatre_hall, show_time, show_time + duration
+    )
+    if instance is not None:
+        overlapping = overlapping.exclude(pk=instance.pk)
+
+    if overlapping.exists():
+        raise theatre_hall_occupied()
+
+
+def theatre_hall_occupied() -> serializers.ValidationError:
+    """The error of a performance overlapping another one in its hall"""
+    return serializers.ValidationError(
+        {
+            "show_time": "The theatre hall is occupied by another "
+            "performance at this time"
+        }
+    )
+
+
+class TheatreHallConstraintMixin:
+    """
+    Saves performances in a savepoint and answers 400 instead of 500
+    when the exclusion constraint rejects a performance that overlaps
+    one written concurrently, after ``validate_theatre_hall_is_free``
+    passed.
+    """
+
+    overlap_constraint = "performance_theatre_hall_no_overlap"
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            diag = getattr(error.__cause__, "diag", None)
+            constraint = getattr(diag, "constraint_name", None)
+            if constraint != self.overlap_constraint:
+                raise
+            raise theatre_hall_occupied()
+
+
+class PerformanceSerializer(TheatreHallConstraintMixin, SparseModelSerializer):
     class Meta:
         model = Performance
-        fields = ("id", "show_time", "play", "theatre_hall")
+        fields = (
+            "id",
+            "show_time",
+            "play",
+            "theatre_hall",
+            "duration",
+            "waiting_room_rate",
+        )
+
+    def validate(self, attrs):
+        data = super(PerformanceSerializer, self).validate(attrs=attrs)
+        validate_theatre_hall_is_free(attrs, self.instance)
+        return data
+
 
+class WaitingRoomSerializer(serializers.Serializer):
+    token = serializers.CharField(read_only=True)
+    admitted = serializers.BooleanField(read_only=True)
+    estimated_wait = serializers.FloatField(
+        read_only=True, help_text="Seconds until the token is admitted"
+    )
+
+
+class PerformanceScheduleSerializer(serializers.Serializer):
+    play = serializers.PrimaryKeyRelatedField(queryset=Play.objects.all())
+    theatre_hall = serializers.PrimaryKeyRelatedField(
+        queryset=TheatreHall.objects.all()
+    )
+    start = serializers.DateTimeField()
+    duration = serializers.DurationField(
+        min_value=datetime.timedelta(minutes=1)
+    )
+    rrule = serializers.CharField(
+        help_text="RFC 5545 recurrence rule, e.g. FREQ=DAILY;COUNT=30"
+    )
+
+    def validate(self, attrs):
+        """
+        Expands the recurrence rule into show times and rejects the whole
+        series if any show overlaps another performance in the hall.
+        """
+        try:
+            show_times = expand_recurrence(attrs["rrule"], attrs["start"])
+        except ValueError as error:
+            raise serializers.ValidationError({"rrule": str(error)})
+
+        if not show_times:
+            raise serializers.ValidationError(
+                {"rrule": "The rule does not produce any show time"}
+            )
+        if len(show_times) > MAX_SCHEDULED_PERFORMANCES:
+            raise serializers.ValidationError(
+                {
+                    "rrule": f"The rule must not produce more than "
+                    f"{MAX_SCHEDULED_PERFORMANCES} show times"
+                }
+            )
+
+        conflicts = find_conflicts(
+            attrs["theatre_hall"], show_times, attrs["duration"]
+        )
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    "conflicts": [
+                        f"{show_time.isoformat()} overlaps "
+                        + (
+                            f"performance {performance}"
+                            if performance is not None
+                            else "the previous show of the series"
+                        )
+                        for show_time, performance in conflicts
+                    ]
+                }
+            )
+
+        attrs["show_times"] = show_times
+        return attrs
 
-class PerformanceListSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        """
+        Inserts the whole series with one bulk insert. The exclusion
+        constraint rejects it atomically if a concurrent request booked
+        the hall in the meantime.
+        """
+        performances = [
+            Performance(
+                play=validated_data["play"],
+                theatre_hall=validated_data["theatre_hall"],
+                show_time=show_time,
+                duration=validated_data["duration"],
+            )
+            for show_time in validated_data["show_times"]
+        ]
+        try:
+            with transaction.atomic():
+                return Performance.objects.bulk_create(performances)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {
+                    "conflicts": "The series overlaps a performance "
+                    "scheduled in the meantime"
+                }
+            )
+
+
+class PerformanceListSerializer(SparseModelSerializer):
     play_title = serializers.CharField(source="play.title", read_only=True)
     play_image = serializers.ImageField(source="play.image", read_only=True)
     theatre_hall_name = serializers.CharField(
@@ -115,10 +304,135 @@ class PerformanceListSerializer(serializers.ModelSerializer):
         )
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves primary keys from the instances its list serializer loaded
+    up front, and with a query of its own only for the other keys.
+    """
+
+    def __init__(self, **kwargs):
+        self.preloaded = None
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if self.preloaded is not None and not isinstance(data, bool):
+            try:
+                return self.preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class PreloadingListSerializer(serializers.ListSerializer):
+    """
+    Loads the related objects referenced by all the items with one query
+    per field before the items are validated one by one.
+
+    The fields are listed in ``preload_related`` of the child's Meta,
+    mapped to the relations to select along with their objects.
+    """
+
+    def to_internal_value(self, data):
+        fields = self.preload(data) if isinstance(data, list) else []
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in fields:
+                field.preloaded = None
+
+    def preload(self, data) -> list:
+        fields = []
+        preload_related = getattr(self.child.Meta, "preload_related", {})
+        for name, related in preload_related.items():
+            field = self.child.fields.get(name)
+            if not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                continue
+            keys = set()
+            for item in data:
+                try:
+                    keys.add(int(item[name]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            field.preloaded = (
+                field.get_queryset().select_related(*related).in_bulk(keys)
+            )
+            fields.append(field)
+        return fields
+
+
+class TicketBatchSerializer(PreloadingListSerializer):
+    """
+    Validates tickets with their performances loaded up front, and
+    checks that their seats are free with one query for all of them
+    instead of a ``UniqueTogetherValidator`` query per ticket.
+    """
+
+    def to_internal_value(self, data):
+        self.child.validators = [
+            validator for validator in self.child.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        tickets = super().to_internal_value(data)
+        if not tickets:
+            return tickets
+
+        seats = [
+            (ticket["performance"].pk, ticket["row"], ticket["seat"])
+            for ticket in tickets
+        ]
+        seat_filters = defaultdict(list)
+        for ticket in tickets:
+            seat_filters[ticket["performance"]].append(
+                Q(row=ticket["row"], seat=ticket["seat"])
+            )
+        # every performance is filtered by its partition key too, so
+        # only the partitions of the booked show months are scanned
+        taken = set(
+            Ticket.objects.filter(
+                reduce(
+                    operator.or_,
+                    (
+                        Q(
+                            performance=performance,
+                            show_month=show_month_of(performance.show_time),
+                        )
+                        & reduce(operator.or_, filters)
+                        for performance, filters in seat_filters.items()
+                    ),
+                )
+            ).values_list("performance_id", "row", "seat")
+        )
+
+        errors = []
+        for seat in seats:
+            if seat in taken:
+                errors.append(
+                    {
+                        api_settings.NON_FIELD_ERRORS_KEY: [
+                            UniqueTogetherValidator.message.format(
+                                field_names="row, seat, performance"
+                            )
+                        ]
+                    }
+                )
+            else:
+                errors.append({})
+            # the later tickets for a seat clash with the first one
+            taken.add(seat)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return tickets
+
+
+class TicketSerializer(SparseModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "performance")
+        list_serializer_class = TicketBatchSerializer
+        preload_related = {"performance": ("theatre_hall",)}
 
     def validate(self, attrs):
         """
@@ -145,7 +459,7 @@ class TicketSerializer(serializers.ModelSerializer):
         Ticket.validate_ticket(
             attrs["row"],
             attrs["seat"],
-            attrs["performance"].theatre_hall,
+            loaded_performance_dimensions(attrs["performance"]),
             serializers.ValidationError
         )
         return data
@@ -161,20 +475,18 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
-class PropSerializer(serializers.ModelSerializer):
+class PropSerializer(SparseModelSerializer):
     class Meta:
         model = Prop
         fields = ("id", "name")
 
 
-class PerformanceDetailSerializer(serializers.ModelSerializer):
+class PerformanceDetailSerializer(
+    TheatreHallConstraintMixin, SparseModelSerializer
+):
     play = PlayDetailSerializer(many=False, read_only=True)
     theatre_hall = TheatreHallSerializer(many=False, read_only=True)
-    taken_seats = TicketSeatsSerializer(
-        many=True,
-        read_only=True,
-        source="tickets",
-    )
+    taken_seats = serializers.SerializerMethodField()
     props = PropSerializer(many=True, read_only=False)
 
     class Meta:
@@ -188,20 +500,87 @@ class PerformanceDetailSerializer(serializers.ModelSerializer):
             "props",
         )
 
+    def validate(self, attrs):
+        data = super(PerformanceDetailSerializer, self).validate(attrs=attrs)
+        validate_theatre_hall_is_free(attrs, self.instance)
+        return data
+
+    @extend_schema_field(TicketSeatsSerializer(many=True))
+    def get_taken_seats(self, performance):
+        """
+        Reads the seats from the ticket partition of the performance's
+        show month only.
+        """
+        return TicketSeatsSerializer(
+            Ticket.objects.for_performance(performance).only("row", "seat"),
+            many=True
+        ).data
+
     def update(self, instance, validated_data):
-        props_data = validated_data.pop("props")
+        """
+        Updates the performance and only the changed links to its props,
+        with a constant number of queries however many props are sent.
+        """
+        props_data = validated_data.pop("props", None)
 
-        with transaction.atomic():
+        # save() already runs in a savepoint
+        with transaction.atomic(savepoint=False):
             performance = super().update(instance, validated_data)
-            performance.props.clear()
-            for prop_data in props_data:
-                prop, created = Prop.objects.get_or_create(**prop_data)
-                performance.props.add(prop)
-
+            if props_data is not None:
+                props = resolve_props(
+                    prop_data["name"] for prop_data in props_data
+                )
+                assign_props([performance.id], props)
+
+        getattr(performance, "_prefetched_objects_cache", {}).pop(
+            "props", None
+        )
         return performance
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class PerformancePropsAssignmentSerializer(serializers.Serializer):
+    performances = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    props = PropSerializer(many=True)
+
+    def validate_performances(self, value):
+        """
+        Checks that all the performances exist with a single query.
+
+        Raises:
+            ValidationError: If some of the performances do not exist.
+        """
+        performance_ids = list(dict.fromkeys(value))
+        existing = set(
+            Performance.objects.filter(
+                id__in=performance_ids
+            ).values_list("id", flat=True)
+        )
+        missing = [
+            performance_id for performance_id in performance_ids
+            if performance_id not in existing
+        ]
+        if missing:
+            raise serializers.ValidationError(
+                f"Performances {missing} do not exist"
+            )
+        return performance_ids
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            props = resolve_props(
+                prop_data["name"] for prop_data in validated_data["props"]
+            )
+            assign_props(validated_data["performances"], props)
+
+        return {
+            "performances": validated_data["performances"],
+            "props": props,
+        }
+
+
+class ReservationSerializer(SparseModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False)
 
     class Meta:
@@ -228,10 +607,221 @@ class ReservationSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
+            tickets = [
                 Ticket.objects.create(reservation=reservation, **ticket_data)
+                for ticket_data in tickets_data
+            ]
+            publish_on_commit(tickets, SEATS_TAKEN)
             return reservation
 
 
 class ReservationListSerializer(ReservationSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class ArchivedPerformanceSerializer(SparseModelSerializer):
+    class Meta:
+        model = ArchivedPerformance
+        fields = (
+            "id",
+            "show_time",
+            "play_title",
+            "theatre_hall_name",
+            "props",
+        )
+
+
+class ArchivedTicketSerializer(SparseModelSerializer):
+    performance = ArchivedPerformanceSerializer(many=False, read_only=True)
+
+    class Meta:
+        model = ArchivedTicket
+        fields = ("id", "row", "seat", "performance")
+
+
+class ArchivedReservationSerializer(SparseModelSerializer):
+    tickets = ArchivedTicketSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedReservation
+        fields = ("id", "created_at", "tickets")
+
+
+def occupancy_rate(sold, capacity) -> float:
+    return round(sold / capacity, 4) if capacity else 0.0
+
+
+class PerformanceOccupancySerializer(SparseModelSerializer):
+    show_time = serializers.DateTimeField(
+        source="performance.show_time",
+        read_only=True
+    )
+    play_title = serializers.CharField(
+        source="performance.play.title",
+        read_only=True
+    )
+    theatre_hall_name = serializers.CharField(
+        source="performance.theatre_hall.name",
+        read_only=True
+    )
+    occupancy = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PerformanceOccupancy
+        fields = (
+            "performance",
+            "show_time",
+            "play_title",
+            "theatre_hall_name",
+            "capacity",
+            "sold_seats",
+            "occupancy",
+        )
+
+    def get_occupancy(self, obj) -> float:
+        return occupancy_rate(obj.sold_seats, obj.capacity)
+
+
+class OccupancyReportSerializer(serializers.Serializer):
+    performances = serializers.IntegerField()
+    capacity = serializers.IntegerField(source="seats")
+    sold_seats = serializers.IntegerField(source="sold")
+    occupancy = serializers.SerializerMethodField()
+
+    def get_occupancy(self, obj) -> float:
+        return occupancy_rate(obj["sold"], obj["seats"])
+
+
+class PlayOccupancySerializer(OccupancyReportSerializer):
+    play = serializers.IntegerField(source="performance__play")
+    play_title = serializers.CharField(source="performance__play__title")
+
+
+class TheatreHallOccupancySerializer(OccupancyReportSerializer):
+    theatre_hall = serializers.IntegerField(
+        source="performance__theatre_hall"
+    )
+    theatre_hall_name = serializers.CharField(
+        source="performance__theatre_hall__name"
+    )
+
+
+class DayOccupancySerializer(OccupancyReportSerializer):
+    day = serializers.DateField()
+
+
+class CatalogChangeSerializer(serializers.Serializer):
+    model = serializers.CharField()
+    id = serializers.IntegerField()  # noqa: VNE003
+    deleted = serializers.BooleanField()
+    data = serializers.JSONField(
+        allow_null=True, help_text="The current row, null when deleted"
+    )
+
+
+class CatalogChangesSerializer(serializers.Serializer):
+    cursor = serializers.CharField(
+        help_text="The `since` of the next call"
+    )
+    has_more = serializers.BooleanField()
+    changes = CatalogChangeSerializer(many=True)
+
+
+class ReservationRequestSerializer(SparseModelSerializer):
+    class Meta:
+        model = ReservationRequest
+        fields = ("id", "created_at", "status", "reservation", "errors")
+
+
+class BestAvailableReservationSerializer(serializers.Serializer):
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
+    count = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        """
+        Checks that the requested number of seats fits into one row
+        of the performance's theatre hall.
+        """
+        seats_in_row = attrs["performance"].theatre_hall.seats_in_row
+        if attrs["count"] > seats_in_row:
+            raise serializers.ValidationError(
+                {
+                    "count": f"count must not exceed the number of seats "
+                    f"in a row: {seats_in_row}"
+                }
+            )
+        return attrs
+
+    # an allocation racing a regular booking is retried once
+    allocation_attempts = 2
+
+    def create(self, validated_data):
+        """
+        Creates a Reservation with the best available block of adjacent
+        seats for the requested performance.
+
+        The performance row is locked for the duration of the transaction,
+        so concurrent allocations for the same show are serialized and
+        never pick the same seats. Regular bookings do not take that
+        lock: if one takes a picked seat first, the allocation is rolled
+        back and made again from the seats free then.
+
+        Args:
+            validated_data (dict): The performance, the number of seats
+            and the user making the reservation.
+
+        Returns:
+            Reservation: The created Reservation instance.
+
+        Raises:
+            ValidationError: If no row has enough adjacent free seats, or
+            the picked seats were taken concurrently on every attempt.
+        """
+        for _ in range(self.allocation_attempts):
+            try:
+                with transaction.atomic():
+                    return self.allocate(**validated_data)
+            except IntegrityError:
+                continue
+
+        raise serializers.ValidationError(
+            {"count": "The seats were taken by another booking, "
+                      "please try again"}
+        )
+
+    def allocate(self, performance, count, user) -> Reservation:
+        """Books the best available block in the current transaction"""
+        Performance.objects.select_for_update().filter(
+            pk=performance.pk
+        ).exists()
+        taken_seats = Ticket.objects.for_performance(
+            performance
+        ).values_list("row", "seat")
+        allocator = SeatAllocator(
+            performance.theatre_hall.rows,
+            performance.theatre_hall.seats_in_row,
+            taken_seats,
+        )
+        seats = allocator.find_block(count)
+        if seats is None:
+            raise serializers.ValidationError(
+                {"count": f"No block of {count} adjacent seats "
+                          f"is available for this performance"}
+            )
+
+        reservation = Reservation.objects.create(user=user)
+        tickets = Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    row=row,
+                    seat=seat,
+                    performance=performance,
+                    reservation=reservation,
+                )
+                for row, seat in seats
+            ]
+        )
+        publish_on_commit(tickets, SEATS_TAKEN)
+        return reservation
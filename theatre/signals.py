@@ -0,0 +1,95 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    TheatreHall,
+    Ticket,
+    hall_dimensions_cache,
+    show_month_of,
+)
+from theatre.seat_events import SEATS_RELEASED, publish_on_commit
+from theatre.waiting_room import waiting_room_rates
+
+
+@receiver(post_save, sender=Performance)
+def move_tickets_to_show_month(sender, instance, created, **kwargs):
+    """
+    Keeps the partition key of a performance's tickets in line with
+    its show time, PostgreSQL moves the rows to the new partition.
+    """
+    if created:
+        return
+
+    show_month = show_month_of(instance.show_time)
+    Ticket.objects.filter(performance=instance).exclude(
+        show_month=show_month
+    ).update(show_month=show_month)
+
+
+@receiver(post_save, sender=Performance)
+@receiver(post_delete, sender=Performance)
+def forget_performance_dimensions(sender, instance, **kwargs):
+    """The performance may have moved to another theatre hall"""
+    hall_dimensions_cache.delete(instance.pk)
+    waiting_room_rates.delete(instance.pk)
+
+
+@receiver(post_delete, sender=Ticket)
+def publish_released_seat(sender, instance, origin=None, **kwargs):
+    """
+    Streams the release of a seat. Tickets deleted along with their
+    performance, e.g. by the archive job, have nobody to notify.
+    """
+    origin_model = getattr(origin, "model", type(origin))
+    if origin_model is Performance:
+        return
+    publish_on_commit([instance], SEATS_RELEASED)
+
+
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=TheatreHall)
+def forget_hall_dimensions(sender, instance, **kwargs):
+    """
+    Halls change rarely and the cache is keyed by performance,
+    so the whole cache is dropped.
+    """
+    hall_dimensions_cache.clear()
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def refresh_play_links(sender, instance, action, reverse, pk_set, **kwargs):
+    """Copies the changed genres or actors of plays to their arrays"""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        Play.objects.filter(pk=instance.pk).refresh_links()
+        return
+
+    # plays added from the genre or actor side, or removed from it
+    ids_field = "genre_ids" if sender is Play.genres.through else "actor_ids"
+    Play.objects.filter(
+        Q(pk__in=pk_set or ()) | Q(**{f"{ids_field}__contains": [instance.pk]})
+    ).refresh_links()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def refresh_genre_plays(sender, instance, created=False, **kwargs):
+    """The plays keep a copy of the genre name"""
+    if not created:
+        Play.objects.filter(genre_ids__contains=[instance.pk]).refresh_links()
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+def refresh_actor_plays(sender, instance, created=False, **kwargs):
+    """The plays keep a copy of the actor full name"""
+    if not created:
+        Play.objects.filter(actor_ids__contains=[instance.pk]).refresh_links()
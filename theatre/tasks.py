@@ -0,0 +1,117 @@
+from celery import shared_task
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+
+from theatre.models import ReservationRequest
+from theatre.serializers import ReservationSerializer
+
+
+def reservation_partition(performance_id) -> int:
+    """Returns the queue partition that bookings for a performance use"""
+    return performance_id % settings.RESERVATION_QUEUE_PARTITIONS
+
+
+def reservation_queue(partition) -> str:
+    """Returns the name of the Celery queue of a partition"""
+    return f"reservations-{partition}"
+
+
+def enqueue_reservation_request(reservation_request) -> None:
+    """
+    Schedules processing of the request's partition once the current
+    transaction commits, so the worker always sees the stored request.
+    """
+    partition = reservation_request.partition
+    transaction.on_commit(
+        lambda: process_reservation_requests.apply_async(
+            args=[partition],
+            queue=reservation_queue(partition),
+        )
+    )
+
+
+def apply_reservation_request(reservation_request) -> None:
+    """
+    Creates the reservation described by a pending request and records
+    the outcome on the request.
+
+    A seat taken after the request was validated fails the request,
+    whether the clash is caught by ``Ticket.full_clean`` or by the
+    unique constraint.
+    """
+    serializer = ReservationSerializer(data=reservation_request.payload)
+    if not serializer.is_valid():
+        reservation_request.status = ReservationRequest.Status.FAILED
+        reservation_request.errors = serializer.errors
+        return
+
+    try:
+        with transaction.atomic():
+            reservation = serializer.save(user=reservation_request.user)
+    except (IntegrityError, ValidationError):
+        reservation_request.status = ReservationRequest.Status.FAILED
+        reservation_request.errors = {
+            "tickets": ["One or more seats are already taken"]
+        }
+        return
+
+    reservation_request.status = ReservationRequest.Status.DONE
+    reservation_request.reservation = reservation
+
+
+@shared_task
+def process_reservation_requests(partition):
+    """
+    Applies pending reservation requests of one partition in batches of
+    RESERVATION_ASYNC_BATCH_SIZE, oldest first.
+
+    Each batch runs in one transaction and every request in its own
+    savepoint, so a failed booking does not affect the rest of the batch.
+    Requests locked by another worker are skipped rather than waited
+    for. Only the request rows are locked, not their joined users.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                ReservationRequest.objects.select_for_update(
+                    skip_locked=True, of=("self",)
+                )
+                .select_related("user")
+                .filter(
+                    partition=partition,
+                    status=ReservationRequest.Status.PENDING
+                )
+                .order_by("id")[:settings.RESERVATION_ASYNC_BATCH_SIZE]
+            )
+            if not batch:
+                return processed
+
+            for reservation_request in batch:
+                apply_reservation_request(reservation_request)
+                reservation_request.save(
+                    update_fields=["status", "reservation", "errors"]
+                )
+            processed += len(batch)
+
+
+@shared_task
+def clean_expired_idempotency_keys():
+    call_command("clean_idempotency_keys")
+
+
+@shared_task
+def manage_ticket_partitions():
+    call_command("manage_ticket_partitions")
+
+
+@shared_task
+def archive_past_performances():
+    call_command("archive_performances")
+
+
+@shared_task
+def refresh_occupancy_analytics():
+    call_command("refresh_occupancy")
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from theatre.admin import EstimatedCountPaginator
+from theatre.models import (
+    Performance,
+    Play,
+    Prop,
+    Reservation,
+    TheatreHall,
+    Ticket
+)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email="admin@admin.com",
+            password="password"
+        )
+        self.client.force_login(self.user)
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def add_performance(self):
+        play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        performance = Performance.objects.create(
+            play=play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now() + timedelta(
+                days=Performance.objects.count()
+            )
+        )
+        performance.props.add(Prop.objects.create(name="Prop"))
+        Ticket.objects.create(
+            row=1,
+            seat=Ticket.objects.count() + 1,
+            performance=performance,
+            reservation=self.reservation
+        )
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for model in ("ticket", "performance", "reservation"):
+            url = reverse(f"admin:theatre_{model}_changelist")
+            self.add_performance()
+            queries_for_one = self.changelist_queries(url)
+            for _ in range(4):
+                self.add_performance()
+
+            self.assertEqual(
+                self.changelist_queries(url),
+                queries_for_one,
+                model
+            )
+
+    def test_estimated_count_for_huge_unfiltered_table(self):
+        self.add_performance()
+        with mock.patch(
+            "theatre.admin.estimated_row_count",
+            return_value=5_000_000
+        ):
+            paginator = EstimatedCountPaginator(Ticket.objects.all(), 100)
+            self.assertEqual(paginator.count, 5_000_000)
+
+            filtered = EstimatedCountPaginator(
+                Ticket.objects.filter(row=1), 100
+            )
+            self.assertEqual(filtered.count, 1)
+
+    def test_exact_count_for_small_table(self):
+        self.add_performance()
+        paginator = EstimatedCountPaginator(Ticket.objects.all(), 100)
+
+        self.assertEqual(paginator.count, 1)
@@ -0,0 +1,241 @@
+import random
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.allocation import SeatAllocator
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket
+)
+
+BEST_AVAILABLE_URL = reverse("theatre:reservation-best-available")
+
+
+def brute_force_block(allocator, taken_seats, count):
+    """Scores every possible block of the hall, used as a reference"""
+    taken_seats = set(taken_seats)
+    candidates = [
+        (allocator.score(row, start, count), row, start)
+        for row in range(1, allocator.rows + 1)
+        for start in range(1, allocator.seats_in_row - count + 2)
+        if not any(
+            (row, seat) in taken_seats
+            for seat in range(start, start + count)
+        )
+    ]
+    if not candidates:
+        return None
+    _, row, start = min(candidates)
+    return [(row, seat) for seat in range(start, start + count)]
+
+
+class SeatAllocatorTests(TestCase):
+    def test_free_runs_index(self):
+        allocator = SeatAllocator(2, 10, [(1, 1), (1, 4), (1, 5), (1, 10)])
+
+        self.assertEqual(allocator.free_runs[1], [(2, 2), (6, 4)])
+        self.assertEqual(allocator.free_runs[2], [(1, 10)])
+
+    def test_empty_hall_picks_centre_of_middle_row(self):
+        allocator = SeatAllocator(9, 10, [])
+
+        self.assertEqual(
+            allocator.find_block(2),
+            [(5, 5), (5, 6)]
+        )
+
+    def test_block_is_shifted_inside_a_free_run(self):
+        taken_seats = [(1, seat) for seat in range(4, 11)]
+        allocator = SeatAllocator(1, 10, taken_seats)
+
+        self.assertEqual(allocator.find_block(3), [(1, 1), (1, 2), (1, 3)])
+
+    def test_no_block_available(self):
+        taken_seats = [(row, seat) for row in (1, 2) for seat in (2, 4)]
+        allocator = SeatAllocator(2, 5, taken_seats)
+
+        self.assertIsNone(allocator.find_block(2))
+        self.assertIsNone(allocator.find_block(6))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            rows, seats_in_row = rng.randint(1, 12), rng.randint(1, 15)
+            taken_seats = [
+                (row, seat)
+                for row in range(1, rows + 1)
+                for seat in range(1, seats_in_row + 1)
+                if rng.random() < 0.6
+            ]
+            allocator = SeatAllocator(rows, seats_in_row, taken_seats)
+            for count in range(1, 5):
+                self.assertEqual(
+                    allocator.find_block(count),
+                    brute_force_block(allocator, taken_seats, count)
+                )
+
+
+class BestAvailableReservationApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=3,
+            seats_in_row=5
+        )
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now()
+        )
+
+    def test_best_available_creates_reservation(self):
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            data={"performance": self.performance.id, "count": 3},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(
+            [
+                (ticket["row"], ticket["seat"])
+                for ticket in res.data["tickets"]
+            ],
+            [(2, 2), (2, 3), (2, 4)]
+        )
+
+    def test_best_available_skips_taken_seats(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=2,
+            seat=3,
+            performance=self.performance,
+            reservation=reservation
+        )
+
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            data={"performance": self.performance.id, "count": 2},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        seats = [
+            (ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]
+        ]
+        self.assertNotIn((2, 3), seats)
+        self.assertEqual(len(seats), 2)
+
+    def test_best_available_count_exceeds_row(self):
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            data={"performance": self.performance.id, "count": 6},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", res.data)
+
+    def test_best_available_sold_out(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    row=row,
+                    seat=seat,
+                    performance=self.performance,
+                    reservation=reservation
+                )
+                for row in range(1, 4)
+                for seat in range(1, 6)
+            ]
+        )
+
+        res = self.client.post(
+            BEST_AVAILABLE_URL,
+            data={"performance": self.performance.id, "count": 1},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def stale_allocation(self, *blocks):
+        """Makes the allocator pick the given blocks first, as if their
+        seats were booked after the free seats were read"""
+        find_block = SeatAllocator.find_block
+        picks = iter(blocks)
+
+        def pick(allocator, count):
+            return next(picks, None) or find_block(allocator, count)
+
+        return mock.patch.object(
+            SeatAllocator, "find_block", autospec=True, side_effect=pick
+        )
+
+    def test_best_available_retries_seats_taken_concurrently(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=2,
+            seat=3,
+            performance=self.performance,
+            reservation=reservation
+        )
+
+        with self.stale_allocation([(2, 3), (2, 4)]) as find_block:
+            res = self.client.post(
+                BEST_AVAILABLE_URL,
+                data={"performance": self.performance.id, "count": 2},
+                format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(find_block.call_count, 2)
+        seats = [
+            (ticket["row"], ticket["seat"]) for ticket in res.data["tickets"]
+        ]
+        self.assertNotIn((2, 3), seats)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_best_available_gives_up_after_repeated_clashes(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=2,
+            seat=3,
+            performance=self.performance,
+            reservation=reservation
+        )
+
+        with self.stale_allocation([(2, 3)], [(2, 3)]):
+            res = self.client.post(
+                BEST_AVAILABLE_URL,
+                data={"performance": self.performance.id, "count": 1},
+                format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", res.data)
+        self.assertEqual(Reservation.objects.count(), 1)
@@ -0,0 +1,187 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.analytics import refresh_occupancy
+from theatre.models import (
+    AnalyticsWatermark,
+    Performance,
+    PerformanceOccupancy,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket
+)
+
+
+class OccupancyAnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.small_hall = TheatreHall.objects.create(
+            name="Small Hall",
+            rows=2,
+            seats_in_row=5
+        )
+        self.big_hall = TheatreHall.objects.create(
+            name="Big Hall",
+            rows=10,
+            seats_in_row=10
+        )
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.first_performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.small_hall,
+            show_time="2024-05-01T19:00:00Z"
+        )
+        self.second_performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.big_hall,
+            show_time="2024-05-02T19:00:00Z"
+        )
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def sell(self, performance, seats):
+        for seat in seats:
+            Ticket.objects.create(
+                row=1,
+                seat=seat,
+                performance=performance,
+                reservation=self.reservation
+            )
+
+    def test_refresh_counts_only_new_tickets(self):
+        self.sell(self.first_performance, [1, 2])
+        self.assertEqual(refresh_occupancy(), 2)
+
+        self.sell(self.first_performance, [3])
+        self.sell(self.second_performance, [1])
+        self.assertEqual(refresh_occupancy(), 2)
+        self.assertEqual(refresh_occupancy(), 0)
+
+        self.assertEqual(
+            PerformanceOccupancy.objects.get(
+                performance=self.first_performance
+            ).sold_seats,
+            3
+        )
+        self.assertEqual(
+            AnalyticsWatermark.objects.get(name="tickets").last_id,
+            Ticket.objects.order_by("-id").first().id
+        )
+
+    def test_refresh_counts_ticket_committed_below_watermark(self):
+        self.sell(self.first_performance, [1])
+        refresh_occupancy()
+        self.sell(self.first_performance, [2])
+        # a higher id was counted while this booking had not committed yet
+        AnalyticsWatermark.objects.filter(name="tickets").update(
+            last_id=Ticket.objects.order_by("-id").first().id + 1
+        )
+
+        self.assertEqual(refresh_occupancy(), 1)
+        self.assertEqual(
+            PerformanceOccupancy.objects.get(
+                performance=self.first_performance
+            ).sold_seats,
+            2
+        )
+
+    def test_full_refresh_picks_up_deleted_tickets(self):
+        self.sell(self.first_performance, [1, 2])
+        refresh_occupancy()
+        Ticket.objects.filter(seat=2).delete()
+
+        call_command("refresh_occupancy", full=True, stdout=StringIO())
+
+        self.assertEqual(
+            PerformanceOccupancy.objects.get(
+                performance=self.first_performance
+            ).sold_seats,
+            1
+        )
+
+    def test_performance_report(self):
+        self.sell(self.first_performance, [1, 2, 3, 4, 5])
+        refresh_occupancy()
+
+        res = self.client.get(reverse("theatre:occupancy-performances"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        first = next(
+            row for row in res.data["results"]
+            if row["performance"] == self.first_performance.id
+        )
+        self.assertEqual(first["capacity"], 10)
+        self.assertEqual(first["sold_seats"], 5)
+        self.assertEqual(first["occupancy"], 0.5)
+
+    def test_grouped_reports(self):
+        self.sell(self.first_performance, [1, 2, 3, 4, 5])
+        self.sell(self.second_performance, [1, 2, 3, 4, 5])
+        refresh_occupancy()
+
+        plays = self.client.get(reverse("theatre:occupancy-plays"))
+        halls = self.client.get(reverse("theatre:occupancy-theatre-halls"))
+        days = self.client.get(reverse("theatre:occupancy-days"))
+
+        self.assertEqual(
+            plays.data,
+            [
+                {
+                    "performances": 2,
+                    "capacity": 110,
+                    "sold_seats": 10,
+                    "occupancy": 0.0909,
+                    "play": self.play.id,
+                    "play_title": self.play.title,
+                }
+            ]
+        )
+        self.assertEqual(
+            [hall["theatre_hall_name"] for hall in halls.data],
+            ["Small Hall", "Big Hall"]
+        )
+        self.assertEqual(
+            [(day["day"], day["occupancy"]) for day in days.data],
+            [("2024-05-01", 0.5), ("2024-05-02", 0.05)]
+        )
+
+    def test_reports_do_not_depend_on_ticket_volume(self):
+        self.sell(self.first_performance, [1])
+        refresh_occupancy()
+        with self.assertNumQueries(1):
+            self.client.get(reverse("theatre:occupancy-plays"))
+
+        self.sell(self.first_performance, [2, 3, 4, 5])
+        self.sell(self.second_performance, range(1, 11))
+        refresh_occupancy()
+        with self.assertNumQueries(1):
+            self.client.get(reverse("theatre:occupancy-plays"))
+
+    def test_reports_are_staff_only(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(reverse("theatre:occupancy-plays"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,180 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.archive import archive_performances
+from theatre.models import (
+    ArchivedPerformance,
+    CatalogTombstone,
+    ArchivedReservation,
+    ArchivedTicket,
+    Performance,
+    Play,
+    Prop,
+    Reservation,
+    TheatreHall,
+    Ticket
+)
+
+ARCHIVED_RESERVATION_LIST_URL = reverse("theatre:archivedreservation-list")
+
+
+class ArchivePerformancesTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.old_performances = [
+            self.create_performance(days_ago=400 + days)
+            for days in range(3)
+        ]
+        self.new_performance = self.create_performance(days_ago=10)
+        self.old_performances[0].props.add(Prop.objects.create(name="Sword"))
+
+        self.old_reservation = Reservation.objects.create(user=self.user)
+        self.mixed_reservation = Reservation.objects.create(user=self.user)
+        for seat, performance in enumerate(self.old_performances, start=1):
+            self.create_ticket(seat, performance, self.old_reservation)
+        self.create_ticket(1, self.old_performances[0], self.mixed_reservation)
+        self.create_ticket(1, self.new_performance, self.mixed_reservation)
+
+    def create_performance(self, days_ago):
+        return Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def create_ticket(self, seat, performance, reservation):
+        row = 1 if reservation == self.old_reservation else 2
+        return Ticket.objects.create(
+            row=row,
+            seat=seat,
+            performance=performance,
+            reservation=reservation
+        )
+
+    def test_archive_moves_past_performances_in_batches(self):
+        cutoff = timezone.now() - timedelta(days=365)
+
+        performances, tickets = archive_performances(cutoff, batch_size=2)
+
+        self.assertEqual((performances, tickets), (3, 4))
+        self.assertEqual(
+            list(Performance.objects.values_list("id", flat=True)),
+            [self.new_performance.id]
+        )
+        self.assertEqual(ArchivedPerformance.objects.count(), 3)
+        self.assertEqual(ArchivedTicket.objects.count(), 4)
+        self.assertEqual(
+            ArchivedPerformance.objects.get(
+                id=self.old_performances[0].id
+            ).props,
+            ["Sword"]
+        )
+
+    def test_archive_deletes_tickets_on_their_partitions(self):
+        with CaptureQueriesContext(connection) as queries:
+            archive_performances(timezone.now() - timedelta(days=365))
+
+        ticket_deletes = [
+            query["sql"] for query in queries
+            if query["sql"].startswith('DELETE FROM "theatre_ticket"')
+        ]
+        self.assertEqual(len(ticket_deletes), 1)
+        self.assertIn("show_month", ticket_deletes[0])
+        self.assertEqual(
+            list(Ticket.objects.values_list("performance_id", flat=True)),
+            [self.new_performance.id]
+        )
+
+    def test_archived_performances_are_tombstoned(self):
+        archive_performances(timezone.now() - timedelta(days=365))
+
+        self.assertEqual(
+            set(
+                CatalogTombstone.objects.filter(
+                    model="performance"
+                ).values_list("object_id", flat=True)
+            ),
+            {performance.id for performance in self.old_performances}
+        )
+
+    def test_archive_keeps_reservations_with_upcoming_tickets(self):
+        archive_performances(timezone.now() - timedelta(days=365))
+
+        self.assertFalse(
+            Reservation.objects.filter(id=self.old_reservation.id).exists()
+        )
+        self.assertEqual(
+            list(
+                Reservation.objects.get(
+                    id=self.mixed_reservation.id
+                ).tickets.values_list("performance_id", flat=True)
+            ),
+            [self.new_performance.id]
+        )
+        self.assertEqual(
+            set(ArchivedReservation.objects.values_list("id", flat=True)),
+            {self.old_reservation.id, self.mixed_reservation.id}
+        )
+
+    def test_archived_reservations_endpoint(self):
+        archive_performances(timezone.now() - timedelta(days=365))
+
+        res = self.client.get(ARCHIVED_RESERVATION_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        reservation = next(
+            reservation for reservation in res.data["results"]
+            if reservation["id"] == self.old_reservation.id
+        )
+        self.assertEqual(len(reservation["tickets"]), 3)
+        self.assertEqual(
+            reservation["tickets"][0]["performance"]["play_title"],
+            self.play.title
+        )
+
+    def test_archived_reservations_are_read_only_and_private(self):
+        archive_performances(timezone.now() - timedelta(days=365))
+        other_user = get_user_model().objects.create_user(
+            email="other@test.com",
+            password="testpassword"
+        )
+
+        res = self.client.post(ARCHIVED_RESERVATION_LIST_URL, data={})
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.client.force_authenticate(other_user)
+        res = self.client.get(ARCHIVED_RESERVATION_LIST_URL)
+        self.assertEqual(res.data["count"], 0)
+
+    def test_archive_performances_command(self):
+        call_command("archive_performances", days=401, stdout=StringIO())
+
+        self.assertEqual(ArchivedPerformance.objects.count(), 2)
+        self.assertEqual(Performance.objects.count(), 2)
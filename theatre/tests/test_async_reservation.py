@@ -0,0 +1,231 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    ReservationRequest,
+    TheatreHall,
+    Ticket
+)
+from theatre.serializers import ReservationSerializer
+from theatre.tasks import (
+    process_reservation_requests,
+    reservation_partition,
+)
+from theatre_service.celery import app as celery_app
+
+RESERVATION_LIST_URL = reverse("theatre:reservation-list")
+
+
+@override_settings(RESERVATION_ASYNC=True)
+class AsyncReservationApiTests(TestCase):
+    def setUp(self):
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(
+            setattr, celery_app.conf, "task_always_eager", False
+        )
+
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now()
+        )
+
+    def post_reservation(self, row=5, seat=10):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                RESERVATION_LIST_URL,
+                data={
+                    "tickets": [
+                        {
+                            "row": row,
+                            "seat": seat,
+                            "performance": self.performance.id
+                        }
+                    ]
+                },
+                format="json"
+            )
+
+    def test_create_returns_accepted_with_status_url(self):
+        res = self.post_reservation()
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        status_url = reverse(
+            "theatre:reservationrequest-detail",
+            args=[res.data["id"]]
+        )
+        self.assertEqual(res["Location"], status_url)
+        self.assertTrue(res.data["status_url"].endswith(status_url))
+
+    def test_request_is_processed_by_worker(self):
+        res = self.post_reservation()
+
+        poll = self.client.get(res["Location"])
+
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.data["status"], ReservationRequest.Status.DONE)
+        reservation = Reservation.objects.get(id=poll.data["reservation"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(reservation.tickets.count(), 1)
+
+    def test_invalid_request_is_rejected_synchronously(self):
+        res = self.post_reservation(row=11)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ReservationRequest.objects.exists())
+
+    def test_taken_seat_fails_request(self):
+        reservation_request = ReservationRequest.objects.create(
+            user=self.user,
+            payload={
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": self.performance.id}
+                ]
+            },
+            partition=0
+        )
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.user)
+        )
+
+        process_reservation_requests(0)
+
+        reservation_request.refresh_from_db()
+        self.assertEqual(
+            reservation_request.status,
+            ReservationRequest.Status.FAILED
+        )
+        self.assertIn("tickets", reservation_request.errors)
+
+    def test_seat_taken_after_validation_fails_only_its_request(self):
+        requests = [
+            ReservationRequest.objects.create(
+                user=self.user,
+                payload={
+                    "tickets": [
+                        {
+                            "row": 1,
+                            "seat": seat,
+                            "performance": self.performance.id
+                        }
+                    ]
+                },
+                partition=0
+            )
+            for seat in (1, 2)
+        ]
+        save = ReservationSerializer.save
+
+        def save_after_seat_is_taken(serializer, **kwargs):
+            # another booking takes the seat between validation and save
+            if serializer.validated_data["tickets"][0]["seat"] == 1:
+                Ticket.objects.create(
+                    row=1,
+                    seat=1,
+                    performance=self.performance,
+                    reservation=Reservation.objects.create(user=self.user)
+                )
+            return save(serializer, **kwargs)
+
+        with mock.patch.object(
+            ReservationSerializer, "save", save_after_seat_is_taken
+        ):
+            process_reservation_requests(0)
+
+        for reservation_request in requests:
+            reservation_request.refresh_from_db()
+        self.assertEqual(
+            [reservation_request.status for reservation_request in requests],
+            [
+                ReservationRequest.Status.FAILED,
+                ReservationRequest.Status.DONE,
+            ]
+        )
+        self.assertIn("tickets", requests[0].errors)
+
+    def test_worker_processes_partition_in_batches(self):
+        for seat in range(1, 6):
+            ReservationRequest.objects.create(
+                user=self.user,
+                payload={
+                    "tickets": [
+                        {
+                            "row": 1,
+                            "seat": seat,
+                            "performance": self.performance.id
+                        }
+                    ]
+                },
+                partition=3
+            )
+
+        with override_settings(RESERVATION_ASYNC_BATCH_SIZE=2):
+            processed = process_reservation_requests(3)
+
+        self.assertEqual(processed, 5)
+        self.assertEqual(
+            ReservationRequest.objects.filter(
+                status=ReservationRequest.Status.DONE
+            ).count(),
+            5
+        )
+
+    def test_worker_locks_only_the_requests(self):
+        self.post_reservation()
+
+        with CaptureQueriesContext(connection) as queries:
+            process_reservation_requests(
+                reservation_partition(self.performance.id)
+            )
+
+        locks = [
+            query["sql"] for query in queries if "FOR UPDATE" in query["sql"]
+        ]
+        self.assertTrue(locks)
+        for sql in locks:
+            self.assertIn(
+                'FOR UPDATE OF "theatre_reservationrequest" SKIP LOCKED', sql
+            )
+
+    def test_other_users_request_is_not_visible(self):
+        res = self.post_reservation()
+        other_user = get_user_model().objects.create_user(
+            email="other@test.com",
+            password="testpassword"
+        )
+        self.client.force_authenticate(other_user)
+
+        poll = self.client.get(res["Location"])
+
+        self.assertEqual(poll.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,164 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import Performance, Play, Reservation, TheatreHall
+
+PLAY_LIST_URL = reverse("theatre:play-list")
+PERFORMANCE_LIST_URL = reverse("theatre:performance-list")
+RESERVATION_LIST_URL = reverse("theatre:reservation-list")
+BATCH_URL = reverse("batch")
+
+
+class MultiGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        theatre_hall = TheatreHall.objects.create(
+            name="Main Hall", rows=10, seats_in_row=20
+        )
+        self.plays = [
+            Play.objects.create(title=title, description="A play")
+            for title in ("Cats", "Hamlet", "Macbeth")
+        ]
+        self.performances = [
+            Performance.objects.create(
+                play=play,
+                theatre_hall=theatre_hall,
+                show_time=timezone.now() + timezone.timedelta(days=number)
+            )
+            for number, play in enumerate(self.plays)
+        ]
+
+    @override_settings(FAST_LIST_RESPONSES=True)
+    def test_performances_are_returned_in_requested_order(self):
+        ids = [self.performances[2].id, self.performances[0].id]
+        params = {"ids": ",".join(map(str, ids))}
+
+        with self.assertNumQueries(1):
+            res = self.client.get(PERFORMANCE_LIST_URL, params)
+        with override_settings(FAST_LIST_RESPONSES=False):
+            serialized = self.client.get(PERFORMANCE_LIST_URL, params)
+
+        self.assertEqual([row["id"] for row in res.json()], ids)
+        self.assertEqual(res.content, serialized.content)
+
+    def test_plays_are_returned_in_requested_order(self):
+        ids = [self.plays[1].id, self.plays[2].id, self.plays[0].id]
+
+        res = self.client.get(
+            PLAY_LIST_URL, {"ids": ",".join(map(str, ids))}
+        )
+
+        self.assertEqual([row["id"] for row in res.json()], ids)
+
+    def test_unknown_and_repeated_ids_are_left_out(self):
+        play_id = self.plays[0].id
+
+        res = self.client.get(PLAY_LIST_URL, {"ids": f"{play_id},0,{play_id}"})
+
+        self.assertEqual([row["id"] for row in res.json()], [play_id])
+
+    def test_invalid_ids_are_rejected(self):
+        res = self.client.get(PLAY_LIST_URL, {"ids": "1,two"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(MULTI_GET_MAX_IDS=2)
+    def test_too_many_ids_are_rejected(self):
+        res = self.client.get(PLAY_LIST_URL, {"ids": "1,2,3"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.play = Play.objects.create(title="Cats", description="A play")
+        self.reservation = Reservation.objects.create(user=self.user)
+        Reservation.objects.create(
+            user=get_user_model().objects.create_user(
+                email="other@test.com",
+                password="testpassword"
+            )
+        )
+
+    def batch(self, *urls):
+        return self.client.post(
+            BATCH_URL,
+            {"requests": [{"url": url} for url in urls]},
+            format="json"
+        )
+
+    def test_sub_requests_are_answered_in_order(self):
+        res = self.batch(
+            f"{PLAY_LIST_URL}?fields=title",
+            reverse("theatre:play-detail", args=[self.play.id]),
+            reverse("theatre:play-detail", args=[0]),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        responses = res.data["responses"]
+        self.assertEqual(
+            [response["status"] for response in responses], [200, 200, 404]
+        )
+        self.assertEqual(responses[0]["body"], [{"title": "Cats"}])
+        self.assertEqual(responses[1]["body"]["id"], self.play.id)
+
+    def test_sub_requests_share_the_user(self):
+        res = self.batch(RESERVATION_LIST_URL)
+
+        body = res.data["responses"][0]["body"]
+        self.assertEqual(
+            [reservation["id"] for reservation in body["results"]],
+            [self.reservation.id]
+        )
+
+    def test_paths_outside_the_api_are_not_found(self):
+        res = self.batch(
+            "/admin/", BATCH_URL, "/missing/", reverse("schema")
+        )
+
+        self.assertEqual(
+            [response["status"] for response in res.data["responses"]],
+            [404, 404, 404, 404]
+        )
+
+    def test_only_reads_are_allowed(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"requests": [{"method": "DELETE", "url": PLAY_LIST_URL}]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_sub_requests_are_capped(self):
+        res = self.batch(PLAY_LIST_URL, PLAY_LIST_URL, PLAY_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_requires_authentication(self):
+        res = APIClient().post(
+            BATCH_URL, {"requests": [{"url": PLAY_LIST_URL}]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
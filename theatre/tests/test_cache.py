@@ -0,0 +1,147 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from theatre.cache import TwoLevelCache, cache_stats
+
+
+class TwoLevelCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.cache = TwoLevelCache("test", timeout=60, local_timeout=60)
+        self.calls = 0
+
+    def other_process(self):
+        """A cache of the same namespace with its own process memory"""
+        return TwoLevelCache("test", timeout=60, local_timeout=60)
+
+    def compute(self):
+        self.calls += 1
+        return {"value": self.calls}
+
+    def test_value_is_computed_once(self):
+        first = self.cache.get_or_set("key", self.compute)
+        second = self.cache.get_or_set("key", self.compute)
+        third = self.other_process().get_or_set("key", self.compute)
+
+        self.assertEqual(first, {"value": 1})
+        self.assertEqual(second, first)
+        self.assertEqual(third, first)
+        self.assertEqual(self.calls, 1)
+
+    def test_local_hits_skip_the_shared_cache(self):
+        self.cache.get_or_set("key", self.compute)
+
+        with mock.patch.object(cache, "get") as get:
+            self.cache.get_or_set("key", self.compute)
+
+        get.assert_not_called()
+
+    def test_concurrent_misses_are_coalesced(self):
+        started = threading.Event()
+
+        def slow_compute():
+            started.set()
+            time.sleep(0.1)
+            return self.compute()
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    self.cache.get_or_set("key", slow_compute)
+                )
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"value": 1}] * 5)
+        self.assertEqual(self.cache.stats.coalesced, 4)
+
+    def test_process_waits_for_value_computed_elsewhere(self):
+        cache.add("test:1:key:lock", 1)
+
+        def store_value():
+            time.sleep(0.05)
+            cache.set(
+                "test:1:key",
+                ("computed elsewhere", 0.0, time.time() + 60),
+                60
+            )
+
+        thread = threading.Thread(target=store_value)
+        thread.start()
+        value = self.cache.get_or_set("key", self.compute)
+        thread.join()
+
+        self.assertEqual(value, "computed elsewhere")
+        self.assertEqual(self.calls, 0)
+
+    def test_value_is_refreshed_early(self):
+        # took 100 seconds to compute and expires in 10 seconds
+        cache.set("test:1:key", ("old", 100.0, time.time() + 10), 60)
+
+        with mock.patch("theatre.cache.random.random", return_value=0.0):
+            self.assertEqual(self.cache.get_or_set("key", self.compute), "old")
+
+        self.cache.local.clear()
+        with mock.patch("theatre.cache.random.random", return_value=0.5):
+            value = self.cache.get_or_set("key", self.compute)
+
+        self.assertEqual(value, {"value": 1})
+        self.assertEqual(self.cache.stats.refreshes, 1)
+
+    def test_invalidate_namespace(self):
+        other = self.other_process()
+        self.cache.get_or_set("key", self.compute)
+        other.get_or_set("key", self.compute)
+
+        self.cache.invalidate()
+
+        self.assertEqual(
+            self.cache.get_or_set("key", self.compute), {"value": 2}
+        )
+        other.local.clear()
+        self.assertEqual(other.get_or_set("key", self.compute), {"value": 2})
+
+    def test_delete_key(self):
+        self.cache.get_or_set("key", self.compute)
+
+        self.cache.delete("key")
+
+        self.assertEqual(
+            self.cache.get_or_set("key", self.compute), {"value": 2}
+        )
+
+    def test_errors_are_not_cached(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.cache.get_or_set("key", lambda: 1 / 0)
+
+        self.assertEqual(
+            self.cache.get_or_set("key", self.compute), {"value": 1}
+        )
+
+    def test_hit_rate(self):
+        for _ in range(4):
+            self.cache.get_or_set("key", self.compute)
+
+        self.assertEqual(
+            cache_stats()["test"],
+            {
+                "local_hits": 3,
+                "shared_hits": 0,
+                "misses": 1,
+                "refreshes": 0,
+                "coalesced": 0,
+                "hit_rate": 0.75,
+            }
+        )
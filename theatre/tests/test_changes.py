@@ -0,0 +1,195 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.changes import tracked_querysets
+from theatre.models import Actor, Genre, Performance, Play, TheatreHall
+
+CHANGES_URL = reverse("theatre:changes-list")
+
+
+class CatalogChangesTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        self.genre = Genre.objects.create(name="Drama")
+        self.play = Play.objects.create(
+            title="Hamlet", description="A tragedy"
+        )
+        self.play.genres.add(self.genre)
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall", rows=10, seats_in_row=20
+        )
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now()
+        )
+        self.cursor = self.sync()["cursor"]
+
+    def sync(self, since=None):
+        res = self.client.get(
+            CHANGES_URL, {} if since is None else {"since": since}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.json()
+
+    def changed(self, since=None):
+        body = self.sync(self.cursor if since is None else since)
+        return [
+            (change["model"], change["id"], change["deleted"])
+            for change in body["changes"]
+        ]
+
+    def test_first_sync_returns_the_catalogue(self):
+        changes = self.sync()["changes"]
+
+        self.assertEqual(
+            [(change["model"], change["id"]) for change in changes],
+            [
+                ("genre", self.genre.id),
+                ("play", self.play.id),
+                ("theatrehall", self.theatre_hall.id),
+                ("performance", self.performance.id),
+            ]
+        )
+        self.assertEqual(changes[1]["data"]["genres"], [self.genre.id])
+        self.assertEqual(changes[3]["data"]["play"], self.play.id)
+
+    def test_only_changes_after_the_cursor_are_returned(self):
+        self.theatre_hall.name = "Small Hall"
+        self.theatre_hall.save()
+        Genre.objects.filter(pk=self.genre.pk).update(name="Tragedy")
+
+        body = self.sync(self.cursor)
+
+        self.assertEqual(
+            [
+                (change["model"], change["data"]["name"])
+                for change in body["changes"]
+            ],
+            [("theatrehall", "Small Hall"), ("genre", "Tragedy")]
+        )
+        self.assertEqual(self.changed(body["cursor"]), [])
+
+    def test_deleted_rows_are_returned_as_tombstones(self):
+        play_id, performance_id = self.play.id, self.performance.id
+        self.play.delete()
+
+        self.assertEqual(
+            sorted(self.changed()),
+            [
+                ("performance", performance_id, True),
+                ("play", play_id, True),
+            ]
+        )
+
+    def test_play_links_change_the_play(self):
+        actor = Actor.objects.create(first_name="Ann", last_name="Lee")
+        self.play.actors.add(actor)
+
+        self.assertEqual(
+            self.changed(),
+            [("actor", actor.id, False), ("play", self.play.id, False)]
+        )
+
+    @override_settings(CATALOG_CHANGES_PAGE_SIZE=3)
+    def test_changes_are_paged(self):
+        first = self.sync()
+        second = self.sync(first["cursor"])
+
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(len(first["changes"]) + len(second["changes"]), 4)
+
+    def test_sync_without_changes_reads_the_indexes_only(self):
+        # five models and the tombstones
+        with self.assertNumQueries(6):
+            body = self.sync(self.cursor)
+
+        self.assertEqual(body, {
+            "cursor": self.cursor, "has_more": False, "changes": []
+        })
+
+    def test_invalid_cursor_is_rejected(self):
+        res = self.client.get(CHANGES_URL, {"since": "yesterday"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CatalogChangesSnapshotTests(TransactionTestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet", description="A tragedy"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Main Hall", rows=10, seats_in_row=20
+            ),
+            show_time=timezone.now()
+        )
+        self.cursor = self.sync()["cursor"]
+
+    def sync(self, since=None):
+        res = self.client.get(
+            CHANGES_URL, {} if since is None else {"since": since}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.json()
+
+    def write_elsewhere(self):
+        """Commits a new genre, then a performance change, on another
+        connection"""
+        def write():
+            try:
+                self.genre = Genre.objects.create(name="Drama")
+                self.performance.show_time += timezone.timedelta(hours=1)
+                self.performance.save()
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+
+    def test_commit_between_the_reads_is_not_skipped(self):
+        write_elsewhere = self.write_elsewhere
+
+        class InterleavedQuerysets(dict):
+            def items(self):
+                for model, queryset in super().items():
+                    yield model, queryset
+                    if model == "genre":
+                        write_elsewhere()
+
+        with mock.patch(
+            "theatre.changes.tracked_querysets",
+            lambda: InterleavedQuerysets(tracked_querysets())
+        ):
+            body = self.sync(self.cursor)
+
+        self.assertEqual(body["changes"], [])
+        self.assertEqual(
+            [
+                (change["model"], change["id"])
+                for change in self.sync(body["cursor"])["changes"]
+            ],
+            [("genre", self.genre.id), ("performance", self.performance.id)]
+        )
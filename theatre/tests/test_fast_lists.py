@@ -0,0 +1,125 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+PLAY_LIST_URL = reverse("theatre:play-list")
+PERFORMANCE_LIST_URL = reverse("theatre:performance-list")
+GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04"
+    b"\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D"
+    b"\x01\x00;"
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), FAST_LIST_RESPONSES=True)
+class FastListTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        drama = Genre.objects.create(name="Drama")
+        comedy = Genre.objects.create(name="Comedy")
+        actor = Actor.objects.create(first_name="Benny", last_name="Hill")
+        other_actor = Actor.objects.create(first_name="Ann", last_name="Lee")
+
+        self.play = Play.objects.create(
+            title="Hamlet",
+            description="A tragedy",
+            image=SimpleUploadedFile("hamlet.gif", GIF, "image/gif"),
+        )
+        self.play.genres.add(drama, comedy)
+        self.play.actors.add(actor, other_actor)
+        other_play = Play.objects.create(
+            title="Cats", description="A musical"
+        )
+        other_play.genres.add(comedy)
+
+        halls = [
+            TheatreHall.objects.create(
+                name=f"Hall {number}", rows=10, seats_in_row=number + 5
+            )
+            for number in range(2)
+        ]
+        reservation = Reservation.objects.create(user=user)
+        for day in range(4):
+            performance = Performance.objects.create(
+                play=self.play if day % 2 else other_play,
+                theatre_hall=halls[day % 2],
+                show_time=timezone.now() + timezone.timedelta(days=day),
+            )
+            for seat in range(day):
+                Ticket.objects.create(
+                    row=1,
+                    seat=seat + 1,
+                    performance=performance,
+                    reservation=reservation,
+                )
+
+    def assert_same_as_serializer(self, url, params=None):
+        fast = self.client.get(url, params)
+        with override_settings(FAST_LIST_RESPONSES=False):
+            serialized = self.client.get(url, params)
+
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, serialized.content)
+        return fast.json()
+
+    def test_performance_list_matches_serializer(self):
+        rows = self.assert_same_as_serializer(PERFORMANCE_LIST_URL)
+
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[1]["play_image"].startswith("http://testserver/"))
+
+    def test_performance_list_filters_match_serializer(self):
+        rows = self.assert_same_as_serializer(
+            PERFORMANCE_LIST_URL, {"play": self.play.id}
+        )
+
+        self.assertEqual(len(rows), 2)
+
+    @override_settings(TIME_ZONE="Europe/Prague")
+    def test_show_time_is_rendered_in_current_timezone(self):
+        self.assert_same_as_serializer(PERFORMANCE_LIST_URL)
+
+    def test_play_list_matches_serializer(self):
+        rows = self.assert_same_as_serializer(PLAY_LIST_URL)
+
+        self.assertEqual(
+            [row["title"] for row in rows], ["Cats", "Hamlet"]
+        )
+        self.assertEqual(rows[1]["actors"], ["Benny Hill", "Ann Lee"])
+        self.assertIsNone(rows[0]["image"])
+
+    def test_play_list_filters_match_serializer(self):
+        genre = Genre.objects.get(name="Comedy")
+        self.assert_same_as_serializer(
+            PLAY_LIST_URL, {"genres": str(genre.id)}
+        )
+
+    def test_performance_list_takes_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(PERFORMANCE_LIST_URL)
+
+    def test_play_list_takes_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(PLAY_LIST_URL)
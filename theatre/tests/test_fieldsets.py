@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Prop,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+PLAY_LIST_URL = reverse("theatre:play-list")
+PERFORMANCE_LIST_URL = reverse("theatre:performance-list")
+
+
+def detail_url(performance_id):
+    return reverse("theatre:performance-detail", args=[performance_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.play = Play.objects.create(
+            title="Hamlet", description="A tragedy"
+        )
+        self.genre = Genre.objects.create(name="Drama")
+        self.play.genres.add(self.genre)
+        self.play.actors.add(
+            Actor.objects.create(first_name="Benny", last_name="Hill")
+        )
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=TheatreHall.objects.create(
+                name="Main Hall", rows=10, seats_in_row=20
+            ),
+            show_time=timezone.now() + timezone.timedelta(days=1)
+        )
+        self.prop = Prop.objects.create(name="Skull")
+        self.performance.props.add(self.prop)
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.user)
+        )
+
+    def capture(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.json(), [query["sql"] for query in context.captured_queries]
+
+    def test_detail_renders_picked_subfields(self):
+        data, queries = self.capture(
+            detail_url(self.performance.id),
+            {"fields": "id,show_time,play.title"}
+        )
+
+        self.assertEqual(list(data), ["id", "show_time", "play"])
+        self.assertEqual(data["play"], {"title": "Hamlet"})
+        # no props, actors, genres nor taken seats
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("theatre_theatrehall", queries[0])
+
+    def test_relations_are_collapsed_to_primary_keys(self):
+        data, queries = self.capture(
+            detail_url(self.performance.id), {"fields": "id,play,props"}
+        )
+
+        self.assertEqual(
+            data,
+            {
+                "id": self.performance.id,
+                "play": self.play.id,
+                "props": [self.prop.id],
+            }
+        )
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("theatre_play", queries[0])
+
+    def test_expanded_relation_is_rendered_whole(self):
+        data, queries = self.capture(
+            detail_url(self.performance.id),
+            {"fields": "id,play", "expand": "play"}
+        )
+
+        self.assertEqual(data["play"]["genres"], [
+            {"id": self.genre.id, "name": "Drama"}
+        ])
+        self.assertEqual(data["play"]["actors"][0]["full_name"], "Benny Hill")
+        # performance with its play, actors, genres
+        self.assertEqual(len(queries), 3)
+
+    def test_partial_update_reads_all_input_fields(self):
+        res = self.client.patch(
+            detail_url(self.performance.id) + "?fields=id,props",
+            {"props": [{"name": "Crown"}]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data), ["id", "props"])
+        self.assertEqual(
+            list(self.performance.props.values_list("name", flat=True)),
+            ["Crown"]
+        )
+
+    def test_list_skips_ticket_count(self):
+        data, queries = self.capture(
+            PERFORMANCE_LIST_URL, {"fields": "id,play_title"}
+        )
+
+        self.assertEqual(
+            data, [{"id": self.performance.id, "play_title": "Hamlet"}]
+        )
+        self.assertNotIn("COUNT(", queries[0])
+
+    @override_settings(FAST_LIST_RESPONSES=True)
+    def test_fast_lists_match_serializers(self):
+        for url, fields in [
+            (PERFORMANCE_LIST_URL, "show_time,tickets_available"),
+            (PLAY_LIST_URL, "title,genres"),
+        ]:
+            params = {"fields": fields}
+            fast = self.client.get(url, params)
+            with override_settings(FAST_LIST_RESPONSES=False):
+                serialized = self.client.get(url, params)
+
+            self.assertEqual(fast.content, serialized.content)
+
+    @override_settings(FAST_LIST_RESPONSES=True)
+    def test_play_list_skips_unpicked_relations(self):
+        data, queries = self.capture(PLAY_LIST_URL, {"fields": "title"})
+
+        self.assertEqual(data, [{"title": "Hamlet"}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0])
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from theatre.cache import LRUCache
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+    hall_dimensions_cache,
+    performance_dimensions,
+)
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        cache = LRUCache(timeout=10)
+        with mock.patch("theatre.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with mock.patch("theatre.cache.time.monotonic", return_value=110):
+            self.assertIsNone(cache.get("a"))
+
+
+class HallDimensionsCacheTests(TestCase):
+    def setUp(self):
+        hall_dimensions_cache.clear()
+        self.addCleanup(hall_dimensions_cache.clear)
+
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(
+                title="Example Play",
+                description="An example play description.",
+            ),
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now()
+        )
+        self.reservation = Reservation.objects.create(user=user)
+
+    def test_dimensions_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            performance_dimensions(self.performance.id)
+            dimensions = performance_dimensions(self.performance.id)
+
+        self.assertEqual(dimensions, (10, 20))
+
+    def test_ticket_validation_does_not_load_the_hall(self):
+        performance_dimensions(self.performance.id)
+        ticket = Ticket(
+            row=11,
+            seat=1,
+            performance_id=self.performance.id,
+            reservation=self.reservation
+        )
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(ValidationError):
+                ticket.clean()
+
+    def test_hall_change_invalidates_dimensions(self):
+        performance_dimensions(self.performance.id)
+
+        self.theatre_hall.rows = 5
+        self.theatre_hall.save()
+
+        self.assertEqual(performance_dimensions(self.performance.id), (5, 20))
+
+    def test_performance_hall_change_invalidates_dimensions(self):
+        performance_dimensions(self.performance.id)
+
+        self.performance.theatre_hall = TheatreHall.objects.create(
+            name="Small Hall",
+            rows=2,
+            seats_in_row=5
+        )
+        self.performance.save()
+
+        self.assertEqual(performance_dimensions(self.performance.id), (2, 5))
@@ -0,0 +1,98 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from theatre_service import health
+
+
+class WaitForDbTests(SimpleTestCase):
+    @mock.patch("theatre.management.commands.wait_for_db.time.sleep")
+    @mock.patch("django.db.backends.base.base.BaseDatabaseWrapper"
+                ".ensure_connection")
+    def test_waits_with_backoff(self, ensure_connection, sleep):
+        ensure_connection.side_effect = [OperationalError] * 3 + [None]
+
+        call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(ensure_connection.call_count, 4)
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list],
+            [0.1, 0.2, 0.4]
+        )
+
+    @mock.patch("theatre.management.commands.wait_for_db.time.sleep")
+    @mock.patch("django.db.backends.base.base.BaseDatabaseWrapper"
+                ".ensure_connection", side_effect=OperationalError)
+    def test_gives_up_after_timeout(self, ensure_connection, sleep):
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+        sleep.assert_not_called()
+
+
+class HealthEndpointTests(TestCase):
+    def setUp(self):
+        health._report["expires_at"] = 0.0
+        self.addCleanup(health._report.update, expires_at=0.0)
+        self.broker = mock.Mock()
+        checks = mock.patch.dict(health.CHECKS, broker=self.broker)
+        checks.start()
+        self.addCleanup(checks.stop)
+
+    def test_healthz(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(reverse("healthz"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"status": "ok"})
+
+    def test_readyz(self):
+        res = self.client.get(reverse("readyz"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            {
+                name: check["ok"]
+                for name, check in res.json()["checks"].items()
+            },
+            {"database": True, "cache": True, "broker": True}
+        )
+
+    def test_readyz_reports_unavailable_dependency(self):
+        self.broker.side_effect = ConnectionRefusedError
+
+        res = self.client.get(reverse("readyz"))
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(
+            res.json()["checks"]["broker"]["error"], "ConnectionRefusedError"
+        )
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=3)
+    def test_database_check_is_bounded_by_health_check_timeout(self):
+        wrapper = type(connections["default"])
+        with mock.patch.object(
+            wrapper,
+            "get_new_connection",
+            autospec=True,
+            side_effect=wrapper.get_new_connection
+        ) as connect:
+            health.check_database()
+
+        conn_params = connect.call_args.args[1]
+        self.assertEqual(conn_params["connect_timeout"], 3)
+        self.assertEqual(conn_params["options"], "-c statement_timeout=3000")
+
+    def test_readyz_results_are_reused(self):
+        self.client.get(reverse("readyz"))
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse("readyz"))
+
+        self.broker.assert_called_once()
@@ -0,0 +1,180 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+from django.utils import timezone
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    IdempotencyKey,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall
+)
+
+RESERVATION_LIST_URL = reverse("theatre:reservation-list")
+
+
+class IdempotentReservationApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now()
+        )
+        self.payload = {
+            "tickets": [
+                {"row": 5, "seat": 10, "performance": self.performance.id}
+            ]
+        }
+
+    def post_reservation(self, key, payload=None):
+        return self.client.post(
+            RESERVATION_LIST_URL,
+            data=payload or self.payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_repeated_key_replays_response(self):
+        first = self.post_reservation("key-1")
+        second = self.post_reservation("key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_replay_does_not_touch_reservation_tables(self):
+        self.post_reservation("key-1")
+
+        with self.assertNumQueries(1):
+            self.post_reservation("key-1")
+
+    def test_key_reused_with_different_payload(self):
+        self.post_reservation("key-1")
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "performance": self.performance.id}
+            ]
+        }
+
+        res = self.post_reservation("key-1", payload)
+
+        self.assertEqual(
+            res.status_code,
+            status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+    def test_in_progress_key_returns_conflict(self):
+        self.post_reservation("key-1")
+        IdempotencyKey.objects.filter(key="key-1").update(status_code=None)
+
+        res = self.post_reservation("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_key_of_unfinished_request_is_taken_over_after_lease(self):
+        self.post_reservation("key-1")
+        # the first request was killed before it stored its response
+        Reservation.objects.all().delete()
+        IdempotencyKey.objects.update(
+            status_code=None,
+            body=None,
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        res = self.post_reservation("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 1)
+        record = IdempotencyKey.objects.get()
+        self.assertEqual(record.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(
+            record.expires_at, timezone.now() + timedelta(hours=23)
+        )
+
+    def test_key_released_by_concurrent_duplicate_is_claimed(self):
+        create = IdempotencyKey.objects.create
+        calls = []
+
+        def create_after_released_duplicate(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                # a duplicate held the key and has released it since
+                raise IntegrityError
+            return create(**kwargs)
+
+        with mock.patch.object(
+            IdempotencyKey.objects, "create", create_after_released_duplicate
+        ):
+            res = self.post_reservation("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(calls), 2)
+
+    def test_validation_error_releases_key(self):
+        payload = {
+            "tickets": [
+                {"row": 11, "seat": 1, "performance": self.performance.id}
+            ]
+        }
+
+        res = self.post_reservation("key-1", payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_expired_key_executes_again(self):
+        self.post_reservation("key-1")
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "performance": self.performance.id}
+            ]
+        }
+
+        res = self.post_reservation("key-1", payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_clean_idempotency_keys_command(self):
+        self.post_reservation("key-1")
+        self.post_reservation("key-2", {"tickets": []})
+        IdempotencyKey.objects.filter(key="key-1").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        call_command("clean_idempotency_keys", stdout=StringIO())
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)),
+            ["key-2"]
+        )
@@ -0,0 +1,141 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework_simplejwt.tokens import AccessToken
+
+PLAY_IMAGE = "uploads/plays/hamlet-0f8fad5b-d9cb-469f-a165-70867728950e.jpg"
+CONTENT = bytes(range(256)) * 4
+
+
+def media_url(path):
+    return reverse("media", args=[path])
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media_root = directory.name
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for path in (PLAY_IMAGE, "private/report.txt"):
+            full_path = os.path.join(self.media_root, path)
+            os.makedirs(os.path.dirname(full_path))
+            with open(full_path, "wb") as media_file:
+                media_file.write(CONTENT)
+        self.modified = os.stat(
+            os.path.join(self.media_root, PLAY_IMAGE)
+        ).st_mtime
+
+    def test_serve_whole_file(self):
+        res = self.client.get(media_url(PLAY_IMAGE))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertEqual(res["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertIn("immutable", res["Cache-Control"])
+
+    def test_serve_range(self):
+        res = self.client.get(media_url(PLAY_IMAGE), HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+        self.assertEqual(res["Content-Length"], "10")
+
+    def test_serve_suffix_range(self):
+        res = self.client.get(media_url(PLAY_IMAGE), HTTP_RANGE="bytes=-5")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(
+            media_url(PLAY_IMAGE), HTTP_RANGE=f"bytes={len(CONTENT)}-"
+        )
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_not_modified(self):
+        res = self.client.get(
+            media_url(PLAY_IMAGE),
+            HTTP_IF_MODIFIED_SINCE=http_date(self.modified + 1)
+        )
+
+        self.assertEqual(res.status_code, 304)
+
+    @override_settings(MEDIA_SERVE_BACKEND="nginx")
+    def test_x_accel_redirect(self):
+        res = self.client.get(media_url(PLAY_IMAGE))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(
+            res["X-Accel-Redirect"], f"/protected-media/{PLAY_IMAGE}"
+        )
+
+    @override_settings(MEDIA_SERVE_BACKEND="sendfile")
+    def test_x_sendfile(self):
+        res = self.client.get(media_url(PLAY_IMAGE))
+
+        self.assertEqual(
+            res["X-Sendfile"], os.path.join(self.media_root, PLAY_IMAGE)
+        )
+
+    def test_private_files_are_served_to_staff_only(self):
+        self.assertEqual(
+            self.client.get(media_url("private/report.txt")).status_code, 404
+        )
+
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                email="admin@test.com",
+                password="testpassword",
+                is_staff=True
+            )
+        )
+        res = self.client.get(media_url("private/report.txt"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("immutable", res["Cache-Control"])
+
+    def test_private_files_are_served_to_staff_with_jwt(self):
+        staff = get_user_model().objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True
+        )
+
+        res = self.client.get(
+            media_url("private/report.txt"),
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(staff)}"
+        )
+        invalid = self.client.get(
+            media_url("private/report.txt"),
+            HTTP_AUTHORIZATION="Bearer invalid"
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(invalid.status_code, 404)
+
+    def test_traversal_from_public_prefix_to_private_file(self):
+        for url in (
+            "/media/uploads/plays/../../private/report.txt",
+            "/media/uploads/plays/%2e%2e/%2e%2e/private/report.txt",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_path_traversal(self):
+        res = self.client.get(media_url("uploads/plays/../../../etc/passwd"))
+
+        self.assertEqual(res.status_code, 404)
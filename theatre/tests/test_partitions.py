@@ -0,0 +1,149 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket
+)
+from theatre.partitions import (
+    archive_name,
+    create_partition,
+    archive_partition,
+    monthly_partitions,
+    partition_name
+)
+
+MARCH = datetime.date(2024, 3, 1)
+APRIL = datetime.date(2024, 4, 1)
+
+
+class TicketPartitionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.march_performance = Performance.objects.create(
+            play=play,
+            theatre_hall=theatre_hall,
+            show_time="2024-03-31T23:30:00Z"
+        )
+        self.april_performance = Performance.objects.create(
+            play=play,
+            theatre_hall=theatre_hall,
+            show_time="2024-04-01T01:30:00Z"
+        )
+        self.reservation = Reservation.objects.create(user=self.user)
+        for performance in (self.march_performance, self.april_performance):
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                performance=performance,
+                reservation=self.reservation
+            )
+
+    def test_show_month_follows_performance(self):
+        ticket = self.march_performance.tickets.get()
+        self.assertEqual(ticket.show_month, MARCH)
+
+        self.march_performance.show_time = "2024-04-02T10:00:00Z"
+        self.march_performance.save()
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.show_month, APRIL)
+
+    def test_create_partition_moves_rows_from_default(self):
+        self.assertTrue(create_partition(MARCH))
+        self.assertFalse(create_partition(MARCH))
+
+        self.assertEqual(monthly_partitions(), {MARCH: partition_name(MARCH)})
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {partition_name(MARCH)}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertEqual(self.march_performance.tickets.count(), 1)
+
+    def test_unique_together_still_enforced(self):
+        create_partition(MARCH)
+
+        res = self.client.post(
+            reverse("theatre:reservation-list"),
+            data={
+                "tickets": [
+                    {
+                        "row": 1,
+                        "seat": 1,
+                        "performance": self.march_performance.id
+                    }
+                ]
+            },
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_query_is_pruned_to_one_partition(self):
+        create_partition(MARCH)
+        create_partition(APRIL)
+
+        plan = Ticket.objects.for_performance(self.march_performance).explain()
+
+        self.assertIn(partition_name(MARCH), plan)
+        self.assertNotIn(partition_name(APRIL), plan)
+        self.assertNotIn("theatre_ticket_default", plan)
+
+    def test_performance_detail_reads_taken_seats_from_partition(self):
+        create_partition(APRIL)
+
+        res = self.client.get(
+            reverse(
+                "theatre:performance-detail",
+                args=[self.april_performance.id]
+            )
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["taken_seats"], [{"row": 1, "seat": 1}])
+
+    def test_archive_partition_detaches_tickets(self):
+        create_partition(MARCH)
+
+        name = archive_partition(MARCH)
+
+        self.assertEqual(name, archive_name(MARCH))
+        self.assertEqual(monthly_partitions(), {})
+        self.assertFalse(self.march_performance.tickets.exists())
+        self.assertTrue(self.april_performance.tickets.exists())
+
+    def test_manage_ticket_partitions_command(self):
+        call_command(
+            "manage_ticket_partitions",
+            months_ahead=2,
+            retain_months=0,
+            stdout=StringIO()
+        )
+
+        self.assertEqual(len(monthly_partitions()), 3)
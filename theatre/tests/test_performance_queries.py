@@ -0,0 +1,155 @@
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Prop,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+
+PERFORMANCE_LIST_URL = reverse("theatre:performance-list")
+DESCRIPTION_SIZE = 1024 * 1024
+
+
+def detail_url(performance_id):
+    return reverse("theatre:performance-detail", args=[performance_id])
+
+
+class PerformanceQueryPlanTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        reservation = Reservation.objects.create(user=self.user)
+        self.performances = []
+        for number in range(5):
+            play = Play.objects.create(
+                title=f"Play {number}",
+                description="x" * DESCRIPTION_SIZE,
+            )
+            play.genres.add(Genre.objects.create(name=f"Genre {number}"))
+            play.actors.add(
+                Actor.objects.create(first_name="Ann", last_name=str(number))
+            )
+            performance = Performance.objects.create(
+                play=play,
+                theatre_hall=self.theatre_hall,
+                show_time=timezone.now() + timezone.timedelta(days=number),
+            )
+            performance.props.add(Prop.objects.create(name=f"Prop {number}"))
+            Ticket.objects.bulk_create(
+                [
+                    Ticket(
+                        row=1,
+                        seat=seat,
+                        performance=performance,
+                        reservation=reservation,
+                    )
+                    for seat in range(1, 11)
+                ]
+            )
+            self.performances.append(performance)
+        self.performance = self.performances[0]
+
+    def capture(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            res = getattr(self.client, method)(url, data, format="json")
+        return res, [query["sql"] for query in context.captured_queries]
+
+    @override_settings(FAST_LIST_RESPONSES=False)
+    def test_list_reads_only_listed_columns(self):
+        res, queries = self.capture("get", PERFORMANCE_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["tickets_available"], 190)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"theatre_play"."description"', queries[0])
+
+    @override_settings(FAST_LIST_RESPONSES=False)
+    def test_list_does_not_load_descriptions(self):
+        tracemalloc.start()
+        try:
+            res = self.client.get(PERFORMANCE_LIST_URL)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(len(res.data), 5)
+        self.assertLess(peak, DESCRIPTION_SIZE)
+
+    def test_retrieve_does_not_count_tickets(self):
+        res, queries = self.capture("get", detail_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # performance, props, actors, genres, taken seats
+        self.assertEqual(len(queries), 5)
+        self.assertNotIn("COUNT(", queries[0])
+        self.assertEqual(len(res.data["taken_seats"]), 10)
+
+    def test_partial_update_does_not_count_tickets(self):
+        res, queries = self.capture(
+            "patch",
+            detail_url(self.performance.id),
+            {"show_time": timezone.now() - timezone.timedelta(days=1)}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(any("COUNT(" in query for query in queries))
+        self.assertEqual(res.data["play"]["title"], "Play 0")
+
+    def test_destroy_does_not_load_tickets(self):
+        loaded = []
+
+        def record(sender, instance, **kwargs):
+            loaded.append(instance)
+
+        post_delete.connect(record, sender=Ticket)
+        self.addCleanup(post_delete.disconnect, record, sender=Ticket)
+
+        res, queries = self.capture(
+            "delete", detail_url(self.performance.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(loaded, [])
+        self.assertFalse(any("COUNT(" in query for query in queries))
+        self.assertFalse(
+            Ticket.objects.filter(performance_id=self.performance.id).exists()
+        )
+        self.assertFalse(
+            Performance.objects.filter(pk=self.performance.pk).exists()
+        )
+        self.assertEqual(Ticket.objects.count(), 40)
+
+    def test_delete_for_performance_deletes_only_its_tickets(self):
+        deleted = Ticket.objects.delete_for_performance(self.performance)
+
+        self.assertEqual(deleted, 10)
+        self.assertFalse(
+            Ticket.objects.filter(performance_id=self.performance.id).exists()
+        )
+        self.assertEqual(Ticket.objects.count(), 40)
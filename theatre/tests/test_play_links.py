@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from theatre.models import Actor, Genre, Play
+
+PLAY_LIST_URL = reverse("theatre:play-list")
+
+
+class PlayLinkArrayTests(TestCase):
+    def setUp(self):
+        self.drama = Genre.objects.create(name="Drama")
+        self.comedy = Genre.objects.create(name="Comedy")
+        self.actor = Actor.objects.create(first_name="Benny", last_name="Hill")
+        self.play = Play.objects.create(
+            title="Hamlet", description="A tragedy"
+        )
+
+    def links(self):
+        play = Play.objects.get(pk=self.play.pk)
+        return (
+            play.genre_ids,
+            play.genre_names,
+            play.actor_ids,
+            play.actor_names,
+        )
+
+    def test_links_are_copied(self):
+        self.play.genres.add(self.comedy, self.drama)
+        self.play.actors.add(self.actor)
+
+        self.assertEqual(
+            self.links(),
+            (
+                [self.drama.id, self.comedy.id],
+                ["Drama", "Comedy"],
+                [self.actor.id],
+                ["Benny Hill"],
+            )
+        )
+
+    def test_links_changed_from_the_other_side_are_copied(self):
+        self.drama.play_set.add(self.play)
+        self.assertEqual(self.links()[1], ["Drama"])
+
+        self.drama.play_set.clear()
+        self.assertEqual(self.links()[1], [])
+
+    def test_renamed_and_deleted_names_are_copied(self):
+        self.play.genres.add(self.drama)
+        self.play.actors.add(self.actor)
+
+        self.drama.name = "Tragedy"
+        self.drama.save()
+        self.actor.delete()
+
+        self.assertEqual(
+            self.links(), ([self.drama.id], ["Tragedy"], [], [])
+        )
+
+    def test_stale_instance_does_not_write_links_back(self):
+        stale = Play.objects.get(pk=self.play.pk)
+        self.play.genres.add(self.drama)
+
+        stale.title = "Macbeth"
+        stale.save()
+
+        self.assertEqual(self.links()[1], ["Drama"])
+
+    def test_filters_read_the_play_table_only(self):
+        self.play.genres.add(self.drama)
+        self.play.actors.add(self.actor)
+        Play.objects.create(title="Cats", description="A musical")
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.com", password="testpassword"
+            )
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            res = client.get(
+                PLAY_LIST_URL,
+                {
+                    "genres": f"{self.drama.id},{self.comedy.id}",
+                    "actors": str(self.actor.id),
+                }
+            )
+
+        self.assertEqual([row["title"] for row in res.json()], ["Hamlet"])
+        self.assertEqual(len(context.captured_queries), 1)
+        query = context.captured_queries[0]["sql"]
+        self.assertNotIn("JOIN", query)
+        self.assertNotIn("DISTINCT", query)
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import Performance, Play, Prop, TheatreHall
+from theatre.props import PerformanceProp, assign_props, resolve_props
+
+ASSIGN_PROPS_URL = reverse("theatre:performance-assign-props")
+
+
+def detail_url(performance_id):
+    return reverse("theatre:performance-detail", args=[performance_id])
+
+
+class PerformancePropsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.performances = [
+            Performance.objects.create(
+                play=play,
+                theatre_hall=theatre_hall,
+                show_time=timezone.now() + timedelta(days=day)
+            )
+            for day in range(3)
+        ]
+        self.sword = Prop.objects.create(name="Sword")
+        self.crown = Prop.objects.create(name="Crown")
+        self.performances[0].props.set([self.sword, self.crown])
+
+    def update_props(self, names):
+        return self.client.patch(
+            detail_url(self.performances[0].id),
+            {"props": [{"name": name} for name in names]},
+            format="json"
+        )
+
+    def test_resolve_props_reuses_existing_props(self):
+        with self.assertNumQueries(2):
+            props = resolve_props(["Sword", "Skull", "Skull", "Dagger"])
+
+        self.assertEqual(
+            [prop.name for prop in props], ["Sword", "Skull", "Dagger"]
+        )
+        self.assertEqual(props[0], self.sword)
+        self.assertEqual(Prop.objects.count(), 4)
+
+    def test_assign_props_writes_only_the_difference(self):
+        performance = self.performances[0]
+        dagger = Prop.objects.create(name="Dagger")
+        sword_link = performance.props.through.objects.get(
+            performance=performance, prop=self.sword
+        )
+
+        assign_props([performance.id], [self.sword, dagger])
+
+        self.assertEqual(
+            set(performance.props.all()), {self.sword, dagger}
+        )
+        self.assertTrue(
+            performance.props.through.objects.filter(
+                id=sword_link.id
+            ).exists()
+        )
+
+    def test_assign_props_skips_links_added_concurrently(self):
+        performance = self.performances[0]
+        links = PerformanceProp.objects.filter(performance=performance)
+        # the link to the sword is read as missing, as if another call
+        # had inserted it right after the read
+        querysets = [
+            PerformanceProp.objects.filter(performance_id__in=[performance]),
+            PerformanceProp.objects.none(),
+        ]
+
+        with mock.patch.object(
+            PerformanceProp.objects, "filter", side_effect=querysets
+        ):
+            assign_props([performance.id], [self.sword])
+
+        self.assertEqual(
+            list(links.values_list("prop_id", flat=True)), [self.sword.id]
+        )
+
+    def test_update_query_count_does_not_depend_on_props(self):
+        self.update_props(["Sword"])
+
+        with self.assertNumQueries(16):
+            self.update_props(["Skull", "Dagger"])
+        with self.assertNumQueries(16):
+            res = self.update_props([f"Prop {i}" for i in range(20)])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["props"]), 20)
+        self.assertEqual(self.performances[0].props.count(), 20)
+
+    def test_partial_update_without_props_keeps_them(self):
+        res = self.client.patch(
+            detail_url(self.performances[0].id),
+            {"show_time": self.performances[0].show_time.isoformat()},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["props"]), 2)
+
+    def test_assign_props_to_many_performances(self):
+        performance_ids = [
+            performance.id for performance in self.performances
+        ]
+
+        with self.assertNumQueries(8):
+            res = self.client.post(
+                ASSIGN_PROPS_URL,
+                {
+                    "performances": performance_ids,
+                    "props": [{"name": "Sword"}, {"name": "Mask"}],
+                },
+                format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["performances"], performance_ids)
+        for performance in self.performances:
+            self.assertEqual(
+                {prop.name for prop in performance.props.all()},
+                {"Sword", "Mask"}
+            )
+
+    def test_assign_props_to_unknown_performance(self):
+        res = self.client.post(
+            ASSIGN_PROPS_URL,
+            {"performances": [0], "props": [{"name": "Sword"}]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Prop.objects.filter(name="Mask").exists())
@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from theatre.models import Performance, Play, Reservation, TheatreHall
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
 from theatre.serializers import ReservationSerializer
 
 
@@ -79,3 +79,86 @@ class AuthenticatedReservationApiTests(TestCase):
             str(self.reservation),
             f"{self.reservation.created_at}"
         )
+
+
+class ReservationListAvailabilityTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.performances = [
+            Performance.objects.create(
+                play=Play.objects.create(
+                    title=f"Play {number}",
+                    description="An example play description.",
+                ),
+                theatre_hall=self.theatre_hall,
+                show_time=timezone.now() + timezone.timedelta(days=number)
+            )
+            for number in range(2)
+        ]
+        other_user = get_user_model().objects.create_user(
+            email="other@test.com",
+            password="testpassword"
+        )
+        self.book(other_user, self.performances[0], [1, 2, 3])
+
+    def book(self, user, performance, seats):
+        reservation = Reservation.objects.create(user=user)
+        for seat in seats:
+            Ticket.objects.create(
+                row=1,
+                seat=seat,
+                performance=performance,
+                reservation=reservation
+            )
+        return reservation
+
+    def test_nested_performances_report_available_tickets(self):
+        self.book(self.user, self.performances[0], [4])
+        self.book(self.user, self.performances[1], [1, 2])
+
+        res = self.client.get(reverse("theatre:reservation-list"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        available = {
+            ticket["performance"]["id"]: (
+                ticket["performance"]["tickets_available"]
+            )
+            for reservation in res.data["results"]
+            for ticket in reservation["tickets"]
+        }
+        self.assertEqual(
+            available,
+            {self.performances[0].id: 196, self.performances[1].id: 198}
+        )
+        performance = res.data["results"][0]["tickets"][0]["performance"]
+        self.assertEqual(performance["theatre_hall_capacity"], 200)
+
+    def test_page_takes_fixed_number_of_queries(self):
+        for number in range(3):
+            performance = Performance.objects.create(
+                play=self.performances[0].play,
+                theatre_hall=self.theatre_hall,
+                show_time=timezone.now() + timezone.timedelta(
+                    days=10 + number
+                )
+            )
+            self.book(self.user, performance, [1, 2])
+
+        # count, reservations, tickets, performances with availability
+        with self.assertNumQueries(4):
+            res = self.client.get(
+                reverse("theatre:reservation-list"), {"page_size": 10}
+            )
+
+        self.assertEqual(len(res.data["results"]), 3)
@@ -0,0 +1,216 @@
+from datetime import datetime, timedelta, timezone
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre.models import Performance, Play, TheatreHall
+from theatre.scheduling import find_conflicts
+
+PERFORMANCE_LIST_URL = reverse("theatre:performance-list")
+PERFORMANCE_SCHEDULE_URL = reverse("theatre:performance-schedule")
+MIGRATION = import_module("theatre.migrations.0014_performance_end_time")
+START = datetime(2025, 1, 1, 19, tzinfo=timezone.utc)
+
+
+class PerformanceSchedulingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="admin@test.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+
+    def schedule(self, rrule, start=START, duration="02:00:00"):
+        return self.client.post(
+            PERFORMANCE_SCHEDULE_URL,
+            {
+                "play": self.play.id,
+                "theatre_hall": self.theatre_hall.id,
+                "start": start.isoformat(),
+                "duration": duration,
+                "rrule": rrule,
+            },
+            format="json"
+        )
+
+    def test_schedule_series_in_one_request(self):
+        with self.assertNumQueries(6):
+            res = self.schedule("FREQ=DAILY;COUNT=500")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 500)
+        self.assertEqual(Performance.objects.count(), 500)
+        last = Performance.objects.order_by("-show_time").first()
+        self.assertEqual(last.show_time, START + timedelta(days=499))
+        self.assertEqual(last.end_time, START + timedelta(days=499, hours=2))
+
+    def test_conflicting_series_is_rejected_atomically(self):
+        existing = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=START + timedelta(days=3, hours=1)
+        )
+
+        res = self.schedule("FREQ=DAILY;COUNT=7")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["conflicts"],
+            [
+                f"{(START + timedelta(days=3)).isoformat()} overlaps "
+                f"performance {existing.id}"
+            ]
+        )
+        self.assertEqual(Performance.objects.count(), 1)
+
+    def test_series_must_not_overlap_itself(self):
+        res = self.schedule("FREQ=HOURLY;COUNT=3")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data["conflicts"]), 2)
+        self.assertFalse(Performance.objects.exists())
+
+    def test_back_to_back_shows_do_not_conflict(self):
+        res = self.schedule("FREQ=HOURLY;INTERVAL=2;COUNT=3")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_invalid_and_unbounded_rules_are_rejected(self):
+        for rrule in ("FREQ=SOMETIMES", "FREQ=DAILY"):
+            res = self.schedule(rrule)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("rrule", res.data)
+
+    def test_find_conflicts_uses_one_query(self):
+        for day in range(0, 20, 2):
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.theatre_hall,
+                show_time=START + timedelta(days=day)
+            )
+        show_times = [START + timedelta(days=day) for day in range(20)]
+
+        with self.assertNumQueries(1):
+            conflicts = find_conflicts(
+                self.theatre_hall, show_times, timedelta(hours=2)
+            )
+
+        self.assertEqual(
+            [show_time for show_time, _ in conflicts], show_times[::2]
+        )
+
+    def test_create_overlapping_performance(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=START
+        )
+
+        res = self.client.post(
+            PERFORMANCE_LIST_URL,
+            {
+                "play": self.play.id,
+                "theatre_hall": self.theatre_hall.id,
+                "show_time": (START + timedelta(hours=1)).isoformat(),
+            },
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("show_time", res.data)
+
+    def test_exclusion_constraint_rejects_overlap(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=START
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.theatre_hall,
+                show_time=START + timedelta(minutes=30)
+            )
+
+    def test_performance_written_concurrently_is_rejected(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=START
+        )
+        later = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=START + timedelta(hours=3)
+        )
+
+        # the overlapping performance commits after the check passed
+        with mock.patch("theatre.serializers.validate_theatre_hall_is_free"):
+            created = self.client.post(
+                PERFORMANCE_LIST_URL,
+                {
+                    "play": self.play.id,
+                    "theatre_hall": self.theatre_hall.id,
+                    "show_time": (START + timedelta(hours=1)).isoformat(),
+                },
+                format="json"
+            )
+            updated = self.client.patch(
+                reverse("theatre:performance-detail", args=[later.id]),
+                {"show_time": (START + timedelta(hours=1)).isoformat()},
+                format="json"
+            )
+
+        for res in (created, updated):
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("show_time", res.data)
+        self.assertEqual(Performance.objects.count(), 2)
+
+    def test_migration_reports_overlapping_performances(self):
+        # rolled back with the test transaction
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "ALTER TABLE theatre_performance "
+                "DROP CONSTRAINT performance_theatre_hall_no_overlap"
+            )
+        MIGRATION.check_overlapping_performances(apps, None)
+        performances = [
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.theatre_hall,
+                show_time=START + timedelta(hours=hours)
+            )
+            for hours in (0, 1, 5)
+        ]
+
+        with self.assertRaises(RuntimeError) as raised:
+            MIGRATION.check_overlapping_performances(apps, None)
+
+        message = str(raised.exception)
+        for performance in performances[:2]:
+            self.assertIn(
+                f"({self.theatre_hall.id}, {performance.id}, ", message
+            )
+        self.assertNotIn(f", {performances[2].id}, ", message)
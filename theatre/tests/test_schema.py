@@ -0,0 +1,104 @@
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre_service import schema
+
+SCHEMA_URL = reverse("schema")
+
+
+class CachedSchemaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            SCHEMA_CACHE_DIR=directory.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        schema._schemas.clear()
+        self.addCleanup(schema._schemas.clear)
+        self.client = APIClient()
+
+    def get_schema(self, **headers):
+        with mock.patch.object(
+            schema.CachedSpectacularAPIView.generator_class,
+            "get_schema",
+            autospec=True,
+            side_effect=schema.CachedSpectacularAPIView.generator_class
+            .get_schema,
+        ) as get_schema:
+            res = self.client.get(SCHEMA_URL, **headers)
+        return res, get_schema.call_count
+
+    def test_schema_is_generated_once(self):
+        first, generated = self.get_schema()
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(generated, 1)
+        self.assertIn(b"openapi:", first.content)
+
+        second, generated = self.get_schema()
+        self.assertEqual(generated, 0)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_json_format(self):
+        res, _ = self.get_schema(HTTP_ACCEPT="application/json")
+
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(res.json()["info"]["title"], "Theatre API")
+
+    def test_not_modified_with_etag(self):
+        first, _ = self.get_schema()
+
+        res, generated = self.get_schema(HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(generated, 0)
+
+    def test_not_modified_with_etag_list_weak_etag_or_wildcard(self):
+        first, _ = self.get_schema()
+        etag = first["ETag"]
+
+        for if_none_match in (
+            f'"other", {etag}',
+            f"W/{etag}",
+            "*",
+        ):
+            with self.subTest(if_none_match=if_none_match):
+                res, _ = self.get_schema(HTTP_IF_NONE_MATCH=if_none_match)
+                self.assertEqual(
+                    res.status_code, status.HTTP_304_NOT_MODIFIED
+                )
+
+        res, _ = self.get_schema(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_prebuilt_schema_is_served_from_disk(self):
+        paths = schema.build_schema()
+
+        res, generated = self.get_schema()
+
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(generated, 0)
+        self.assertIn(b"openapi:", res.content)
+
+    def test_code_version_changes_etag(self):
+        self.addCleanup(schema.code_version.cache_clear)
+        etags = []
+        for version in ("1", "2"):
+            schema.code_version.cache_clear()
+            with override_settings(CODE_VERSION=version):
+                res, _ = self.get_schema()
+            etags.append(res["ETag"])
+
+        self.assertTrue(etags[0].startswith('"1-'))
+        self.assertTrue(etags[1].startswith('"2-'))
@@ -0,0 +1,373 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.seat_events import (
+    SEATS_TAKEN,
+    RedisBroker,
+    SeatHub,
+    format_event,
+    hub,
+)
+from theatre_service.sse import SeatStreamApp
+
+
+async def not_found(scope, receive, send):
+    await send({"type": "http.response.start", "status": 404})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def parse_events(body):
+    events = []
+    for block in body.decode().split("\n\n"):
+        lines = dict(
+            line.split(": ", 1)
+            for line in block.splitlines()
+            if not line.startswith(":")
+        )
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class StreamClient:
+    """Drives one request of the ASGI application"""
+
+    def __init__(self, path, token=None, method="GET"):
+        self.received = asyncio.Queue()
+        self.sent = asyncio.Queue()
+        headers = []
+        if token is not None:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        self.scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "headers": headers,
+        }
+        self.received.put_nowait({"type": "http.request", "body": b""})
+        self.task = asyncio.ensure_future(
+            SeatStreamApp(not_found)(
+                self.scope, self.received.get, self.sent.put
+            )
+        )
+
+    async def start(self):
+        return await asyncio.wait_for(self.sent.get(), 5)
+
+    async def read_events(self):
+        message = await asyncio.wait_for(self.sent.get(), 5)
+        return parse_events(message.get("body", b""))
+
+    async def disconnect(self):
+        self.received.put_nowait({"type": "http.disconnect"})
+        await asyncio.wait_for(self.task, 5)
+
+
+class FakeRedis:
+    """A Redis client whose subscription is confirmed on demand"""
+
+    def __init__(self):
+        self.confirm = threading.Event()
+        self.stop = threading.Event()
+
+    def pubsub(self):
+        if self.stop.is_set():
+            # ends the listener thread
+            raise SystemExit
+        return self
+
+    def psubscribe(self, pattern):
+        pass
+
+    def listen(self):
+        while not self.confirm.wait(0.01):
+            if self.stop.is_set():
+                return
+        yield {"type": "psubscribe", "pattern": None, "data": 1}
+        self.stop.wait()
+
+    def close(self):
+        pass
+
+
+class RedisBrokerTests(TestCase):
+    def test_start_waits_for_the_subscription(self):
+        client = FakeRedis()
+        self.addCleanup(client.stop.set)
+        with mock.patch("redis.Redis.from_url", return_value=client):
+            broker = RedisBroker(SeatHub(), "redis://localhost")
+
+        self.assertFalse(broker.start(timeout=0.05))
+        client.confirm.set()
+        self.assertTrue(broker.start(timeout=5))
+
+
+class SeatHubTests(TestCase):
+    def test_event_is_encoded_once_for_all_subscribers(self):
+        seat_hub = SeatHub()
+
+        async def scenario():
+            feed = seat_hub._feeds[1]
+            feed.taken = {(1, 1)}
+            first, taken = await seat_hub.subscribe(1)
+            second, _ = await seat_hub.subscribe(1)
+            self.assertEqual(taken, [(1, 1)])
+
+            seat_hub.dispatch(
+                {"performance": 1, "event": SEATS_TAKEN, "seats": [[2, 3]]}
+            )
+            frames = [await first.get(), await second.get()]
+
+            self.assertIs(frames[0], frames[1])
+            self.assertEqual(
+                frames[0],
+                format_event(
+                    SEATS_TAKEN, {"performance": 1, "seats": [[2, 3]]}
+                )
+            )
+            self.assertEqual(feed.taken, {(1, 1), (2, 3)})
+
+        async_to_sync(scenario)()
+
+    @override_settings(SEAT_STREAM_QUEUE_SIZE=2)
+    def test_slow_subscriber_is_closed(self):
+        seat_hub = SeatHub()
+
+        async def scenario():
+            seat_hub._feeds[1].taken = set()
+            subscription, _ = await seat_hub.subscribe(1)
+            for seat in range(3):
+                seat_hub.dispatch(
+                    {
+                        "performance": 1,
+                        "event": SEATS_TAKEN,
+                        "seats": [[1, seat]],
+                    }
+                )
+            await asyncio.sleep(0)
+
+            self.assertIsNone(await subscription.get())
+
+        async_to_sync(scenario)()
+
+    def test_feed_is_dropped_with_its_last_subscriber(self):
+        seat_hub = SeatHub()
+
+        async def scenario():
+            seat_hub._feeds[1].taken = set()
+            subscription, _ = await seat_hub.subscribe(1)
+            seat_hub.unsubscribe(subscription)
+
+        async_to_sync(scenario)()
+
+        self.assertNotIn(1, seat_hub._feeds)
+
+
+@override_settings(SEAT_EVENTS_REDIS_URL="")
+class SeatStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # as the test client does, the connection holds the test transaction
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(
+                title="Example Play",
+                description="An example play description.",
+            ),
+            theatre_hall=theatre_hall,
+            show_time=timezone.now()
+        )
+        self.reservation = Reservation.objects.create(user=self.user)
+        self.ticket = Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=self.performance,
+            reservation=self.reservation
+        )
+        self.path = (
+            f"/api/theatre/performances/{self.performance.id}/seats/stream/"
+        )
+
+    def book(self, row, seat):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("theatre:reservation-list"),
+                {
+                    "tickets": [
+                        {
+                            "row": row,
+                            "seat": seat,
+                            "performance": self.performance.id,
+                        }
+                    ]
+                },
+                format="json"
+            )
+
+    def release(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservation.delete()
+
+    def test_stream_sends_snapshot_and_deltas(self):
+        async def scenario():
+            client = StreamClient(self.path, self.token)
+            start = await client.start()
+            self.assertEqual(start["status"], 200)
+            self.assertIn(
+                (b"content-type", b"text/event-stream"), start["headers"]
+            )
+            self.assertEqual(
+                await client.read_events(),
+                [
+                    (
+                        "snapshot",
+                        {
+                            "performance": self.performance.id,
+                            "taken_seats": [[1, 1]],
+                        },
+                    )
+                ]
+            )
+
+            await sync_to_async(self.book)(5, 6)
+            self.assertEqual(
+                await client.read_events(),
+                [
+                    (
+                        "seats-taken",
+                        {
+                            "performance": self.performance.id,
+                            "seats": [[5, 6]],
+                        },
+                    )
+                ]
+            )
+
+            await sync_to_async(self.release)()
+            self.assertEqual(
+                await client.read_events(),
+                [
+                    (
+                        "seats-released",
+                        {
+                            "performance": self.performance.id,
+                            "seats": [[1, 1]],
+                        },
+                    )
+                ]
+            )
+
+            await client.disconnect()
+
+        async_to_sync(scenario)()
+
+        self.assertNotIn(self.performance.id, hub._feeds)
+
+    def test_clients_share_one_snapshot_query(self):
+        async def connect(count):
+            clients = []
+            for _ in range(count):
+                client = StreamClient(self.path, self.token)
+                await client.start()
+                await client.read_events()
+                clients.append(client)
+            return clients
+
+        async def scenario():
+            first = await connect(1)
+            # the queries run in the test thread, outside of the loop
+            no_queries = await sync_to_async(self.assertNumQueries)(0)
+            await sync_to_async(no_queries.__enter__)()
+            others = await connect(20)
+            await sync_to_async(no_queries.__exit__)(None, None, None)
+
+            await sync_to_async(self.book)(5, 6)
+            for client in first + others:
+                self.assertEqual(
+                    (await client.read_events())[0][0], "seats-taken"
+                )
+            for client in first + others:
+                await client.disconnect()
+
+        async_to_sync(scenario)()
+
+    def test_stream_requires_authentication(self):
+        async def scenario():
+            client = StreamClient(self.path, "invalid")
+            start = await client.start()
+            await client.task
+            return start
+
+        self.assertEqual(async_to_sync(scenario)()["status"], 401)
+
+    def test_stream_is_unavailable_without_subscription(self):
+        async def scenario():
+            client = StreamClient(self.path, self.token)
+            start = await client.start()
+            await client.task
+            return start
+
+        broker = mock.Mock()
+        broker.start.return_value = False
+        with mock.patch(
+            "theatre_service.sse.get_broker", return_value=broker
+        ):
+            self.assertEqual(async_to_sync(scenario)()["status"], 503)
+        self.assertNotIn(self.performance.id, hub._feeds)
+
+    def test_unknown_performance_is_not_found(self):
+        async def scenario():
+            client = StreamClient(
+                "/api/theatre/performances/0/seats/stream/", self.token
+            )
+            start = await client.start()
+            await client.task
+            return start
+
+        self.assertEqual(async_to_sync(scenario)()["status"], 404)
+
+    def test_other_paths_are_passed_to_django(self):
+        async def scenario():
+            client = StreamClient("/api/theatre/plays/", self.token)
+            start = await client.start()
+            await client.task
+            return start
+
+        self.assertEqual(async_to_sync(scenario)()["status"], 404)
@@ -5,8 +5,15 @@ from django.core.exceptions import ValidationError
 
 from rest_framework.test import APIClient
 
-from theatre.models import Play, Ticket, Performance, Reservation, TheatreHall
-from theatre.serializers import TicketSerializer
+from theatre.models import (
+    Play,
+    Ticket,
+    Performance,
+    Reservation,
+    TheatreHall,
+    hall_dimensions_cache,
+)
+from theatre.serializers import ReservationSerializer, TicketSerializer
 
 
 class AuthenticatedTicketApiTests(TestCase):
@@ -150,3 +157,99 @@ class AuthenticatedTicketApiTests(TestCase):
         serializer = TicketSerializer(data=invalid_seat_ticket_data)
         self.assertFalse(serializer.is_valid())
         self.assertIn("seat", serializer.errors)
+
+
+class BatchedTicketValidationTests(TestCase):
+    def setUp(self):
+        hall_dimensions_cache.clear()
+        self.addCleanup(hall_dimensions_cache.clear)
+
+        play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.performances = [
+            Performance.objects.create(
+                play=play,
+                theatre_hall=TheatreHall.objects.create(
+                    name=f"Hall {number}", rows=5, seats_in_row=10
+                ),
+                show_time=timezone.now() + timezone.timedelta(days=number)
+            )
+            for number in range(2)
+        ]
+
+    def tickets_data(self, count):
+        return [
+            {
+                "row": number // 10 + 1,
+                "seat": number % 10 + 1,
+                "performance": self.performances[number % 2].id,
+            }
+            for number in range(count)
+        ]
+
+    def test_tickets_are_validated_with_two_queries(self):
+        serializer = ReservationSerializer(
+            data={"tickets": self.tickets_data(50)}
+        )
+
+        # performances with their halls, taken seats
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        tickets = serializer.validated_data["tickets"]
+        self.assertEqual(len(tickets), 50)
+        self.assertIs(
+            tickets[0]["performance"], tickets[2]["performance"]
+        )
+
+    def test_string_keys_are_preloaded(self):
+        tickets_data = self.tickets_data(2)
+        for ticket_data in tickets_data:
+            ticket_data["performance"] = str(ticket_data["performance"])
+        serializer = ReservationSerializer(data={"tickets": tickets_data})
+
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_unknown_performance_is_rejected(self):
+        tickets_data = self.tickets_data(2)
+        tickets_data[1]["performance"] = 0
+        serializer = ReservationSerializer(data={"tickets": tickets_data})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("performance", serializer.errors["tickets"][1])
+
+    def test_seats_are_checked_against_the_preloaded_hall(self):
+        tickets_data = self.tickets_data(2)
+        tickets_data[0]["row"] = 6
+        serializer = ReservationSerializer(data={"tickets": tickets_data})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("row", serializer.errors["tickets"][0])
+
+    def test_taken_seats_are_rejected(self):
+        tickets_data = self.tickets_data(3)
+        Ticket.objects.create(
+            reservation=Reservation.objects.create(
+                user=get_user_model().objects.create_user(
+                    email="test@test.com", password="testpassword"
+                )
+            ),
+            **{**tickets_data[1], "performance": self.performances[1]}
+        )
+        serializer = ReservationSerializer(data={"tickets": tickets_data})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["tickets"][0], {})
+        self.assertIn("non_field_errors", serializer.errors["tickets"][1])
+
+    def test_repeated_seats_are_rejected(self):
+        tickets_data = self.tickets_data(2)
+        tickets_data.append(dict(tickets_data[0]))
+        serializer = ReservationSerializer(data={"tickets": tickets_data})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["tickets"][0], {})
+        self.assertIn("non_field_errors", serializer.errors["tickets"][2])
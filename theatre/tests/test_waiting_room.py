@@ -0,0 +1,267 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+)
+from theatre.waiting_room import (
+    TAKE_SLOT_SCRIPT,
+    TOKEN_HEADER,
+    estimated_wait,
+    join,
+    take_slot,
+    waiting_room_rates,
+)
+
+RESERVATION_LIST_URL = reverse("theatre:reservation-list")
+NOW = 1_800_000_000.0
+
+
+def waiting_room_url(performance_id):
+    return reverse(
+        "theatre:performance-waiting-room", args=[performance_id]
+    )
+
+
+class WaitingRoomTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        waiting_room_rates.local.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(waiting_room_rates.local.clear)
+
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.play = Play.objects.create(
+            title="Example Play",
+            description="An example play description.",
+        )
+        self.theatre_hall = TheatreHall.objects.create(
+            name="Main Hall",
+            rows=10,
+            seats_in_row=20
+        )
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now(),
+            waiting_room_rate=60
+        )
+
+    def post_reservation(self, token=None, performance=None):
+        headers = {TOKEN_HEADER: token} if token else {}
+        return self.client.post(
+            RESERVATION_LIST_URL,
+            {
+                "tickets": [
+                    {
+                        "row": 1,
+                        "seat": 1,
+                        "performance": (performance or self.performance).id,
+                    }
+                ]
+            },
+            format="json",
+            headers=headers
+        )
+
+    def test_slots_are_taken_in_order(self):
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            slots = [take_slot(self.performance.id, 60) for _ in range(3)]
+
+        self.assertEqual(slots, [NOW, NOW + 1, NOW + 2])
+
+    def test_idle_queue_catches_up_with_the_clock(self):
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            take_slot(self.performance.id, 60)
+        with mock.patch(
+            "theatre.waiting_room.time.time", return_value=NOW + 100
+        ):
+            self.assertEqual(take_slot(self.performance.id, 60), NOW + 100)
+
+    def test_concurrent_joins_catch_up_once(self):
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            take_slot(self.performance.id, 60)
+        incr = LocMemCache.incr
+
+        def slow_incr(*args, **kwargs):
+            # lets the other joins read the lagging counter meanwhile
+            value = incr(*args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        slots = []
+        threads = [
+            threading.Thread(
+                target=lambda: slots.append(take_slot(self.performance.id, 60))
+            )
+            for _ in range(5)
+        ]
+        with mock.patch(
+            "theatre.waiting_room.time.time", return_value=NOW + 100
+        ), mock.patch.object(
+            LocMemCache, "incr", autospec=True, side_effect=slow_incr
+        ):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(slots), [NOW + 100 + n for n in range(5)])
+
+    def test_redis_counter_is_moved_by_a_script(self):
+        backend = RedisCache("redis://localhost:6379", {})
+        client = mock.Mock(**{"eval.return_value": b"42"})
+
+        with mock.patch(
+            "theatre.waiting_room.caches", {DEFAULT_CACHE_ALIAS: backend}
+        ), mock.patch.object(
+            type(backend._cache), "get_client", return_value=client
+        ), mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            slot = take_slot(self.performance.id, 60)
+
+        self.assertEqual(slot, 42)
+        client.eval.assert_called_once_with(
+            TAKE_SLOT_SCRIPT,
+            1,
+            backend.make_and_validate_key(
+                f"waiting-room:{self.performance.id}:60"
+            ),
+            NOW,
+        )
+
+    def join_as_other_user(self, email="other@test.com"):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email=email,
+                password="testpassword"
+            )
+        )
+        return client.post(waiting_room_url(self.performance.id))
+
+    def test_join_returns_token_and_estimated_wait(self):
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            first = self.client.post(waiting_room_url(self.performance.id))
+            self.client.force_authenticate(
+                get_user_model().objects.create_user(
+                    email="other@test.com",
+                    password="testpassword"
+                )
+            )
+            second = self.client.post(waiting_room_url(self.performance.id))
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(first.data["admitted"])
+        self.assertEqual(first.data["estimated_wait"], 0)
+        self.assertFalse(second.data["admitted"])
+        self.assertEqual(second.data["estimated_wait"], 1)
+
+        with mock.patch(
+            "theatre.waiting_room.time.time", return_value=NOW + 1
+        ):
+            res = self.client.get(
+                waiting_room_url(self.performance.id),
+                headers={TOKEN_HEADER: second.data["token"]}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data["admitted"])
+
+    def test_joining_again_keeps_the_place(self):
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            first = self.client.post(waiting_room_url(self.performance.id))
+            other = self.join_as_other_user()
+            again = [
+                self.client.post(waiting_room_url(self.performance.id))
+                for _ in range(3)
+            ]
+            last = self.join_as_other_user("last@test.com")
+
+        self.assertEqual(
+            {res.data["token"] for res in again}, {first.data["token"]}
+        )
+        self.assertEqual(other.data["estimated_wait"], 1)
+        self.assertEqual(last.data["estimated_wait"], 2)
+
+    def test_invalid_token_is_rejected(self):
+        res = self.client.get(
+            waiting_room_url(self.performance.id),
+            headers={TOKEN_HEADER: "forged"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_performance_without_waiting_room_has_none(self):
+        self.performance.waiting_room_rate = None
+        self.performance.save()
+
+        res = self.client.post(waiting_room_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_booking_without_token_is_rejected_before_the_database(self):
+        self.post_reservation()
+
+        with self.assertNumQueries(0):
+            res = self.post_reservation()
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_booking_with_waiting_token_is_rejected(self):
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            join(self.performance.id, 60, self.user.id + 1)
+            ticket = join(self.performance.id, 60, self.user.id)
+
+        self.assertGreater(estimated_wait(ticket), 0)
+        with mock.patch("theatre.waiting_room.time.time", return_value=NOW):
+            res = self.post_reservation(ticket["token"])
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_booking_with_admitted_token_is_accepted(self):
+        token = self.client.post(
+            waiting_room_url(self.performance.id)
+        ).data["token"]
+
+        res = self.post_reservation(token)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_token_of_another_user_is_rejected(self):
+        ticket = join(self.performance.id, 60, self.user.id + 1)
+
+        res = self.post_reservation(ticket["token"])
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_performance_without_waiting_room_is_not_gated(self):
+        performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.theatre_hall,
+            show_time=timezone.now() + timezone.timedelta(days=1)
+        )
+
+        res = self.post_reservation(performance=performance)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -8,6 +8,10 @@ from theatre.views import (
     TheatreHallViewSet,
     PerformanceViewSet,
     ReservationViewSet,
+    ReservationRequestViewSet,
+    ArchivedReservationViewSet,
+    OccupancyAnalyticsViewSet,
+    CatalogChangesViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -17,6 +21,14 @@ router.register("plays", PlayViewSet)
 router.register("theatre-halls", TheatreHallViewSet)
 router.register("performances", PerformanceViewSet)
 router.register("reservations", ReservationViewSet)
+router.register("reservation-requests", ReservationRequestViewSet)
+router.register("archived-reservations", ArchivedReservationViewSet)
+router.register(
+    "analytics/occupancy",
+    OccupancyAnalyticsViewSet,
+    basename="occupancy"
+)
+router.register("changes", CatalogChangesViewSet, basename="changes")
 
 urlpatterns = [
     path("", include(router.urls)),
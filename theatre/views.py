@@ -1,19 +1,42 @@
 from datetime import datetime
-from django.db.models import F, Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, Prefetch, When
+from django.urls import reverse
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import viewsets, status, mixins
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiParameter,
+    OpenApiTypes,
+)
 
+from theatre.analytics import (
+    occupancy_by_day,
+    occupancy_by_play,
+    occupancy_by_theatre_hall,
+)
+from theatre.changes import changes_since
+from theatre.fast_lists import PerformanceListing, PlayListing
+from theatre.fieldsets import FIELDSET_PARAMETERS, Fieldset, expands, wants
+from theatre.idempotency import idempotent
+from theatre.permissions import HasWaitingRoomAdmission
 from theatre.models import (
     Actor,
+    ArchivedReservation,
     Genre,
     Play,
     TheatreHall,
     Performance,
-    Reservation
+    PerformanceOccupancy,
+    Reservation,
+    ReservationRequest,
+    Ticket,
 )
 from theatre.serializers import (
     ActorSerializer,
@@ -24,11 +47,88 @@ from theatre.serializers import (
     PlayImageSerializer,
     TheatreHallSerializer,
     PerformanceSerializer,
+    PerformanceScheduleSerializer,
+    PerformancePropsAssignmentSerializer,
     ReservationSerializer,
     PerformanceDetailSerializer,
     PerformanceListSerializer,
     ReservationListSerializer,
+    BestAvailableReservationSerializer,
+    ReservationRequestSerializer,
+    ArchivedReservationSerializer,
+    PerformanceOccupancySerializer,
+    PlayOccupancySerializer,
+    TheatreHallOccupancySerializer,
+    DayOccupancySerializer,
+    WaitingRoomSerializer,
+    CatalogChangesSerializer,
 )
+from theatre.tasks import enqueue_reservation_request, reservation_partition
+from theatre import waiting_room
+
+
+class FastListMixin:
+    """
+    Renders the list action with ``fast_list_class``, a ValuesListing
+    producing the same output as the list serializer from plain rows,
+    when FAST_LIST_RESPONSES is on and the list is not paginated.
+    """
+
+    fast_list_class = None
+
+    def list(self, request, *args, **kwargs):
+        if (
+            self.fast_list_class is None
+            or not settings.FAST_LIST_RESPONSES
+            or self.paginator is not None
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        listing = self.fast_list_class(self.get_serializer_context())
+        return Response(listing.rows(queryset))
+
+
+class MultiGetMixin:
+    """
+    Narrows the list action to the objects of ``?ids=1,2,3``, in the
+    requested order, within the query of the list. Unknown ids are
+    left out.
+    """
+
+    def requested_ids(self):
+        value = self.request.query_params.get("ids")
+        if value is None:
+            return None
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in value.split(",")))
+        except ValueError:
+            raise ValidationError(
+                {"ids": "Expected comma-separated integer ids."}
+            )
+        if len(ids) > settings.MULTI_GET_MAX_IDS:
+            raise ValidationError(
+                {
+                    "ids": f"At most {settings.MULTI_GET_MAX_IDS} ids "
+                    f"can be requested at once."
+                }
+            )
+        return ids
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ids = self.requested_ids() if self.action == "list" else None
+        if ids is None:
+            return queryset
+        return queryset.filter(pk__in=ids).order_by(
+            Case(
+                *[
+                    When(pk=pk, then=position)
+                    for position, pk in enumerate(ids)
+                ],
+                output_field=IntegerField(),
+            )
+        )
 
 
 class ActorViewSet(
@@ -49,7 +149,10 @@ class GenreViewSet(
     serializer_class = GenreSerializer
 
 
+@extend_schema_view(retrieve=extend_schema(parameters=FIELDSET_PARAMETERS))
 class PlayViewSet(
+    MultiGetMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -57,6 +160,7 @@ class PlayViewSet(
 ):
     queryset = Play.objects.prefetch_related("genres", "actors")
     serializer_class = PlaySerializer
+    fast_list_class = PlayListing
 
     @staticmethod
     def _params_to_ints(qs):
@@ -70,19 +174,31 @@ class PlayViewSet(
         actors = self.request.query_params.get("actors")
 
         queryset = self.queryset
+        fieldset = Fieldset.from_request(self.request)
+        if self.action == "list":
+            # the names are read from the arrays copied on the plays
+            queryset = queryset.prefetch_related(None)
+        elif fieldset is not None:
+            queryset = queryset.prefetch_related(None).prefetch_related(
+                *[
+                    name for name in ("genres", "actors")
+                    if wants(fieldset, name)
+                ]
+            )
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
+        # the filters use the GIN indexes of the arrays, without joins
         if genres:
             genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
+            queryset = queryset.filter(genre_ids__overlap=genres_ids)
 
         if actors:
             actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__id__in=actors_ids)
+            queryset = queryset.filter(actor_ids__overlap=actors_ids)
 
-        return queryset.distinct()
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -128,6 +244,12 @@ class PlayViewSet(
                 type={"type": "array", "items": {"type": "number"}},
                 description="Filter play by actors",
             ),
+            OpenApiParameter(
+                name="ids",
+                type={"type": "array", "items": {"type": "number"}},
+                description="Get these objects only, in this order",
+            ),
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -144,30 +266,19 @@ class TheatreHallViewSet(
     serializer_class = TheatreHallSerializer
 
 
-class PerformanceViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Performance.objects.all()
-        .select_related("play", "theatre_hall")
-        .prefetch_related(
-            "tickets",
-            "props",
-            "play__actors",
-            "play__genres"
-        )
-        .annotate(
-            tickets_available=(
-                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
-                - Count("tickets")
-            )
-        )
-    ).order_by("id")
+@extend_schema_view(retrieve=extend_schema(parameters=FIELDSET_PARAMETERS))
+class PerformanceViewSet(
+    MultiGetMixin, FastListMixin, viewsets.ModelViewSet
+):
+    queryset = Performance.objects.order_by("id")
     serializer_class = PerformanceSerializer
+    fast_list_class = PerformanceListing
 
     def get_queryset(self):
         date = self.request.query_params.get("date")
         play_id_str = self.request.query_params.get("play")
 
-        queryset = self.queryset
+        queryset = self.plan_queryset(super().get_queryset())
 
         if date:
             date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -178,6 +289,51 @@ class PerformanceViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def plan_queryset(self, queryset):
+        """
+        Loads only the relations and columns the serializer of the action
+        reads: the list needs a few columns of the play and the theatre
+        hall and counts the tickets, the detail needs the related objects
+        but no ticket count, and destroy only needs the primary key.
+        Whatever ``?fields=`` leaves out is not loaded either.
+        """
+        fieldset = Fieldset.from_request(self.request)
+        if self.action == "list":
+            return queryset.for_listing(
+                tickets_available=wants(fieldset, "tickets_available")
+            )
+
+        if self.action in ("retrieve", "update", "partial_update"):
+            related = [
+                name for name in ("play", "theatre_hall")
+                if expands(fieldset, name)
+            ]
+            if related:
+                queryset = queryset.select_related(*related)
+            return queryset.prefetch_related(
+                *[
+                    path.replace(".", "__")
+                    for path in ("props", "play.actors", "play.genres")
+                    if wants(fieldset, path)
+                ]
+            )
+
+        if self.action == "destroy":
+            return queryset.only("id", "show_time")
+
+        return queryset
+
+    def perform_destroy(self, instance):
+        """
+        Deletes the tickets of the performance with one statement on its
+        partition before the performance itself, so they are not loaded
+        one by one for the deletion signals; nobody is notified about
+        the seats of a deleted performance.
+        """
+        with transaction.atomic():
+            Ticket.objects.delete_for_performance(instance)
+            instance.delete()
+
     def get_serializer_class(self):
         if self.action == "list":
             return PerformanceListSerializer
@@ -187,8 +343,87 @@ class PerformanceViewSet(viewsets.ModelViewSet):
         ]:
             return PerformanceDetailSerializer
 
+        if self.action == "schedule":
+            return PerformanceScheduleSerializer
+
+        if self.action == "assign_props":
+            return PerformancePropsAssignmentSerializer
+
         return PerformanceSerializer
 
+    @extend_schema(responses=PerformanceSerializer(many=True))
+    @action(methods=["POST"], detail=False)
+    def schedule(self, request):
+        """
+        Schedules a recurring series of performances of a play in one
+        theatre hall, all or nothing
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        performances = serializer.save()
+
+        return Response(
+            PerformanceSerializer(performances, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @extend_schema(request=None, responses=WaitingRoomSerializer)
+    @action(
+        methods=["GET", "POST"],
+        detail=True,
+        url_path="waiting-room",
+        permission_classes=[IsAuthenticated],
+    )
+    def waiting_room(self, request, pk=None):
+        """
+        POST joins the waiting room of the performance and returns a queue
+        token, GET returns the estimated wait of the token sent in the
+        X-Waiting-Room-Token header. Bookings of the performance need
+        the token once it is admitted.
+        """
+        performance_id = int(pk) if pk.isdigit() else None
+        rate = performance_id and waiting_room.waiting_room_rate(
+            performance_id
+        )
+        if not rate:
+            raise NotFound("The performance has no waiting room.")
+
+        if request.method == "POST":
+            ticket = waiting_room.join(performance_id, rate, request.user.id)
+            response_status = status.HTTP_201_CREATED
+        else:
+            ticket = waiting_room.read_token(
+                request.headers.get(waiting_room.TOKEN_HEADER, ""),
+                performance_id,
+                request.user.id
+            )
+            if ticket is None:
+                raise ValidationError(
+                    {"token": "The waiting room token is not valid."}
+                )
+            response_status = status.HTTP_200_OK
+
+        wait = waiting_room.estimated_wait(ticket)
+        return Response(
+            WaitingRoomSerializer(
+                {
+                    "token": ticket.get("token"),
+                    "admitted": wait == 0,
+                    "estimated_wait": round(wait, 1),
+                }
+            ).data,
+            status=response_status
+        )
+
+    @action(methods=["POST"], detail=False, url_path="assign-props")
+    def assign_props(self, request):
+        """Replaces the props of many performances in one call"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -201,6 +436,12 @@ class PerformanceViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.INT,
                 description="Filter performance by play",
             ),
+            OpenApiParameter(
+                name="ids",
+                type={"type": "array", "items": {"type": "number"}},
+                description="Get these objects only, in this order",
+            ),
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -220,12 +461,21 @@ class ReservationViewSet(
     viewsets.GenericViewSet
 ):
     queryset = Reservation.objects.prefetch_related(
-        "tickets__performance__play",
-        "tickets__performance__theatre_hall"
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.only(
+                "id", "row", "seat", "performance", "reservation"
+            )
+        ),
+        # one grouped count for all the performances of the page
+        Prefetch(
+            "tickets__performance",
+            queryset=Performance.objects.for_listing()
+        ),
     )
     serializer_class = ReservationSerializer
     pagination_class = ReservationPagination
-    permission_classes = (IsAuthenticated,)
+    permission_classes = (IsAuthenticated, HasWaitingRoomAdmission)
 
     def get_queryset(self):
         user = self.request.user
@@ -239,10 +489,264 @@ class ReservationViewSet(
         if self.action == "list":
             return ReservationListSerializer
 
+        if self.action == "best_available":
+            return BestAvailableReservationSerializer
+
         return ReservationSerializer
 
+    def requested_performance_ids(self) -> set:
+        """
+        Reads the performances of a booking from the raw request data,
+        so the waiting room is checked before any database work
+        """
+        data = self.request.data
+        if self.action == "best_available":
+            values = [data.get("performance")]
+        else:
+            values = [
+                ticket.get("performance")
+                for ticket in data.get("tickets") or []
+                if isinstance(ticket, dict)
+            ]
+
+        performance_ids = set()
+        for value in values:
+            try:
+                performance_ids.add(int(value))
+            except (TypeError, ValueError):
+                pass
+        return performance_ids
+
     def perform_create(self, serializer):
         """
         Sets the user field of the created Reservation to the current user
         """
         serializer.save(user=self.request.user)
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """
+        Creates a reservation, or queues it when async booking mode
+        (RESERVATION_ASYNC) is on.
+
+        In async mode the request is only validated here. The booking is
+        stored as a ReservationRequest and applied by the Celery worker of
+        its performance partition, and the response is 202 with the URL
+        to poll for the result.
+        """
+        if not settings.RESERVATION_ASYNC:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tickets = [
+            {
+                "row": ticket["row"],
+                "seat": ticket["seat"],
+                "performance": ticket["performance"].id,
+            }
+            for ticket in serializer.validated_data["tickets"]
+        ]
+        partition = reservation_partition(
+            min((ticket["performance"] for ticket in tickets), default=0)
+        )
+
+        with transaction.atomic():
+            reservation_request = ReservationRequest.objects.create(
+                user=request.user,
+                payload={"tickets": tickets},
+                partition=partition
+            )
+            enqueue_reservation_request(reservation_request)
+
+        status_url = reverse(
+            "theatre:reservationrequest-detail",
+            args=[reservation_request.id]
+        )
+        data = ReservationRequestSerializer(reservation_request).data
+        data["status_url"] = request.build_absolute_uri(status_url)
+
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url}
+        )
+
+    @extend_schema(responses=ReservationSerializer)
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="best-available",
+    )
+    @idempotent
+    def best_available(self, request):
+        """
+        Reserves the best available block of adjacent seats for
+        a performance, so clients do not have to pick exact seats
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reservation = serializer.save(user=request.user)
+
+        return Response(
+            ReservationSerializer(reservation).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ArchivedReservationViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet
+):
+    """Read-only access to reservations for archived performances"""
+
+    queryset = ArchivedReservation.objects.prefetch_related(
+        "tickets__performance"
+    )
+    serializer_class = ArchivedReservationSerializer
+    pagination_class = ReservationPagination
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        user = self.request.user
+
+        if user.is_superuser or user.is_staff:
+            return self.queryset
+
+        return self.queryset.filter(user=user)
+
+
+class ReservationRequestViewSet(
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet
+):
+    """Polling endpoint for reservations made in async booking mode"""
+
+    queryset = ReservationRequest.objects.all()
+    serializer_class = ReservationRequestSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        user = self.request.user
+
+        if user.is_superuser or user.is_staff:
+            return self.queryset
+
+        return self.queryset.filter(user=user)
+
+
+class CatalogChangesViewSet(viewsets.GenericViewSet):
+    """
+    Incremental sync of the catalogue for partner apps: the plays,
+    performances, theatre halls, actors and genres created, updated or
+    deleted since a cursor
+    """
+
+    serializer_class = CatalogChangesSerializer
+    serializers_by_model = {
+        "actor": ActorSerializer,
+        "genre": GenreSerializer,
+        "play": PlaySerializer,
+        "theatrehall": TheatreHallSerializer,
+        "performance": PerformanceSerializer,
+    }
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                type=OpenApiTypes.STR,
+                description="The cursor returned by the previous call, "
+                "omitted for the first one",
+            ),
+        ]
+    )
+    def list(self, request):
+        """
+        Returns the changes after the cursor in order, each changed row
+        once with its current values. Calls are repeated with the
+        returned cursor while ``has_more`` is true.
+        """
+        since = request.query_params.get("since") or "0"
+        if not since.isdigit():
+            raise ValidationError({"since": "Invalid cursor."})
+
+        changes, has_more = changes_since(
+            int(since), settings.CATALOG_CHANGES_PAGE_SIZE
+        )
+        if changes:
+            since = str(changes[-1].change_seq)
+        serializer = self.get_serializer(
+            {
+                "cursor": since,
+                "has_more": has_more,
+                "changes": [self.render_change(change) for change in changes],
+            }
+        )
+        return Response(serializer.data)
+
+    def render_change(self, change) -> dict:
+        data = None
+        if change.instance is not None:
+            serializer_class = self.serializers_by_model[change.model]
+            data = serializer_class(change.instance).data
+        return {
+            "model": change.model,
+            "id": change.object_id,
+            "deleted": change.instance is None,
+            "data": data,
+        }
+
+
+class OccupancyPagination(PageNumberPagination):
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class OccupancyAnalyticsViewSet(viewsets.GenericViewSet):
+    """
+    Staff-only sales reports read from the precomputed occupancy summary,
+    refreshed by the refresh_occupancy_analytics Celery task
+    """
+
+    queryset = PerformanceOccupancy.objects.select_related(
+        "performance__play",
+        "performance__theatre_hall"
+    ).order_by("-performance__show_time")
+    serializer_class = PerformanceOccupancySerializer
+    pagination_class = OccupancyPagination
+    permission_classes = (IsAdminUser,)
+
+    def _report(self, rows, serializer_class):
+        return Response(serializer_class(rows, many=True).data)
+
+    @action(methods=["GET"], detail=False)
+    def performances(self, request):
+        """Occupancy of every performance, latest shows first"""
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(responses=PlayOccupancySerializer(many=True))
+    @action(methods=["GET"], detail=False)
+    def plays(self, request):
+        """Occupancy per play"""
+        return self._report(occupancy_by_play(), PlayOccupancySerializer)
+
+    @extend_schema(responses=TheatreHallOccupancySerializer(many=True))
+    @action(methods=["GET"], detail=False, url_path="theatre-halls")
+    def theatre_halls(self, request):
+        """Occupancy per theatre hall"""
+        return self._report(
+            occupancy_by_theatre_hall(),
+            TheatreHallOccupancySerializer
+        )
+
+    @extend_schema(responses=DayOccupancySerializer(many=True))
+    @action(methods=["GET"], detail=False)
+    def days(self, request):
+        """Occupancy per day of the show"""
+        return self._report(occupancy_by_day(), DayOccupancySerializer)
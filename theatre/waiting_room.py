@@ -0,0 +1,152 @@
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+from theatre.cache import TwoLevelCache
+from theatre.models import Performance
+
+TOKEN_SALT = "theatre.waiting-room"
+TOKEN_HEADER = "X-Waiting-Room-Token"
+
+waiting_room_rates = TwoLevelCache("waiting-room-rates")
+
+# Takes the next slot, moving a lagging counter to the current slot first
+TAKE_SLOT_SCRIPT = """
+local slot = redis.call("INCR", KEYS[1])
+local now_slot = tonumber(ARGV[1])
+if slot < now_slot then
+    redis.call("SET", KEYS[1], now_slot)
+    return now_slot
+end
+return slot
+"""
+_slot_lock = threading.Lock()
+
+
+def waiting_room_rate(performance_id):
+    """
+    Returns the admissions per minute of a performance, None when it has
+    no waiting room. Read through the two-level cache, so gating a hot
+    performance does not query the database.
+    """
+    return waiting_room_rates.get_or_set(
+        performance_id,
+        lambda: Performance.objects.filter(pk=performance_id)
+        .values_list("waiting_room_rate", flat=True)
+        .first()
+    )
+
+
+def slot_seconds(rate) -> float:
+    return 60 / rate
+
+
+def take_slot(performance_id, rate) -> int:
+    """
+    Takes the next admission slot of the performance from the shared
+    counter. Slots are numbered in admission intervals since the epoch,
+    slot ``n`` is admitted at ``n * 60 / rate`` seconds.
+
+    When the queue is idle the counter lags behind the clock and is
+    moved forward to the current slot. Reading, moving and incrementing
+    the counter is one atomic step: a Lua script on Redis, a lock for
+    the other cache backends, which are per process. Concurrent joins
+    thus get distinct slots and move the counter forward only once.
+    """
+    key = f"waiting-room:{performance_id}:{rate}"
+    now_slot = math.floor(time.time() / slot_seconds(rate))
+
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    if isinstance(backend, RedisCache):
+        client = backend._cache.get_client(write=True)
+        return int(
+            client.eval(
+                TAKE_SLOT_SCRIPT,
+                1,
+                backend.make_and_validate_key(key),
+                now_slot,
+            )
+        )
+
+    with _slot_lock:
+        cache.add(key, now_slot - 1, None)
+        slot = cache.incr(key)
+        if slot < now_slot:
+            cache.set(key, now_slot, None)
+            slot = now_slot
+        return slot
+
+
+def join(performance_id, rate, user_id) -> dict:
+    """
+    Queues the user for the performance. A user holds one place in the
+    queue: joining again returns the same token rather than a new slot,
+    so repeated joins cannot push the other users back.
+
+    Returns:
+        dict: The signed queue token, its slot and the admission rate.
+    """
+    key = f"waiting-room:{performance_id}:{rate}:user:{user_id}"
+    ticket = cache.get(key)
+    if ticket is not None:
+        return ticket
+
+    ticket = {
+        "performance": performance_id,
+        "user": user_id,
+        "slot": take_slot(performance_id, rate),
+        "rate": rate,
+    }
+    ticket["token"] = signing.dumps(ticket, salt=TOKEN_SALT, compress=True)
+    if not cache.add(key, ticket, settings.WAITING_ROOM_TOKEN_MAX_AGE):
+        # a concurrent join of the same user stored its place first
+        ticket = cache.get(key, ticket)
+    return ticket
+
+
+def read_token(token, performance_id, user_id):
+    """
+    Returns the content of a valid token of the user for the performance,
+    None for an invalid, expired or foreign token.
+    """
+    try:
+        data = signing.loads(
+            token,
+            salt=TOKEN_SALT,
+            max_age=settings.WAITING_ROOM_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return None
+
+    if data.get("performance") != performance_id or (
+        data.get("user") != user_id
+    ):
+        return None
+    return data
+
+
+def estimated_wait(ticket) -> float:
+    """Seconds until the slot of a token is admitted, 0 once it is"""
+    return max(
+        ticket["slot"] * slot_seconds(ticket["rate"]) - time.time(), 0.0
+    )
+
+
+def is_admitted(tokens, performance_id, user_id) -> bool:
+    """
+    Checks that the user may book the performance: it has no waiting
+    room, or one of the tokens is valid and has been admitted.
+    """
+    if waiting_room_rate(performance_id) is None:
+        return True
+
+    for token in tokens:
+        ticket = read_token(token, performance_id, user_id)
+        if ticket is not None and estimated_wait(ticket) == 0:
+            return True
+    return False
@@ -13,4 +13,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theatre_service.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from theatre_service.sse import SeatStreamApp  # noqa: E402
+
+application = SeatStreamApp(django_application)
@@ -0,0 +1,125 @@
+import io
+from urllib.parse import unquote_to_bytes, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import (
+    SpectacularAPIView,
+    SpectacularRedocView,
+    SpectacularSwaggerView,
+)
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# The API documentation is served as documents rather than API data
+DOCUMENTATION_VIEWS = (
+    SpectacularAPIView,
+    SpectacularRedocView,
+    SpectacularSwaggerView,
+)
+
+
+class SubRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET"], default="GET")
+    url = serializers.CharField()
+
+    def validate_url(self, value):
+        parts = urlsplit(value)
+        if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+            raise serializers.ValidationError(
+                "Expected a path of this API, e.g. /api/theatre/plays/"
+            )
+        return value
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"At most {settings.BATCH_MAX_REQUESTS} requests "
+                f"can be sent at once."
+            )
+        return value
+
+
+class SubResponseSerializer(serializers.Serializer):
+    status = serializers.IntegerField()
+    body = serializers.JSONField()
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    responses = SubResponseSerializer(many=True)
+
+
+def sub_request(request, method, parts) -> WSGIRequest:
+    """
+    Builds the request of one sub-request with the headers of the batch
+    request and its already authenticated user.
+    """
+    environ = dict(request.META)
+    environ.pop("CONTENT_TYPE", None)
+    environ.update(
+        {
+            "REQUEST_METHOD": method,
+            # as a WSGI server passes it: percent-decoded, as latin-1
+            "PATH_INFO": unquote_to_bytes(parts.path).decode("iso-8859-1"),
+            "QUERY_STRING": parts.query,
+            "CONTENT_LENGTH": "0",
+            "wsgi.input": io.BytesIO(),
+        }
+    )
+    django_request = WSGIRequest(environ)
+    django_request._force_auth_user = request.user
+    django_request._force_auth_token = request.auth
+    return django_request
+
+
+class BatchView(APIView):
+    """
+    Runs several read requests of the API in one call and returns their
+    statuses and bodies in the same order. The sub-requests share the
+    authentication of the batch request and are throttled as separate
+    requests; they do not pass through the middleware.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=BatchRequestSerializer, responses=BatchResponseSerializer
+    )
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return Response(
+            {
+                "responses": [
+                    self.run(request, sub["method"], urlsplit(sub["url"]))
+                    for sub in serializer.validated_data["requests"]
+                ]
+            }
+        )
+
+    def run(self, request, method, parts) -> dict:
+        django_request = sub_request(request, method, parts)
+        try:
+            match = resolve(django_request.path_info)
+        except Resolver404:
+            match = None
+
+        view_class = getattr(match and match.func, "cls", None)
+        if (
+            view_class is None
+            or not issubclass(view_class, APIView)
+            or issubclass(view_class, (BatchView, *DOCUMENTATION_VIEWS))
+        ):
+            return {"status": 404, "body": {"detail": "Not found."}}
+
+        response = match.func(django_request, *match.args, **match.kwargs)
+        return {"status": response.status_code, "body": response.data}
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from theatre_service.celery import app as celery_app
+
+_lock = threading.Lock()
+_report = {"expires_at": 0.0, "checks": None}
+
+
+def check_database() -> None:
+    """
+    Runs a query on a connection of its own, opened with a connect and a
+    statement timeout of HEALTH_CHECK_TIMEOUT, so an unreachable or
+    stuck database fails the check in time.
+    """
+    probe = connection.copy()
+    probe.settings_dict["OPTIONS"].update(
+        connect_timeout=settings.HEALTH_CHECK_TIMEOUT,
+        options=(
+            f"-c statement_timeout={settings.HEALTH_CHECK_TIMEOUT * 1000}"
+        ),
+    )
+    try:
+        with probe.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        probe.close()
+
+
+def check_cache() -> None:
+    cache.set("readyz", "ok", timeout=settings.HEALTH_CHECK_TIMEOUT)
+    if cache.get("readyz") != "ok":
+        raise RuntimeError("The cache did not return the stored value")
+
+
+def check_broker() -> None:
+    with celery_app.connection_for_write(
+        connect_timeout=settings.HEALTH_CHECK_TIMEOUT
+    ) as broker:
+        broker.ensure_connection(
+            max_retries=1, timeout=settings.HEALTH_CHECK_TIMEOUT
+        )
+
+
+CHECKS = {
+    "database": check_database,
+    "cache": check_cache,
+    "broker": check_broker,
+}
+
+
+def run_check(check) -> dict:
+    started = time.perf_counter()
+    try:
+        check()
+    except Exception as error:
+        result = {"ok": False, "error": type(error).__name__}
+    else:
+        result = {"ok": True}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def readiness_checks() -> dict:
+    """
+    Returns the results of all the checks, reusing them for
+    ``HEALTH_CHECK_CACHE_SECONDS``.
+
+    Only one thread of a process runs the checks at a time, the others
+    wait for its results, so frequent polling by load balancers does not
+    multiply database connections or broker round trips.
+    """
+    with _lock:
+        if _report["expires_at"] <= time.monotonic():
+            _report["checks"] = {
+                name: run_check(check) for name, check in CHECKS.items()
+            }
+            _report["expires_at"] = (
+                time.monotonic() + settings.HEALTH_CHECK_CACHE_SECONDS
+            )
+        return _report["checks"]
+
+
+@never_cache
+@require_safe
+def healthz(request):
+    """Liveness probe: the process serves requests"""
+    return JsonResponse({"status": "ok"})
+
+
+@never_cache
+@require_safe
+def readyz(request):
+    """
+    Readiness probe: the database, the cache and the Celery broker
+    answer. Responds with 503 when one of them does not.
+    """
+    checks = readiness_checks()
+    ready = all(result["ok"] for result in checks.values())
+    return JsonResponse(
+        {"status": "ok" if ready else "unavailable", "checks": checks},
+        status=200 if ready else 503
+    )
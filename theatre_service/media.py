@@ -0,0 +1,206 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+)
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+# Uploaded files are named <slug>-<uuid4><extension>, a name is never reused
+IMMUTABLE_NAME = re.compile(
+    r"-[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.\w+$"
+)
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+class FileRange:
+    """A file object that reads ``length`` bytes from ``start`` only"""
+
+    def __init__(self, media_file, start, length):
+        media_file.seek(start)
+        self.file = media_file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Returns the ``(start, end)`` bytes of a single ``Range`` header, None
+    when the header is absent, malformed or asks for several ranges.
+
+    Raises:
+        ValueError: If the range starts after the end of the file.
+    """
+    match = RANGE.match(header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0 or size == 0:
+            raise ValueError(f"Range {header} is not satisfiable")
+        return max(size - int(last), 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range {header} is not satisfiable")
+    return start, end
+
+
+def resolve_media_path(path) -> tuple:
+    """
+    Returns the absolute path of a file of ``MEDIA_ROOT`` and its
+    normalized path relative to it, with any ``..`` resolved.
+
+    Raises:
+        SuspiciousFileOperation: If the path leads outside MEDIA_ROOT.
+    """
+    full_path = safe_join(settings.MEDIA_ROOT, path)
+    relative_path = os.path.relpath(
+        full_path, os.path.abspath(settings.MEDIA_ROOT)
+    )
+    return full_path, relative_path.replace(os.sep, "/")
+
+
+def is_public(path) -> bool:
+    return path.startswith(tuple(settings.MEDIA_PUBLIC_PREFIXES))
+
+
+def media_user(request):
+    """
+    Returns the user of the session, or else of the credentials the API
+    accepts (such as a JWT ``Authorization`` header), so API clients
+    reach the files their user may see. Invalid credentials count as
+    anonymous.
+    """
+    if request.user.is_authenticated:
+        return request.user
+    api_request = Request(
+        request,
+        authenticators=[
+            authentication()
+            for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    try:
+        return api_request.user
+    except APIException:
+        return AnonymousUser()
+
+
+def set_cache_headers(response, path, modified) -> None:
+    response["Last-Modified"] = http_date(modified)
+    if IMMUTABLE_NAME.search(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE
+        )
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves a file of ``MEDIA_ROOT``.
+
+    Files outside ``MEDIA_PUBLIC_PREFIXES`` are served to staff only,
+    authenticated by session or as by the API. The prefixes are checked
+    against the normalized path, so ``..`` cannot reach a private file.
+    With ``MEDIA_SERVE_BACKEND`` set to ``nginx`` or ``sendfile`` the
+    transfer is delegated to the front proxy through ``X-Accel-Redirect``
+    or ``X-Sendfile``, otherwise the file is sent by ``FileResponse``
+    with support for ``Range`` and ``If-Modified-Since`` requests.
+    """
+    try:
+        full_path, path = resolve_media_path(path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    if not is_public(path) and not media_user(request).is_staff:
+        raise Http404("File not found")
+
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if not was_modified_since(
+        request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime
+    ):
+        response = HttpResponseNotModified()
+        set_cache_headers(response, path, stat.st_mtime)
+        return response
+
+    if settings.MEDIA_SERVE_BACKEND in ("nginx", "sendfile"):
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_SERVE_BACKEND == "nginx":
+            response["X-Accel-Redirect"] = (
+                settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+            )
+        else:
+            response["X-Sendfile"] = full_path
+        set_cache_headers(response, path, stat.st_mtime)
+        return response
+
+    byte_range = None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range or parse_http_date_safe(if_range) == int(stat.st_mtime):
+        try:
+            byte_range = parse_range(
+                request.META.get("HTTP_RANGE"), stat.st_size
+            )
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+    media_file = open(full_path, "rb")
+    if byte_range is None:
+        response = FileResponse(media_file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(media_file, start, end - start + 1),
+            content_type=content_type,
+            status=206
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    set_cache_headers(response, path, stat.st_mtime)
+    return response
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import drf_spectacular
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+# Packages whose code is introspected to build the schema
+SOURCE_PACKAGES = ("theatre", "theatre_service", "user")
+
+_schemas = {}
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Returns the version of the code the schema is built from.
+
+    ``CODE_VERSION`` (e.g. the commit hash set at deploy time) is used when
+    given, otherwise a hash of the project sources, the drf_spectacular
+    version and its settings, so any change produces a new schema.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+
+    digest = hashlib.sha256()
+    for package in SOURCE_PACKAGES:
+        for path in sorted((settings.BASE_DIR / package).rglob("*.py")):
+            if "tests" in path.parts:
+                continue
+            digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+            digest.update(path.read_bytes())
+    digest.update(drf_spectacular.__version__.encode())
+    digest.update(
+        json.dumps(
+            settings.SPECTACULAR_SETTINGS, sort_keys=True, default=str
+        ).encode()
+    )
+    return digest.hexdigest()[:16]
+
+
+def schema_path(renderer_format, language) -> Path:
+    return Path(settings.SCHEMA_CACHE_DIR) / (
+        f"openapi-{code_version()}-{language}.{renderer_format}"
+    )
+
+
+def write_schema(path, content) -> None:
+    """Writes the file atomically, so a reader never sees half of it"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+        file.write(content)
+    os.replace(file.name, path)
+
+
+def etag_matches(etag, if_none_match) -> bool:
+    """
+    Tells whether an ``If-None-Match`` header matches the ETag: ``*``,
+    or any entity tag of its list by weak comparison, as
+    ``django.utils.cache`` compares them.
+    """
+    etags = parse_etags(if_none_match)
+    if etags == ["*"]:
+        return True
+    return any(
+        candidate.removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in etags
+    )
+
+
+def render_schema(renderer, schema) -> bytes:
+    return renderer.render(schema, renderer_context={})
+
+
+def build_schema() -> list:
+    """
+    Generates the schema once and writes it in every served format,
+    so workers serve it from disk without introspecting the code.
+
+    Returns:
+        list: The paths of the written files.
+    """
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+
+    paths = {}
+    for renderer_class in CachedSpectacularAPIView.renderer_classes:
+        renderer = renderer_class()
+        path = schema_path(renderer.format, translation.get_language())
+        if path not in paths:
+            write_schema(path, render_schema(renderer, schema))
+            paths[path] = renderer.format
+    return list(paths)
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    Serves the OpenAPI schema generated once per code version.
+
+    The rendered schema is looked up in memory, then in
+    ``SCHEMA_CACHE_DIR`` (see the ``build_schema`` command) and only
+    generated when neither has it. Responses carry an ETag of the code
+    version, so clients revalidate with a 304.
+    """
+
+    def _get_schema_response(self, request):
+        version = (
+            self.api_version
+            or request.version
+            or self._get_version_parameter(request)
+        )
+        renderer = request.accepted_renderer
+        language = translation.get_language()
+        etag = f'"{code_version()}-{version}-{language}-{renderer.format}"'
+
+        if etag_matches(etag, request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        else:
+            key = (version, language, renderer.format)
+            content = _schemas.get(key)
+            if content is None:
+                content = self._load_schema(request, version, renderer)
+                _schemas[key] = content
+
+            response = HttpResponse(
+                content,
+                content_type=(
+                    f"{renderer.media_type}; charset={renderer.charset}"
+                    if renderer.charset else renderer.media_type
+                )
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, version)}"'
+            )
+
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def _load_schema(self, request, version, renderer) -> bytes:
+        """
+        Reads the prebuilt schema of the default API version from disk
+        or generates it, storing it for the other workers.
+        """
+        path = schema_path(renderer.format, translation.get_language())
+        if version is None and path.exists():
+            return path.read_bytes()
+
+        generator = self.generator_class(
+            urlconf=self.urlconf, api_version=version, patterns=self.patterns
+        )
+        content = render_schema(
+            renderer,
+            generator.get_schema(request=request, public=self.serve_public)
+        )
+        if version is None:
+            try:
+                write_schema(path, content)
+            except OSError:
+                pass
+        return content
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 
 from datetime import timedelta
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -24,10 +25,17 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY")
 
+# DJANGO_ENV=production selects the production profile: no debug tooling,
+# cached templates and persistent database connections.
+PRODUCTION = os.environ.get("DJANGO_ENV", "development") == "production"
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host
+]
 
 
 # Application definition
@@ -39,10 +47,10 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "theatre",
     "user",
-    "debug_toolbar",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
@@ -51,7 +59,6 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -60,6 +67,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "theatre_service.urls"
 
 TEMPLATES = [
@@ -78,6 +89,18 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        ),
+    ]
+
 WSGI_APPLICATION = "theatre_service.wsgi.application"
 
 
@@ -92,9 +115,39 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST"),
         "PORT": os.environ.get("POSTGRES_PORT"),
+        # seconds a connection is reused across requests in production
+        "CONN_MAX_AGE": int(
+            os.environ.get("POSTGRES_CONN_MAX_AGE", 60 if PRODUCTION else 0)
+        ),
+        "CONN_HEALTH_CHECKS": PRODUCTION,
+        "OPTIONS": {
+            "connect_timeout": int(
+                os.environ.get("POSTGRES_CONNECT_TIMEOUT", 5)
+            ),
+        },
     }
 }
 
+# The shared cache (L2 of theatre.cache.TwoLevelCache) is Redis when
+# REDIS_CACHE_URL is set and local memory otherwise, e.g. in tests
+if os.environ.get("REDIS_CACHE_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_CACHE_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds a value stays in the shared cache and in process memory
+CACHE_TIMEOUT = 300
+CACHE_LOCAL_TIMEOUT = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -135,6 +188,21 @@ STATIC_URL = "static/"
 MEDIA_ROOT = "/files/media"
 MEDIA_URL = "/media/"
 
+# Readiness checks (/readyz) give up after HEALTH_CHECK_TIMEOUT seconds and
+# their results are reused for HEALTH_CHECK_CACHE_SECONDS
+HEALTH_CHECK_TIMEOUT = 2
+HEALTH_CHECK_CACHE_SECONDS = 5
+
+# Media files are sent by Django ("django"), or by the front proxy after
+# Django has checked access: "nginx" (X-Accel-Redirect to the internal
+# location MEDIA_ACCEL_REDIRECT_PREFIX) or "sendfile" (X-Sendfile)
+MEDIA_SERVE_BACKEND = os.environ.get("MEDIA_SERVE_BACKEND", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+# Files under these paths are public, the others are served to staff only
+MEDIA_PUBLIC_PREFIXES = ("uploads/plays/",)
+# Cache lifetime of media files without a unique (uuid) name
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -150,9 +218,68 @@ CELERY_TIMEZONE = "Europe/Prague"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
+# Async booking mode: reservation POSTs are queued and applied by Celery
+# workers, one queue per partition of performances.
+RESERVATION_ASYNC = os.environ.get("RESERVATION_ASYNC", "") == "1"
+RESERVATION_QUEUE_PARTITIONS = 8
+RESERVATION_ASYNC_BATCH_SIZE = 20
+
+# How long the response to a request with an Idempotency-Key is replayed
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+# How long a request still being processed holds its key; past it a retry
+# takes the key over. Keep it above the longest request (GUNICORN_TIMEOUT).
+IDEMPOTENCY_KEY_LEASE = timedelta(seconds=60)
+
+# Monthly ticket partitions: how many future months are pre-created and
+# after how many past months a partition is detached to an archive table
+# (None keeps all of them attached)
+TICKET_PARTITION_MONTHS_AHEAD = 12
+TICKET_PARTITION_RETAIN_MONTHS = None
+
+# Performances older than this are moved to the archive tables
+ARCHIVE_PERFORMANCES_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 100
+
+# Bookings made this long before the previous occupancy refresh are
+# counted again, as their tickets may have committed after it. Keep it
+# above the longest booking transaction.
+OCCUPANCY_RESCAN_WINDOW = timedelta(minutes=5)
+
+# Set to 1 to render performance and play lists from plain rows instead
+# of their serializers, with the same output
+FAST_LIST_RESPONSES = os.environ.get("FAST_LIST_RESPONSES", "0") == "1"
+
+# Seat events are published on Redis at SEAT_EVENTS_REDIS_URL, or only
+# delivered within the publishing process when it is empty
+SEAT_EVENTS_REDIS_URL = os.environ.get(
+    "SEAT_EVENTS_REDIS_URL", os.environ.get("REDIS_CACHE_URL", "")
+)
+# Seconds a new seat stream waits for the Redis subscription of its
+# process before answering 503
+SEAT_STREAM_SUBSCRIBE_TIMEOUT = 5
+# Seconds between keepalive comments of an idle seat stream
+SEAT_STREAM_HEARTBEAT = 15
+# Events a slow seat stream client may fall behind before it is dropped
+SEAT_STREAM_QUEUE_SIZE = 100
+
+# Most ids of one multi-get (?ids=) and most sub-requests of one
+# /api/batch/ call
+MULTI_GET_MAX_IDS = 100
+BATCH_MAX_REQUESTS = 20
+
+# Most catalogue changes returned by one call of the changes endpoint
+CATALOG_CHANGES_PAGE_SIZE = 500
+
+# How long a waiting room token stays valid, in seconds
+WAITING_ROOM_TOKEN_MAX_AGE = 2 * 60 * 60
+
+# Process-local cache of theatre hall dimensions used by ticket validation
+HALL_DIMENSIONS_CACHE_SIZE = 1024
+HALL_DIMENSIONS_CACHE_TIMEOUT = 300
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
         # "rest_framework.authentication.TokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
@@ -175,6 +302,14 @@ SIMPLE_JWT = {
 	"ROTATE_REFRESH_TOKENS": False
 }
 
+# The OpenAPI schema is built once per code version (CODE_VERSION, or a
+# hash of the sources when unset) and kept in this directory
+CODE_VERSION = os.environ.get("CODE_VERSION")
+SCHEMA_CACHE_DIR = os.environ.get(
+    "SCHEMA_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "theatre-schema")
+)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Theatre API",
     "DESCRIPTION": "Online booking of tickets for theatre plays",
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signals
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from theatre.models import Performance
+from theatre.seat_events import format_event, get_broker, hub
+from user.authentication import CachedJWTAuthentication
+
+SEAT_STREAM_PATH = re.compile(
+    r"^/api/theatre/performances/(?P<pk>\d+)/seats/stream/$"
+)
+KEEPALIVE = b": keepalive\n\n"
+
+authentication = CachedJWTAuthentication()
+
+
+def get_user(header):
+    """
+    Returns the user of a ``Bearer`` Authorization header, None when it
+    is missing or invalid.
+    """
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_user(
+            authentication.get_validated_token(raw_token)
+        )
+    except AuthenticationFailed:
+        return None
+
+
+async def send_json(send, status, data, headers=()) -> None:
+    body = json.dumps(data).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def wait_for_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+class SeatStreamApp:
+    """
+    ASGI application streaming the seat changes of a performance as
+    Server-Sent Events at ``/api/theatre/performances/<id>/seats/stream/``.
+    Other requests are passed to the Django application.
+
+    The stream opens with a ``snapshot`` event of the taken seats, then
+    sends ``seats-taken`` and ``seats-released`` events. Applying them
+    as set operations is idempotent, so an event already included in the
+    snapshot does no harm. Comments keep idle connections alive.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        match = (
+            SEAT_STREAM_PATH.match(scope["path"])
+            if scope["type"] == "http" else None
+        )
+        if match is None:
+            return await self.application(scope, receive, send)
+
+        if scope["method"] not in ("GET", "HEAD"):
+            return await send_json(
+                send,
+                405,
+                {"detail": f"Method \"{scope['method']}\" not allowed."},
+                [(b"allow", b"GET, HEAD")]
+            )
+
+        subscription = await self.subscribe(
+            scope, send, int(match.group("pk"))
+        )
+        if subscription is None:
+            return
+        try:
+            await self.stream(subscription, receive, send)
+        finally:
+            hub.unsubscribe(subscription)
+
+    async def subscribe(self, scope, send, performance_id):
+        """
+        Authenticates the client and subscribes it to the performance,
+        sending the response headers and the snapshot.
+
+        Returns:
+            Subscription: None when an error response has been sent.
+        """
+        # like a Django request, so database connections are recycled
+        await sync_to_async(signals.request_started.send)(
+            sender=self.__class__, scope=scope
+        )
+        try:
+            headers = dict(scope["headers"])
+            user = await sync_to_async(get_user)(
+                headers.get(b"authorization")
+            )
+            if user is None:
+                await send_json(
+                    send,
+                    401,
+                    {"detail": "Authentication credentials were not "
+                               "provided or are not valid."},
+                    [(b"www-authenticate", b'Bearer realm="api"')]
+                )
+                return None
+
+            subscribed = await sync_to_async(
+                get_broker().start, thread_sensitive=False
+            )(settings.SEAT_STREAM_SUBSCRIBE_TIMEOUT)
+            if not subscribed:
+                await send_json(
+                    send, 503, {"detail": "Seat events are unavailable."}
+                )
+                return None
+            try:
+                subscription, taken = await hub.subscribe(performance_id)
+            except Performance.DoesNotExist:
+                await send_json(send, 404, {"detail": "Not found."})
+                return None
+        finally:
+            await sync_to_async(signals.request_finished.send)(
+                sender=self.__class__
+            )
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": format_event(
+                    "snapshot",
+                    {
+                        "performance": performance_id,
+                        "taken_seats": [list(seat) for seat in taken],
+                    }
+                ),
+                "more_body": scope["method"] == "GET",
+            }
+        )
+        if scope["method"] == "HEAD":
+            hub.unsubscribe(subscription)
+            return None
+        return subscription
+
+    async def stream(self, subscription, receive, send) -> None:
+        """
+        Sends the queued events until the client disconnects or the
+        subscription is closed.
+        """
+        disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+        next_frame = asyncio.ensure_future(subscription.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {disconnect, next_frame},
+                    timeout=settings.SEAT_STREAM_HEARTBEAT,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnect in done:
+                    return
+                if next_frame not in done:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": KEEPALIVE,
+                            "more_body": True,
+                        }
+                    )
+                    continue
+
+                frame = next_frame.result()
+                if frame is None:
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": frame,
+                        "more_body": True,
+                    }
+                )
+                next_frame = asyncio.ensure_future(subscription.get())
+        finally:
+            disconnect.cancel()
+            next_frame.cancel()
@@ -0,0 +1,94 @@
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from theatre.cache import TwoLevelCache
+
+user_cache = TwoLevelCache("users")
+
+# The user fields kept in the cache, all the API reads of request.user
+CACHED_USER_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that reads the user of a token from the two-level
+    cache instead of querying the database on every request.
+
+    Only CACHED_USER_FIELDS and, when CHECK_REVOKE_TOKEN is on, a hash of
+    the password hash are cached, never the password hash itself. The
+    user is rebuilt from them with the other fields deferred, so reading
+    one loads it and saving writes back only the loaded fields.
+
+    Saving or deleting a user drops its entry (see ``user.signals``), and
+    ``User.objects.update()`` drops the whole namespace. Writes bypassing
+    the ORM must call ``user_cache.invalidate()``.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        values = user_cache.get_or_set(
+            user_id, lambda: self.load_user_values(user_id)
+        )
+
+        if not values["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            != values["password_hash"]
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed"
+            )
+
+        field_names = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in CACHED_USER_FIELDS
+        ]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            field_names,
+            [values[name] for name in field_names],
+        )
+
+    def load_user_values(self, user_id) -> dict:
+        """
+        Returns the cached fields of a user.
+
+        Raises:
+            AuthenticationFailed: If the user does not exist.
+        """
+        values = (
+            self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+            .values(*CACHED_USER_FIELDS, "password")
+            .first()
+        )
+        if values is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+
+        password = values.pop("password")
+        values["password_hash"] = (
+            get_md5_hash_password(password)
+            if api_settings.CHECK_REVOKE_TOKEN else None
+        )
+        return values
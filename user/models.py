@@ -3,7 +3,21 @@ from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Updates the users and drops the users cached by the JWT
+        authentication, as bulk updates send no signals.
+        """
+        # user.authentication loads models, it cannot be imported with them
+        from user.authentication import user_cache
+
+        rows = super().update(**kwargs)
+        user_cache.invalidate()
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Define a model manager for User model with no username field."""
 
     use_in_migrations = True
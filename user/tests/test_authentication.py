@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import user_cache
+
+ME_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_loaded_once(self):
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["email"], "test@test.com")
+
+    def test_changed_user_is_reloaded(self):
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, 401)
+
+    def test_bulk_update_drops_cached_user(self):
+        self.client.get(ME_URL)
+
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, 401)
+
+    def test_password_hash_is_not_cached(self):
+        self.client.get(ME_URL)
+
+        values = user_cache.get_or_set(self.user.pk, dict)
+
+        self.assertEqual(values["email"], "test@test.com")
+        self.assertNotIn("password", values)
+        self.assertNotIn(self.user.password, values.values())
+
+    def test_update_through_cached_user_keeps_other_fields(self):
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.com")
+        self.assertTrue(self.user.check_password("testpassword"))
+
+
+class CachedJWTSchemeTests(TestCase):
+    def test_schema_documents_jwt_bearer_scheme(self):
+        generator = SchemaGenerator()
+        schema = generator.get_schema(request=None, public=True)
+
+        self.assertEqual(
+            schema["components"]["securitySchemes"]["jwtAuth"]["scheme"],
+            "bearer"
+        )